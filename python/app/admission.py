@@ -0,0 +1,139 @@
+# app/admission.py
+"""Uç nokta başına eşzamanlılık sınırı, sınırlı bekleme kuyruğu ve öncelik.
+
+Her uç noktanın kendi ``AdmissionController``'ı vardır. Boş yuva yoksa istek
+kuyruğa girer; kuyruk doluysa 429, tahmini veya gerçek bekleme süresi
+``max_wait``'i aşıyorsa 503 ile hemen reddedilir (yük atma). Böylece yoğun
+``/auto-match`` trafiği ``/generate-pdf`` ve ``/send-email``'i aç bırakmaz.
+
+Öncelik: kuyruk, varış zamanına sınıf gecikmesi eklenerek sıralanır.
+``batch`` istekleri ``batch_delay`` saniye sonra gelmiş gibi davranır; yani
+etkileşimli istekler önce alınır, ama toplu istekler sonsuza kadar beklemez.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from typing import Dict, List, Optional
+
+__all__ = ["AdmissionController", "AdmissionRejected", "INTERACTIVE", "BATCH"]
+
+INTERACTIVE, BATCH = "interactive", "batch"
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        max_wait: float,
+        batch_delay: float = 2.0,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.batch_delay = batch_delay
+        self.active = 0
+        self._waiters: List[tuple] = []  # (sıra anahtarı, seq, future)
+        self._seq = itertools.count()
+        self._service_time = 0.0  # hizmet süresinin üssel ortalaması (s)
+        self.stats: Dict[str, int] = {
+            "admitted": 0,
+            "rejected_queue_full": 0,
+            "rejected_wait": 0,
+        }
+
+    @classmethod
+    def from_env(cls, name, concurrency, queue, wait, batch_delay=2.0):
+        """``ADMISSION_<AD>_{CONCURRENCY,QUEUE,WAIT}`` ile varsayılanları ezer."""
+        prefix = "ADMISSION_" + name.upper().replace("-", "_")
+        return cls(
+            name,
+            max_concurrency=int(os.getenv(prefix + "_CONCURRENCY", concurrency)),
+            max_queue=int(os.getenv(prefix + "_QUEUE", queue)),
+            max_wait=float(os.getenv(prefix + "_WAIT", wait)),
+            batch_delay=float(os.getenv("ADMISSION_BATCH_DELAY", batch_delay)),
+        )
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for *_, f in self._waiters if not f.done())
+
+    def _estimated_wait(self) -> float:
+        # Önümüzdeki iş / yuva sayısı × ortalama hizmet süresi
+        ahead = self.queued + 1
+        return ahead * self._service_time / self.max_concurrency
+
+    def _reject(self, status_code, reason, detail):
+        self.stats[reason] += 1
+        retry_after = max(1.0, self._estimated_wait())
+        raise AdmissionRejected(status_code, detail, retry_after)
+
+    async def acquire(self, priority: str = INTERACTIVE) -> None:
+        if self.active < self.max_concurrency and not self.queued:
+            self.active += 1
+            self.stats["admitted"] += 1
+            return
+
+        if self.queued >= self.max_queue:
+            self._reject(429, "rejected_queue_full", f"{self.name}: kuyruk dolu")
+        if self._estimated_wait() > self.max_wait:
+            self._reject(503, "rejected_wait", f"{self.name}: sunucu yoğun")
+
+        now = time.monotonic()
+        order = now + (self.batch_delay if priority == BATCH else 0.0)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (order, next(self._seq), future))
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            if not future.done():
+                future.cancel()
+                self._reject(503, "rejected_wait", f"{self.name}: bekleme aşıldı")
+            # Zaman aşımıyla aynı anda yuva verildiyse kabul edilmiş sayılır
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(0.0)  # verilen yuvayı geri bırak
+            else:
+                future.cancel()
+            raise
+        self.stats["admitted"] += 1
+
+    def release(self, elapsed: Optional[float] = None) -> None:
+        if elapsed is not None and elapsed > 0:
+            self._service_time = (
+                elapsed
+                if self._service_time == 0
+                else 0.8 * self._service_time + 0.2 * elapsed
+            )
+        # Yuvayı sıradaki bekleyene doğrudan devret
+        while self._waiters:
+            *_, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "avg_service_ms": round(self._service_time * 1000, 2),
+            **self.stats,
+        }
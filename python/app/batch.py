@@ -0,0 +1,343 @@
+# app/batch.py
+"""Kohort eşleştirmesi için çevrimdışı toplu komut satırı aracı.
+
+API sunucusunu yüklemeden, öğrencilerin harici derslerini içeren bir
+CSV/JSONL dosyasını ``SimilarityService`` ile eşleştirir ve sonuçları
+Parquet veya Arrow parçaları olarak yazar::
+
+    python -m app.batch students.jsonl --out audit/ --workers 4
+
+Girdi biçimleri:
+
+* JSONL: ``{"student_id": "...", "items": [{"ext_code": "...", "ext_content": "..."}]}``
+* CSV: ``student_id,ext_code,ext_content`` (aynı öğrencinin satırları ardışık)
+
+Girdi akış halinde okunur ve ``--chunk-students`` öğrencilik parçalara
+bölünür; her parça ayrı bir dosyaya (``part-00000.parquet``) yazılır.
+Tamamlanan parçalar atomik olarak adlandırıldığından, kesintiden sonra
+aynı komut yeniden çalıştırıldığında yazılmış parçalar atlanır.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+logger = logging.getLogger("auto_batch")
+
+_svc = None  # işçi süreç başına bir SimilarityService
+_decisions = None  # işçi süreç başına karar deposu (varsa)
+
+
+# ——— Girdi okuma ——— #
+def iter_students(path):
+    """(öğrenci_id, [(ext_code, ext_content), ...]) çiftlerini akış halinde üretir."""
+    path = Path(path)
+    with path.open(encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            rows = csv.DictReader(f)
+            for student_id, group in itertools.groupby(
+                rows, key=lambda r: r["student_id"]
+            ):
+                yield student_id, [(r["ext_code"], r["ext_content"]) for r in group]
+        else:
+            for line in f:
+                if not line.strip():
+                    continue
+                d = json.loads(line)
+                yield str(d["student_id"]), [
+                    (i["ext_code"], i.get("ext_content", "")) for i in d["items"]
+                ]
+
+
+def iter_chunks(students, size):
+    it = iter(students)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ——— İşçi süreç ——— #
+def _init_worker(
+    model_name, threshold, src, mongo_uri, decisions_db=None, index_opts=None
+):
+    """``index_opts`` sunucunun ``INDEX_*``/``LEXICAL_SHORTLIST`` ayarlarıdır."""
+    global _svc, _decisions
+    from .lexical import LexicalIndex
+    from .repository import CourseRepository
+    from .services import SimilarityService
+    from .textnorm import TextNormalizer
+
+    index_opts = dict(index_opts or {})
+    shortlist = index_opts.pop("shortlist", 0)
+    repo = CourseRepository(src=src, mongo_uri=mongo_uri)
+    asyncio.run(repo.load())
+    normalizer = TextNormalizer.from_env()
+    _svc = SimilarityService(
+        model_name,
+        threshold,
+        repo,
+        **index_opts,
+        lexical=(
+            LexicalIndex.from_repo(repo, normalizer=normalizer) if shortlist else None
+        ),
+        shortlist_k=shortlist,
+        normalizer=normalizer,
+    )
+    if decisions_db:
+        from .decisions import DecisionStore
+
+        _decisions = DecisionStore(decisions_db, normalizer=_svc.normalizer)
+
+
+def _match_chunk(part_no, chunk, out_dir, fmt, top_k):
+    """Bir parçayı eşleştirir ve kendi dosyasına yazar; satır sayısını döndürür."""
+    import pyarrow as pa
+
+    from .serialization import rank_matrix
+
+    # Parça içinde ortak dersler (normalizasyondan sonra) bir kez kodlanır
+    contents = [content for _, items in chunk for _, content in items]
+    normalized = dict(zip(contents, _svc.normalizer.normalize_many(contents)))
+    index = {}
+    for text in normalized.values():
+        index.setdefault(text, len(index))
+    texts = list(index)
+    int_codes = _svc._int_codes
+
+    # Komisyon kararları /auto-match ile aynı kuralla uygulanır: onaylı kararı
+    # olan metinler kodlanmaz, reddedilen çiftler muaf sayılmaz
+    decisions = {}
+    if _decisions is not None and texts:
+        decisions = _decisions.lookup(texts, set(int_codes))
+    served = {i for i, recs in decisions.items() if any(r["approved"] for r in recs)}
+    pending = [i for i in range(len(texts)) if i not in served]
+    sims = np.zeros((len(texts), len(int_codes)), dtype=np.float32)
+    if pending:
+        sims[pending] = _svc.auto_match([texts[i] for i in pending], normalized=True)
+
+    columns = {k: [] for k in ("student_id", "ext_code", "rank", "int_code")}
+    columns.update(percent=[], exempt=[], decision_id=[])
+    k = min(top_k or len(int_codes), len(int_codes))
+    if texts:
+        percent, order, exempt = rank_matrix(sims, _svc.threshold)
+        for student_id, items in chunk:
+            for ext_code, content in items:
+                row = index[normalized[content]]
+                recs = {r["int_code"]: r for r in decisions.get(row, ())}
+                if row in served:
+                    ranked = [
+                        (r["int_code"], 100.0 if r["approved"] else 0.0, r["approved"])
+                        for r in sorted(recs.values(), key=lambda r: not r["approved"])
+                    ]
+                else:
+                    ranked = [
+                        (int_codes[j], float(percent[row, j]), bool(exempt[row, j]))
+                        for j in order[row, :k].tolist()
+                    ]
+                for rank, (code, pct, ex) in enumerate(ranked[:k], start=1):
+                    r = recs.get(code)
+                    columns["student_id"].append(student_id)
+                    columns["ext_code"].append(ext_code)
+                    columns["rank"].append(rank)
+                    columns["int_code"].append(code)
+                    columns["percent"].append(pct)
+                    columns["exempt"].append(ex and (r is None or r["approved"]))
+                    columns["decision_id"].append(
+                        None if r is None else r["decision_id"]
+                    )
+
+    table = pa.table(
+        columns,
+        schema=pa.schema(
+            [
+                ("student_id", pa.string()),
+                ("ext_code", pa.string()),
+                ("rank", pa.int32()),
+                ("int_code", pa.string()),
+                ("percent", pa.float64()),
+                ("exempt", pa.bool_()),
+                ("decision_id", pa.int64()),  # kararla belirlenen satırlar
+            ]
+        ),
+    )
+    final = Path(out_dir) / f"part-{part_no:05d}.{fmt}"
+    tmp = final.with_suffix(".tmp")
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, tmp, compression="zstd")
+    else:
+        import pyarrow.feather as feather
+
+        feather.write_feather(table, tmp, compression="zstd")
+    os.replace(tmp, final)  # yalnızca tamamlanan parça görünür olur
+    return part_no, table.num_rows
+
+
+# ——— Ana akış ——— #
+def _check_manifest(out_dir, manifest):
+    path = out_dir / "_manifest.json"
+    if path.exists():
+        previous = json.loads(path.read_text(encoding="utf-8"))
+        if previous != manifest:
+            raise SystemExit(
+                f"{out_dir} farklı ayarlarla oluşturulmuş; devam edilemez.\n"
+                f"önceki: {previous}\nşimdiki: {manifest}"
+            )
+    else:
+        path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+
+def run(args):
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # Skorlar canlı yolla aynı olsun diye sunucunun indeks ayarları kullanılır
+    index_opts = dict(
+        pca_dim=args.pca_dim,
+        index_dtype=args.index_dtype,
+        rescore_k=args.rescore_k,
+        shortlist=args.shortlist,
+    )
+    init_args = (
+        args.model,
+        args.threshold,
+        args.catalog,
+        args.mongo_uri,
+        args.decisions_db if Path(args.decisions_db or "").is_file() else None,
+        index_opts,
+    )
+
+    # Manifest için yalnızca katalog okunur; model işçilerde yüklenir
+    from .repository import CourseRepository
+    from .services import score_fingerprint
+    from .textnorm import TextNormalizer
+
+    repo = CourseRepository(src=args.catalog, mongo_uri=args.mongo_uri)
+    asyncio.run(repo.load())
+    # SimilarityService.fingerprint() ile aynı: kısa liste katalogdan kısa değilse kapalı
+    shortlist = args.shortlist if args.shortlist < len(repo._cache) else 0
+    manifest = {
+        "input": str(Path(args.input).resolve()),
+        "chunk_students": args.chunk_students,
+        "format": args.format,
+        "top_k": args.top_k,
+        "threshold": args.threshold,
+        "catalog_version": repo.version,
+        "model": args.model,
+        "fingerprint": score_fingerprint(
+            args.model,
+            dict(
+                pca_dim=args.pca_dim, dtype=args.index_dtype, rescore_k=args.rescore_k
+            ),
+            shortlist,
+        ),
+        "normalization": TextNormalizer.from_env().fingerprint(),
+        "decisions_db": init_args[4],
+    }
+    _check_manifest(out_dir, manifest)
+
+    done = {int(p.stem.split("-")[1]) for p in out_dir.glob(f"part-*.{args.format}")}
+    if done:
+        logger.info("Resuming: %d parts already written", len(done))
+
+    start = time.perf_counter()
+    rows = parts = 0
+    chunks = (
+        (n, chunk)
+        for n, chunk in enumerate(
+            iter_chunks(iter_students(args.input), args.chunk_students)
+        )
+        if n not in done
+    )
+    task_args = (out_dir, args.format, args.top_k)
+
+    if args.workers <= 1:
+        _init_worker(*init_args)
+        for n, chunk in chunks:
+            _, count = _match_chunk(n, chunk, *task_args)
+            rows, parts = rows + count, parts + 1
+    else:
+        # Bellek sabit kalsın diye kuyrukta en fazla 2×işçi parça tutulur
+        with ProcessPoolExecutor(
+            max_workers=args.workers, initializer=_init_worker, initargs=init_args
+        ) as pool:
+            pending = set()
+            for n, chunk in chunks:
+                pending.add(pool.submit(_match_chunk, n, chunk, *task_args))
+                if len(pending) >= args.workers * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for f in finished:
+                        rows, parts = rows + f.result()[1], parts + 1
+            for f in wait(pending).done:
+                rows, parts = rows + f.result()[1], parts + 1
+
+    logger.info(
+        "batch finished: %d new parts, %d rows, %.1f s",
+        parts,
+        rows,
+        time.perf_counter() - start,
+    )
+
+
+def main(argv=None):
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        prog="python -m app.batch", description="Çevrimdışı kohort eşleştirmesi"
+    )
+    parser.add_argument("input", help="Öğrenci dosyası (.jsonl veya .csv)")
+    parser.add_argument("--out", required=True, help="Çıktı dizini")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-students", type=int, default=500)
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=20,
+        help="Ders başına aday sayısı (0 = tüm katalog)",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=float(os.getenv("DEFAULT_THRESHOLD", 0.80)),
+    )
+    parser.add_argument("--model", default=os.getenv("MODEL_NAME", "all-MiniLM-L6-v2"))
+    parser.add_argument("--catalog", default="internal_courses.json")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI"))
+    parser.add_argument(
+        "--pca-dim", type=int, default=int(os.getenv("INDEX_PCA_DIM", 0))
+    )
+    parser.add_argument("--index-dtype", default=os.getenv("INDEX_DTYPE", "float32"))
+    parser.add_argument(
+        "--rescore-k", type=int, default=int(os.getenv("INDEX_RESCORE_K", 50))
+    )
+    parser.add_argument(
+        "--shortlist", type=int, default=int(os.getenv("LEXICAL_SHORTLIST", 0))
+    )
+    parser.add_argument(
+        "--decisions-db",
+        default=os.getenv("DECISIONS_DB", "decisions/decisions.db"),
+        help="Komisyon karar deposu (boş ya da dosya yoksa kararlar uygulanmaz)",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+# app/decisions.py
+"""Komisyonun geçmiş muafiyet kararları için yerel karar deposu.
+
+Her karar (harici ders içeriği, dahili ders kodu, onay/red) SQLite'ta iki
+anahtarla dizinlenir:
+
+* normalize edilmiş içeriğin SHA-256 özeti – birebir aynı içerik için
+* 64 bitlik SimHash imzası – biçim farkları olan neredeyse aynı içerik için.
+  İmza dört 16 bitlik banda bölünür; Hamming uzaklığı ≤ 3 olan iki imza
+  güvercin yuvası ilkesiyle en az bir bantta eşittir, böylece aday araması
+  dizinli eşitlik sorgusuyla yapılır.
+
+``/auto-match`` transformer'dan önce depoya bakar: onaylı kararı olan
+dersler kayıtlı sonuçla (kaynak bilgisiyle birlikte) yanıtlanır, yalnızca
+görülmemiş dersler kodlanır. Yalnızca reddedilmiş çiftler modele gider,
+ancak o çiftler muaf işaretlenmez.
+
+Toplu içe aktarma::
+
+    python -m app.decisions import kararlar.csv --db decisions/decisions.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Container, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .lexical import analyze
+from .textnorm import TextNormalizer
+
+__all__ = ["DecisionStore", "simhash", "hamming"]
+
+logger = logging.getLogger(__name__)
+
+_BANDS = 4
+_BAND_BITS = 64 // _BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+# İmza özellikleri değişince artar (``PRAGMA user_version``)
+_SIGNATURE_VERSION = 1
+TRUE_VALUES = {"1", "true", "yes", "evet", "onay", "approved"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    simhash INTEGER NOT NULL,
+    band0 INTEGER NOT NULL,
+    band1 INTEGER NOT NULL,
+    band2 INTEGER NOT NULL,
+    band3 INTEGER NOT NULL,
+    int_code TEXT NOT NULL,
+    approved INTEGER NOT NULL,
+    ext_code TEXT,
+    university TEXT,
+    decided_by TEXT,
+    decided_at TEXT NOT NULL,
+    source TEXT,
+    note TEXT,
+    UNIQUE (content_hash, int_code)
+);
+CREATE INDEX IF NOT EXISTS decisions_hash ON decisions (content_hash);
+CREATE INDEX IF NOT EXISTS decisions_band0 ON decisions (band0);
+CREATE INDEX IF NOT EXISTS decisions_band1 ON decisions (band1);
+CREATE INDEX IF NOT EXISTS decisions_band2 ON decisions (band2);
+CREATE INDEX IF NOT EXISTS decisions_band3 ON decisions (band3);
+"""
+
+_COLUMNS = (
+    "id, content_hash, simhash, int_code, approved, ext_code, university, "
+    "decided_by, decided_at, source"
+)
+
+
+# ——— İmzalar ——— #
+def simhash(text: str) -> int:
+    """Kök terimler ve ardışık terim çiftleri üzerinden 64 bit SimHash.
+
+    Tek karakterli terimler (``1``, ``2``, ``I``) de özelliktir: yalnızca
+    dizideki sırası farklı derslerin ("Programlama 1/2") imzaları ayrışır.
+    """
+    terms = analyze(text, min_len=1)
+    features = Counter(terms)
+    features.update(f"{a} {b}" for a, b in zip(terms, terms[1:]))
+    if not features:
+        return 0
+    hashes = np.array(
+        [
+            int.from_bytes(
+                hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "big"
+            )
+            for f in features
+        ],
+        dtype=np.uint64,
+    )
+    counts = np.fromiter(features.values(), dtype=np.int64, count=len(features))
+    bits = (hashes[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    weights = ((bits.astype(np.int64) * 2 - 1) * counts[:, None]).sum(axis=0)
+    return int(sum(1 << bit for bit in np.flatnonzero(weights > 0).tolist()))
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _signed(value: int) -> int:
+    # SQLite INTEGER işaretli 64 bittir
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _bands(value: int) -> List[int]:
+    return [(value >> (i * _BAND_BITS)) & _BAND_MASK for i in range(_BANDS)]
+
+
+def _known(rows, codes):
+    if codes is None:
+        return rows
+    return [r for r in rows if r["int_code"] in codes]
+
+
+class DecisionStore:
+    def __init__(
+        self,
+        path,
+        normalizer: Optional[TextNormalizer] = None,
+        max_distance: int = 3,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.normalizer = normalizer or TextNormalizer.from_env()
+        # Bant araması yalnızca ≤ 3 uzaklığı garanti eder
+        self.max_distance = min(max_distance, _BANDS - 1)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        (version,) = self._db.execute("PRAGMA user_version").fetchone()
+        if version < _SIGNATURE_VERSION:
+            # Metin saklanmadığından eski imzalar yeniden hesaplanamaz; birebir
+            # eşleşme etkilenmez, yakın eşleşme için kararlar yeniden aktarılmalı
+            (old,) = self._db.execute("SELECT COUNT(*) FROM decisions").fetchone()
+            if old:
+                logger.warning(
+                    "%d decisions have outdated SimHash signatures; re-import them "
+                    "for near-duplicate matching",
+                    old,
+                )
+            self._db.execute(f"PRAGMA user_version = {_SIGNATURE_VERSION}")
+        self.hits = {"exact": 0, "near": 0}
+
+    def _key(self, normalized):
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    # ——— Yazma ——— #
+    def record_many(self, decisions: Iterable[dict]) -> int:
+        """Kararları ekler; aynı (içerik, dahili kod) için en geç tarihli karar
+        geçerlidir (``decided_at`` ISO 8601; eski tarihli kayıt yenisini ezmez).
+
+        Her kayıt ``ext_content``, ``int_code``, ``approved`` ve isteğe bağlı
+        ``ext_code``, ``university``, ``decided_by``, ``decided_at``,
+        ``source``, ``note`` alanlarını taşır.
+        """
+        rows = []
+        for d in decisions:
+            text = self.normalizer.normalize(d["ext_content"])
+            sig = simhash(text)
+            rows.append(
+                (
+                    self._key(text),
+                    _signed(sig),
+                    *_bands(sig),
+                    d["int_code"],
+                    int(bool(d["approved"])),
+                    d.get("ext_code"),
+                    d.get("university"),
+                    d.get("decided_by"),
+                    d.get("decided_at") or datetime.now().isoformat(),
+                    d.get("source") or "committee",
+                    d.get("note"),
+                )
+            )
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO decisions (content_hash, simhash, band0, band1, band2, "
+                "band3, int_code, approved, ext_code, university, decided_by, "
+                "decided_at, source, note) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?) "
+                "ON CONFLICT (content_hash, int_code) DO UPDATE SET "
+                "approved=excluded.approved, ext_code=excluded.ext_code, "
+                "university=excluded.university, decided_by=excluded.decided_by, "
+                "decided_at=excluded.decided_at, source=excluded.source, "
+                "note=excluded.note "
+                "WHERE excluded.decided_at >= decisions.decided_at",
+                rows,
+            )
+        return len(rows)
+
+    # ——— Okuma ——— #
+    def lookup(
+        self, normalized_texts: List[str], codes: Optional[Container[str]] = None
+    ) -> Dict[int, List[dict]]:
+        """Normalize edilmiş metinler için kararlar: ``{satır: [karar, ...]}``.
+
+        Birebir eşleşme varsa yalnızca o kullanılır; yoksa en yakın SimHash
+        komşusunun kararları döner. Dahili kod başına tek karar kalır.
+        ``codes`` verilirse katalogda artık olmayan derslerin kararları atlanır.
+        """
+        found: Dict[int, List[dict]] = {}
+        with self._lock:
+            for i, text in enumerate(normalized_texts):
+                rows = self._db.execute(
+                    f"SELECT {_COLUMNS} FROM decisions WHERE content_hash = ?",
+                    (self._key(text),),
+                ).fetchall()
+                rows = _known(rows, codes)
+                if rows:
+                    self.hits["exact"] += 1
+                    found[i] = [self._provenance(r, "exact", 0) for r in rows]
+                    continue
+                near = self._near(text, codes)
+                if near:
+                    self.hits["near"] += 1
+                    found[i] = near
+        return found
+
+    def _near(self, text, codes=None):
+        sig = simhash(text)
+        if not sig:
+            return []
+        rows = self._db.execute(
+            f"SELECT {_COLUMNS} FROM decisions WHERE "
+            + " OR ".join(f"band{i} = ?" for i in range(_BANDS)),
+            _bands(sig),
+        ).fetchall()
+        rows = _known(rows, codes)
+        scored = [(hamming(sig, r["simhash"] & ((1 << 64) - 1)), r) for r in rows]
+        scored = [(d, r) for d, r in scored if d <= self.max_distance]
+        if not scored:
+            return []
+        # En yakın içeriğin kararları
+        best = min(d for d, _ in scored)
+        nearest = [r for d, r in scored if d == best]
+        hash_of = min(r["content_hash"] for r in nearest)
+        return [
+            self._provenance(r, "near", best)
+            for r in nearest
+            if r["content_hash"] == hash_of
+        ]
+
+    @staticmethod
+    def _provenance(row, match, distance):
+        return {
+            "int_code": row["int_code"],
+            "approved": bool(row["approved"]),
+            "decision_id": row["id"],
+            "match": match,
+            "distance": distance,
+            "ext_code": row["ext_code"],
+            "university": row["university"],
+            "decided_by": row["decided_by"],
+            "decided_at": row["decided_at"],
+            "source": row["source"],
+        }
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            total, approved = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(approved), 0) FROM decisions"
+            ).fetchone()
+        return {
+            "decisions": total,
+            "approved": approved,
+            "rejected": total - approved,
+            "hits_exact": self.hits["exact"],
+            "hits_near": self.hits["near"],
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# ——— Komut satırı ——— #
+def _read_decisions(path):
+    path = Path(path)
+    with path.open(encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    for r in rows:
+        approved = r["approved"]
+        if isinstance(approved, str):
+            r["approved"] = approved.strip().lower() in TRUE_VALUES
+        r["ext_content"] = r.get("ext_content") or r.get("ext_text") or ""
+        yield r
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m app.decisions", description="Karar deposu"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="JSONL/CSV kararları içe aktar")
+    imp.add_argument("file")
+    # Dahili kodlar katalogla doğrulanır; bilinmeyen kodlu kararlar atlanır
+    imp.add_argument("--internal", default="internal_courses.json")
+    imp.add_argument("--mongo-uri", default=os.getenv("MONGO_URI"))
+    stats = sub.add_parser("stats", help="Depo özetini yazdır")
+    for p in (imp, stats):
+        p.add_argument("--db", default="decisions/decisions.db")
+    args = parser.parse_args(argv)
+
+    store = DecisionStore(args.db)
+    if args.command == "import":
+        from .repository import CourseRepository
+
+        repo = CourseRepository(src=args.internal, mongo_uri=args.mongo_uri)
+        asyncio.run(repo.load())
+        valid, unknown = [], Counter()
+        for d in _read_decisions(args.file):
+            if d["int_code"] in repo._cache:
+                valid.append(d)
+            else:
+                unknown[d["int_code"]] += 1
+        for code, count in sorted(unknown.items()):
+            print(
+                f"uyarı: {code} katalogda yok, {count} karar atlandı", file=sys.stderr
+            )
+        n = store.record_many(valid)
+        print(f"{n} karar içe aktarıldı → {args.db}")
+    print(json.dumps(store.stats(), ensure_ascii=False))
+    store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
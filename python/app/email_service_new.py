@@ -7,6 +7,8 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from typing import Any, Dict, Optional
 
+from .tracing import stage, traced
+
 
 class EmailService:
     """Email service for sending exemption documents and attachments"""
@@ -14,6 +16,8 @@ class EmailService:
     def __init__(self):
         self.smtp_host = os.getenv("SMTP_HOST", "smtp.gmail.com")
         self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
+        # Yerel SMTP (ör. yük testi alıcısı) için STARTTLS kapatılabilir
+        self.smtp_starttls = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
         self.smtp_username = os.getenv("SMTP_USERNAME", "")
         self.smtp_password = os.getenv("SMTP_PASSWORD", "")
         self.from_email = os.getenv("FROM_EMAIL", self.smtp_username)
@@ -34,6 +38,7 @@ class EmailService:
                 "⚠️ Email service başlatıldı: Yapılandırma eksik, DEMO MODE'a geçiliyor"
             )
 
+    @traced("EmailService.send_exemption_email")
     async def send_exemption_email(
         self,
         to_email: str,
@@ -134,6 +139,67 @@ class EmailService:
 
         self.logger.info(f"📧 Sending real email to {to_email}")
 
+        with stage("mime_build"):
+            msg = self._build_message(
+                to_email,
+                student_info,
+                exemption_doc_bytes,
+                transcript_file,
+                course_contents_file,
+                cc_email,
+                custom_message,
+            )
+
+        # Send email using aiosmtplib
+        recipients = [to_email]
+        if cc_email:
+            recipients.append(cc_email)
+
+        try:
+            import aiosmtplib
+
+            with stage("smtp_send"):
+                await aiosmtplib.send(
+                    msg,
+                    hostname=self.smtp_host,
+                    port=self.smtp_port,
+                    start_tls=self.smtp_starttls,
+                    username=self.smtp_username,
+                    password=self.smtp_password,
+                    recipients=recipients,
+                )
+
+            self.logger.info(f"✅ Email sent successfully to {to_email}")
+            return {
+                "success": True,
+                "message": "✅ Email sent successfully",
+                "timestamp": datetime.now().isoformat(),
+                "recipient": to_email,
+                "cc": cc_email,
+                "smtp_host": self.smtp_host,
+            }
+
+        except ImportError:
+            self.logger.warning("⚠️ aiosmtplib not available, falling back to demo mode")
+            return {
+                "success": True,
+                "message": "✅ Email sent successfully (simulated - aiosmtplib not available)",
+                "timestamp": datetime.now().isoformat(),
+                "demo_mode": True,
+            }
+
+    def _build_message(
+        self,
+        to_email: str,
+        student_info: Dict[str, Any],
+        exemption_doc_bytes: bytes,
+        transcript_file: Optional[bytes],
+        course_contents_file: Optional[bytes],
+        cc_email: Optional[str],
+        custom_message: Optional[str],
+    ) -> MIMEMultipart:
+        """Build the MIME message with all attachments"""
+
         # Create email message
         msg = MIMEMultipart()
         msg["From"] = self.from_email
@@ -178,42 +244,7 @@ class EmailService:
             )
             msg.attach(contents_attachment)
 
-        # Send email using aiosmtplib
-        recipients = [to_email]
-        if cc_email:
-            recipients.append(cc_email)
-
-        try:
-            import aiosmtplib
-
-            await aiosmtplib.send(
-                msg,
-                hostname=self.smtp_host,
-                port=self.smtp_port,
-                start_tls=True,
-                username=self.smtp_username,
-                password=self.smtp_password,
-                recipients=recipients,
-            )
-
-            self.logger.info(f"✅ Email sent successfully to {to_email}")
-            return {
-                "success": True,
-                "message": "✅ Email sent successfully",
-                "timestamp": datetime.now().isoformat(),
-                "recipient": to_email,
-                "cc": cc_email,
-                "smtp_host": self.smtp_host,
-            }
-
-        except ImportError:
-            self.logger.warning("⚠️ aiosmtplib not available, falling back to demo mode")
-            return {
-                "success": True,
-                "message": "✅ Email sent successfully (simulated - aiosmtplib not available)",
-                "timestamp": datetime.now().isoformat(),
-                "demo_mode": True,
-            }
+        return msg
 
     def _create_email_body(
         self, student_info: Dict[str, Any], custom_message: Optional[str] = None
@@ -0,0 +1,267 @@
+# app/explain.py
+"""Cümle düzeyinde eşleşme açıklamaları.
+
+Komisyon "bu ders neden %83?" diye sorduğunda, muaf adaylar için harici ve
+dahili içerikten en iyi hizalanan cümle çiftleri döndürülür.
+
+* Katalog cümleleri model/katalog sürümü başına bir kez kodlanır ve bellekte
+  (``float16`` birim vektörler) tutulur. İndeks ilk ihtiyaçta arka planda,
+  model değişimiyle aynı kısılmış kodlamayla (``chunk_size``, ``duty_cycle``)
+  kurulur; hazır olana kadar açıklama istekleri ``"status": "warming"`` alır,
+  istek beklemez. Yeni bir sürüm için kurulum başlarsa eskisi iptal edilir.
+* Harici metnin cümleleri ders ders, bütçe döngüsü içinde kodlanır (küçük
+  bir önbellekle tekrar kodlanmaz); bütçe en fazla bir dersin kodlaması
+  kadar aşılabilir.
+* Bir harici ders için tüm muaf adayların cümleleri tek matris çarpımıyla
+  skorlanır, sonra aday başına dilimlenir.
+* Süre ``budget`` ile sınırlıdır: harici cümle sayısı ve aday sayısı
+  kısıtlanır, bütçe aşılınca kalan dersler atlanır (``truncated``). Geçen
+  süre yanıtta raporlanır.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .cache import TTLCache
+from .model_swap import EncodeCancelled, encode_throttled
+from .tracing import stage
+
+__all__ = ["SentenceExplainer", "split_sentences"]
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+|\n+|\s*[•▪◦●·]\s*")
+_MIN_CHARS = 15
+
+
+def split_sentences(text: str) -> List[str]:
+    """Metni cümlelere/maddelere böler; çok kısa parçalar atılır."""
+    parts = (p.strip(" \t-*,;:") for p in _SENTENCE_RE.split(text or ""))
+    return [p for p in dict.fromkeys(parts) if len(p) >= _MIN_CHARS]
+
+
+class _CatalogSentences:
+    """Bir (model, katalog) için tüm ders cümleleri ve birim gömmeleri."""
+
+    def __init__(self, key, sentences, unit, spans):
+        self.key = key
+        self.sentences = sentences
+        self.unit = unit  # (S × d) float16
+        self.spans = spans  # kod → (başlangıç, bitiş)
+
+
+class SentenceExplainer:
+    def __init__(
+        self,
+        normalizer,
+        repo,
+        pairs: int = 3,
+        max_sentences: int = 30,
+        max_candidates: int = 3,
+        budget: float = 0.25,
+        cache_size: int = 1024,
+        chunk_size: int = 64,
+        duty_cycle: float = 0.25,
+    ):
+        self.normalizer = normalizer
+        # Ham içerikler ``repo.contents(sürüm)`` ile duruma ait sürümden okunur
+        self._repo = repo
+        self.chunk_size = chunk_size
+        self.duty_cycle = duty_cycle
+        self.pairs = pairs
+        self.max_sentences = max_sentences
+        self.max_candidates = max_candidates
+        self.budget = budget
+        self._index: Optional[_CatalogSentences] = None
+        self._building: Optional[Tuple[str, str]] = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._ext_cache = TTLCache(max_size=cache_size, ttl=3600)
+
+    # ——— Katalog indeksi ——— #
+    def ready(self, state) -> bool:
+        index = self._index
+        return index is not None and index.key == (
+            state.model_name,
+            state.catalog_version,
+        )
+
+    def index_for(self, state) -> Optional[_CatalogSentences]:
+        """Duruma ait indeks; yoksa arka planda kurulmaya başlanır ve ``None`` döner."""
+        key = (state.model_name, state.catalog_version)
+        index = self._index
+        if index is not None and index.key == key:
+            return index
+        # Katalog yeniden yüklendiyse içerikler bu duruma ait değildir; kurulum
+        # yeni durumla gelen ilk isteğe kalır
+        contents = self._repo.contents(state.catalog_version)
+        if contents is None:
+            return None
+        with self._lock:
+            if self._building != key:
+                self._cancel.set()  # eski sürümün kurulumu boşuna sürmesin
+                self._cancel = threading.Event()
+                self._building = key
+                threading.Thread(
+                    target=self._build,
+                    args=(state, key, contents, self._cancel),
+                    name="sentence-index",
+                    daemon=True,
+                ).start()
+        return None
+
+    def _build(self, state, key, contents, cancel):
+        start = time.perf_counter()
+        try:
+            sentences, spans = [], {}
+            for code in state.codes:
+                parts = self._sentences(contents.get(code, ""), limit=None)
+                spans[code] = (len(sentences), len(sentences) + len(parts))
+                sentences.extend(parts)
+            unit = self._encode_catalog(state.model, [s for s, _ in sentences], cancel)
+            index = _CatalogSentences(
+                key, [s for _, s in sentences], unit.astype(np.float16), spans
+            )
+        except EncodeCancelled:
+            logger.info("Sentence index build for %s cancelled", key)
+            return
+        except Exception:
+            logger.exception("Sentence index build failed")
+            with self._lock:
+                self._building = None
+            return
+        with self._lock:
+            if self._building == key:
+                self._index = index  # eski indeks bırakılır
+                self._building = None
+        logger.info(
+            "Sentence index built: %d cümle, %.1f s",
+            len(sentences),
+            time.perf_counter() - start,
+        )
+
+    def _sentences(self, text, limit):
+        """(normalize cümle, görüntülenecek cümle) çiftleri."""
+        raw = split_sentences(text)
+        normalized = self.normalizer.normalize_many(raw)
+        out = [(n, r) for n, r in zip(normalized, raw) if len(n) >= _MIN_CHARS]
+        return out if limit is None else out[:limit]
+
+    def _encode_catalog(self, model, texts, cancel):
+        """Katalog cümleleri kısılmış hızda, parça parça kodlanır."""
+        if not texts:
+            return np.zeros((0, 1), dtype=np.float32)
+        embs = np.asarray(
+            encode_throttled(
+                model,
+                texts,
+                self.chunk_size,
+                self.duty_cycle,
+                cancel,
+                stage_name="explain_index_encode",
+            ),
+            np.float32,
+        )
+        norms = np.linalg.norm(embs, axis=1, keepdims=True)
+        return embs / np.where(norms == 0, 1.0, norms)
+
+    @staticmethod
+    def _encode(model, texts):
+        if not texts:
+            return np.zeros((0, 1), dtype=np.float32)
+        with stage("encode"):
+            embs = np.asarray(model.encode(texts, convert_to_numpy=True), np.float32)
+        norms = np.linalg.norm(embs, axis=1, keepdims=True)
+        return embs / np.where(norms == 0, 1.0, norms)
+
+    # ——— İstek ——— #
+    def explain(self, state, ext_texts: Dict[int, str], candidates):
+        """``{(satır, dahili kod): [cümle çifti]}`` ve süre raporu.
+
+        ``ext_texts`` açıklanacak satırların ham içerikleri, ``candidates``
+        ``{satır: [dahili kod, ...]}`` (skora göre azalan) sözlüğüdür.
+        """
+        start = time.perf_counter()
+        report = {"status": "ready", "explained": 0, "truncated": False}
+        index = self.index_for(state)
+        if index is None:
+            report["status"] = "warming"
+            return {}, self._finish(report, start)
+        out: Dict[Tuple[int, str], List[dict]] = {}
+        with stage("explain"):
+            for i, codes in candidates.items():
+                if time.perf_counter() - start > self.budget:
+                    report["truncated"] = True
+                    break
+                if i not in ext_texts:
+                    continue
+                sentences, unit = self._ext_sentences(state, ext_texts[i])
+                if not sentences:
+                    continue
+                codes = codes[: self.max_candidates]
+                spans = [index.spans.get(c, (0, 0)) for c in codes]
+                rows = np.concatenate([np.arange(a, b) for a, b in spans])
+                if not len(rows):
+                    continue
+                # Adayların tüm cümleleri tek çarpımla skorlanır
+                sims = unit @ index.unit[rows].astype(np.float32).T
+                offset = 0
+                for code, (a, b) in zip(codes, spans):
+                    block = sims[:, offset : offset + (b - a)]
+                    offset += b - a
+                    if block.size:
+                        out[(i, code)] = self._align(
+                            block, sentences, index.sentences[a:b]
+                        )
+                        report["explained"] += 1
+        return out, self._finish(report, start)
+
+    def _ext_sentences(self, state, text):
+        """(görüntülenecek cümleler, birim gömmeler); en fazla ``max_sentences``."""
+        key = hashlib.sha256(f"{state.model_name}\0{text}".encode("utf-8")).hexdigest()
+        with self._lock:
+            cached = self._ext_cache.get(key)
+        if cached is not None:
+            return cached
+        parts = self._sentences(text, self.max_sentences)
+        entry = (
+            [r for _, r in parts],
+            self._encode(state.model, [n for n, _ in parts]),
+        )
+        with self._lock:
+            self._ext_cache.set(key, entry)
+        return entry
+
+    def _align(self, block, ext_sentences, int_sentences):
+        """En yüksek skorlu, cümleleri tekrarlamayan ilk ``pairs`` çift."""
+        flat = np.argsort(-block, axis=None)
+        used_ext, used_int, pairs = set(), set(), []
+        for pos in flat.tolist():
+            e, n = divmod(pos, block.shape[1])
+            if e in used_ext or n in used_int:
+                continue
+            used_ext.add(e)
+            used_int.add(n)
+            pairs.append(
+                {
+                    "ext_sentence": ext_sentences[e],
+                    "int_sentence": int_sentences[n],
+                    "percent": round(float(block[e, n]) * 100, 2),
+                }
+            )
+            if len(pairs) == self.pairs:
+                break
+        return pairs
+
+    @staticmethod
+    def _finish(report, start):
+        report["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return report
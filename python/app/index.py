@@ -0,0 +1,165 @@
+# app/index.py
+"""Katalog gömmeleri için sıkıştırılmış indeks.
+
+Katalog birim vektörleri isteğe bağlı olarak:
+
+* PCA ile ``pca_dim`` boyuta indirgenir (merkezlenmemiş; böylece indirgenmiş
+  uzaydaki iç çarpım, özgün kosinüsün alt uzaydaki izdüşümüdür), ve/veya
+* ``float16`` ya da satır başına ölçekli ``int8`` olarak saklanır.
+
+Sorgular önce sıkıştırılmış biçimde skorlanır; her sorgu için en yüksek
+``rescore_k`` aday tam hassasiyetli vektörlerle yeniden skorlanır. Satırın
+geri kalanı yaklaşık (PCA/nicemlenmiş) skorunu korur ve yanıtlarda ayrıca
+işaretlenmez. Tam
+hassasiyetli vektörler ``store_path`` verilirse diskte ``np.memmap`` olarak
+tutulur; yalnızca kısa listedeki satırlar belleğe okunur.
+
+Oluşturma sırasında katalogdan alınan örnek sorgularla tam indekse göre
+doğruluk farkı ölçülür ve ``report`` içinde verilir.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+__all__ = ["CompactIndex", "DTYPES"]
+
+DTYPES = ("float32", "float16", "int8")
+_BLOCK = 4096  # sıkıştırılmış satırlar bu boyutta float32'ye açılır
+
+
+class CompactIndex:
+    def __init__(
+        self,
+        unit: np.ndarray,
+        pca_dim: int = 0,
+        dtype: str = "float32",
+        rescore_k: int = 50,
+        store_path: Optional[Path] = None,
+    ):
+        if dtype not in DTYPES:
+            raise ValueError(f"Geçersiz indeks tipi: {dtype} (seçenekler: {DTYPES})")
+        unit = np.ascontiguousarray(unit, dtype=np.float32)
+        self.size, self.dim = unit.shape
+        self.dtype = dtype
+        self.rescore_k = max(1, rescore_k)
+
+        # 1) PCA: Gram matrisinin özvektörleri (N×D SVD'den ucuz, O(N·D²))
+        self.projection = None
+        self.explained_variance = 1.0
+        reduced = unit
+        if 0 < pca_dim < self.dim:
+            eigvals, eigvecs = np.linalg.eigh(unit.T @ unit)
+            top = np.argsort(eigvals)[::-1][:pca_dim]
+            self.projection = np.ascontiguousarray(eigvecs[:, top], dtype=np.float32)
+            self.explained_variance = float(
+                eigvals[top].sum() / max(eigvals.sum(), 1e-12)
+            )
+            reduced = unit @ self.projection
+
+        # 2) Niceleme
+        self.scales = None
+        if dtype == "int8":
+            scales = np.abs(reduced).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self.codes = np.round(reduced / scales[:, None]).astype(np.int8)
+            self.scales = scales.astype(np.float32)
+        else:
+            self.codes = np.ascontiguousarray(reduced, dtype=np.dtype(dtype))
+
+        # 3) Yeniden skorlama için tam hassasiyet
+        if store_path is not None:
+            store_path = Path(store_path)
+            store_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = store_path.with_name(f"{store_path.name}.{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, unit)
+            os.replace(tmp, store_path)
+            self.full = np.load(store_path, mmap_mode="r")
+        else:
+            self.full = unit
+
+        self.report = self._measure(unit)
+
+    # ——— Skorlama ——— #
+    def approx(self, queries: np.ndarray) -> np.ndarray:
+        """Birim sorgu vektörleri için yaklaşık kosinüs matrisi (n_q × N)."""
+        q = queries.astype(np.float32, copy=False)
+        if self.projection is not None:
+            q = q @ self.projection
+        out = np.empty((len(q), self.size), dtype=np.float32)
+        for start in range(0, self.size, _BLOCK):
+            block = self.codes[start : start + _BLOCK]
+            if block.dtype != np.float32:
+                block = block.astype(np.float32)
+            out[:, start : start + _BLOCK] = q @ block.T
+        if self.scales is not None:
+            out *= self.scales
+        return out
+
+    def rescore(self, queries: np.ndarray, approx: np.ndarray) -> np.ndarray:
+        """Her satırın en yüksek ``rescore_k`` adayını tam hassasiyetle yazar."""
+        k = min(self.rescore_k, self.size)
+        idx = np.argpartition(-approx, k - 1, axis=1)[:, :k]
+        exact = np.einsum(
+            "qd,qkd->qk", queries.astype(np.float32, copy=False), self.full[idx]
+        )
+        np.put_along_axis(approx, idx, exact, axis=1)
+        return approx
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        return self.rescore(queries, self.approx(queries))
+
+    # ——— Oluşturma raporu ——— #
+    @property
+    def nbytes(self) -> int:
+        extra = 0 if self.scales is None else self.scales.nbytes
+        if self.projection is not None:
+            extra += self.projection.nbytes
+        return self.codes.nbytes + extra
+
+    def _measure(self, unit, sample=256, k=10) -> Dict[str, float]:
+        """Katalog satırlarını sorgu olarak kullanıp tam indeksle karşılaştırır.
+
+        Her sorgunun kendisi sonuçtan çıkarılır (kendisiyle eşleşmesi önemsiz).
+        """
+        rng = np.random.default_rng(0)
+        rows = np.sort(rng.choice(self.size, min(sample, self.size), replace=False))
+        queries = unit[rows]
+        exact = queries @ unit.T
+        approx = self.approx(queries)
+        approx_error = float(np.mean(np.abs(approx - exact)))
+        final = self.rescore(queries, approx.copy())
+
+        own = (np.arange(len(rows)), rows)
+        exact[own] = final[own] = approx[own] = -np.inf
+        k = min(k, self.size - 1)
+        if k < 1:
+            return {"sample_queries": len(rows)}
+        exact_top = np.argsort(-exact, axis=1)[:, :k]
+        shortlist = np.argpartition(
+            -approx, min(self.rescore_k, self.size) - 1, axis=1
+        )[:, : self.rescore_k]
+        final_top = np.argsort(-final, axis=1)[:, :k]
+        recall = np.mean([np.isin(e, s).mean() for e, s in zip(exact_top, shortlist)])
+        overlap = np.mean([np.isin(e, f).mean() for e, f in zip(exact_top, final_top)])
+        top1 = np.mean(exact_top[:, 0] == final_top[:, 0])
+        full_bytes = self.size * self.dim * 4
+        return {
+            "pca_dim": 0 if self.projection is None else self.projection.shape[1],
+            "dtype": self.dtype,
+            "rescore_k": self.rescore_k,
+            "explained_variance": round(self.explained_variance, 4),
+            "sample_queries": len(rows),
+            "approx_mean_abs_error": round(approx_error, 5),
+            f"shortlist_recall_at_{k}": round(float(recall), 4),
+            f"top{k}_overlap": round(float(overlap), 4),
+            "top1_agreement": round(float(top1), 4),
+            "index_mb": round(self.nbytes / (1 << 20), 3),
+            "full_mb": round(full_bytes / (1 << 20), 3),
+            "compression": round(full_bytes / max(self.nbytes, 1), 2),
+        }
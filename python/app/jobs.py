@@ -0,0 +1,227 @@
+# app/jobs.py
+"""Kohort boyutundaki eşleştirme işleri için arka plan iş yöneticisi.
+
+Bir iş, birden çok öğrencinin harici ders listelerini içerir. Tüm
+öğrencilerin metinleri birlikte tekilleştirilir ve parça parça kodlanır;
+ortak dersler (aynı üniversiteden gelen öğrenciler) yalnızca bir kez
+kodlanır. Durum ve sonuçlar yerel diske yazılır, yeniden başlatmada
+tamamlanmış işler okunmaya devam eder.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .serialization import auto_match_payload, dumps_json
+
+__all__ = ["JobManager", "JobNotFound"]
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobNotFound(KeyError):
+    pass
+
+
+class JobManager:
+    """İşleri ``ThreadPoolExecutor`` üzerinde çalıştırır ve diske kaydeder."""
+
+    def __init__(
+        self,
+        get_service: Callable[[], Any],
+        jobs_dir: str = "jobs",
+        max_workers: int = 1,
+        batch_size: int = 256,
+        slot: Callable[[], ContextManager] = contextlib.nullcontext,
+        decisions: Optional[Callable[[List[str], Any], Dict[int, List[dict]]]] = None,
+    ):
+        """``slot`` her kodlama parçasını saran bağlam (ör. kabul kontrolü yuvası).
+
+        ``decisions(metinler, durum)`` normalize metinler için kayıtlı komisyon
+        kararlarını döndürür (``{metin indeksi: [karar]}``); onaylı kararı olan
+        metinler kodlanmaz.
+        """
+        self._get_service = get_service
+        self._slot = slot
+        self._decisions = decisions
+        self.jobs_dir = Path(jobs_dir)
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="match-job"
+        )
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    # ——— Durum kalıcılığı ——— #
+    def _job_dir(self, job_id: str) -> Path:
+        return self.jobs_dir / job_id
+
+    def _write_status(self, job_id: str, **changes) -> Dict[str, Any]:
+        path = self._job_dir(job_id) / "status.json"
+        with self._lock:
+            status = self._status[job_id]
+            status.update(changes)
+            snapshot = dict(status)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(snapshot, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(path)
+        return snapshot
+
+    def restore(self):
+        """Diskteki işleri yükler; yarım kalanları başarısız işaretler.
+
+        Yalnızca süreç başlangıcında (startup) çağrılmalıdır: içe aktarmada
+        çalışırsa aynı dizini kullanan canlı bir sunucunun işlerini bozar.
+        """
+        if not self.jobs_dir.exists():
+            return
+        for path in self.jobs_dir.glob("*/status.json"):
+            status = json.loads(path.read_text(encoding="utf-8"))
+            self._status[status["job_id"]] = status
+            # Süreç yeniden başladığında yarım kalan işler kurtarılamaz
+            if status["state"] in (QUEUED, RUNNING):
+                self._write_status(
+                    status["job_id"],
+                    state=FAILED,
+                    error="Sunucu yeniden başlatıldı; iş yarıda kaldı",
+                )
+
+    # ——— Genel API ——— #
+    def submit(self, students: List[Tuple[str, List[Tuple[str, str]]]]) -> Dict:
+        """``students`` = [(öğrenci_id, [(ext_code, ext_content), ...]), ...]"""
+        job_id = uuid.uuid4().hex
+        self._job_dir(job_id).mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._status[job_id] = {
+                "job_id": job_id,
+                "state": QUEUED,
+                "progress": 0.0,
+                "students": len(students),
+                "courses": sum(len(items) for _, items in students),
+                "unique_texts": None,
+                "created_at": datetime.now().isoformat(),
+                "finished_at": None,
+                "error": None,
+            }
+        snapshot = self._write_status(job_id)
+        self._executor.submit(self._run, job_id, students)
+        return snapshot
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        with self._lock:
+            if job_id not in self._status:
+                raise JobNotFound(job_id)
+            return dict(self._status[job_id])
+
+    def result_path(self, job_id: str) -> Optional[Path]:
+        if self.status(job_id)["state"] != DONE:
+            return None
+        return self._job_dir(job_id) / "result.json"
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    # ——— Çalıştırma ——— #
+    def _run(self, job_id, students):
+        try:
+            self._write_status(job_id, state=RUNNING)
+            svc = self._get_service()
+            state = svc.state  # iş boyunca tek model (model değişimi olsa bile)
+
+            # 1) Tüm öğrencilerin metinleri normalize edilip tekilleştirilir
+            normalized = iter(
+                svc.normalizer.normalize_many(
+                    (content for _, items in students for _, content in items), "jobs"
+                )
+            )
+            students = [
+                (student_id, [(code, next(normalized)) for code, _ in items])
+                for student_id, items in students
+            ]
+            index: Dict[str, int] = {}
+            for _, items in students:
+                for _, content in items:
+                    index.setdefault(content, len(index))
+            texts = list(index)
+            self._write_status(job_id, unique_texts=len(texts))
+
+            # 2) Onaylı kararı olan metinler kodlanmaz (/auto-match ile aynı kural)
+            decisions = self._decisions(texts, state) if self._decisions else {}
+            served = {
+                i for i, recs in decisions.items() if any(r["approved"] for r in recs)
+            }
+            pending = [i for i in range(len(texts)) if i not in served]
+            rows = np.zeros((len(texts), len(state.codes)), dtype=np.float32)
+
+            # 3) Parça parça kodlanır, ilerleme her parçadan sonra yazılır
+            for offset in range(0, len(pending), self.batch_size):
+                part = pending[offset : offset + self.batch_size]
+                with self._slot():
+                    rows[part] = svc.auto_match(
+                        [texts[i] for i in part], state=state, normalized=True
+                    )
+                done = min(offset + self.batch_size, len(pending))
+                self._write_status(job_id, progress=round(done / len(pending), 4))
+
+            # 4) Öğrenci başına sonuçlar tek dosyada toplanır
+            results = []
+            for student_id, items in students:
+                if not items:
+                    results.append({"student_id": student_id, "results": []})
+                    continue
+                positions = [index[content] for _, content in items]
+                decided = {
+                    n: decisions[i] for n, i in enumerate(positions) if i in decisions
+                }
+                payload = auto_match_payload(
+                    [code for code, _ in items],
+                    state.codes,
+                    rows[positions],
+                    svc.threshold,
+                    decided,
+                    {n for n, i in enumerate(positions) if i in served},
+                )
+                results.append({"student_id": student_id, **payload})
+
+            (self._job_dir(job_id) / "result.json").write_bytes(
+                dumps_json(
+                    {
+                        "job_id": job_id,
+                        "catalog_version": state.catalog_version,
+                        "model": state.model_name,
+                        "students": results,
+                    }
+                )
+            )
+            self._write_status(
+                job_id,
+                state=DONE,
+                progress=1.0,
+                finished_at=datetime.now().isoformat(),
+            )
+            logger.info(
+                "job %s finished: %d students, %d unique texts",
+                job_id,
+                len(students),
+                len(texts),
+            )
+        except Exception as e:
+            logger.error("job %s failed: %s", job_id, str(e))
+            self._write_status(
+                job_id,
+                state=FAILED,
+                error=str(e),
+                finished_at=datetime.now().isoformat(),
+            )
@@ -0,0 +1,178 @@
+# app/lexical.py
+"""Katalog üzerinde BM25 ters indeksi.
+
+İki amaçla kullanılır:
+
+* **Yedek eşleştirme** – transformer modeli henüz yüklenirken ya da
+  ``/auto-match`` yük altında reddedileceği zaman milisaniyeler içinde
+  sözcüksel skorlarla yanıt verilir (yanıt ``"mode": "lexical"`` ile işaretlenir).
+* **Kısa liste** – çok büyük kataloglarda anlamsal skorlama yalnızca her
+  sorgunun sözcüksel olarak en yakın ``k`` dersi üzerinde yapılır.
+
+Çözümleme Türkçe'ye göredir: ``I → ı``, ``İ → i`` küçültme, durak sözcükleri,
+çekim eklerini atan hafif bir kök bulucu ve son olarak ASCII katlama
+(``yazılım`` ile ``yazilim`` aynı terimdir). ``normalizer`` verilirse katalog
+metinleri önce onunla işlenir; sorgular da aynı biçimde normalize edilmiş
+olmalıdır.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .textnorm import turkish_lower
+
+__all__ = ["LexicalIndex", "analyze", "stem", "turkish_lower"]
+
+_TOKEN_RE = re.compile(r"\w+")
+_ASCII_FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+
+STOPWORDS = frozenset("""
+    acaba ama ancak bazı belki bile bir biri birkaç bu bunlar bunu bunun çok
+    çünkü da daha de defa diye en gibi göre hem her hep için ile ise kadar ki
+    mi mı mu mü nasıl ne neden olan olarak olup veya ve ya yani şu şey tüm
+    üzerine üzerinde sonra önce aynı arasında ayrıca
+    a an and are as at be by for from in into is it of on or that the their
+    this to with within using use via
+    """.split())
+
+# Uzundan kısaya; ilk eşleşen atılır. Çekim ekleri (çoğul, hâl, iyelik) ve
+# ders tanımlarında sık geçen -sal/-sel yapım eki.
+_SUFFIXES = tuple(
+    sorted(
+        """
+        ların lerin ları leri lar ler
+        nın nin nun nün ın in un ün
+        ndan nden dan den tan ten
+        nda nde da de ta te
+        na ne ya ye yı yi yu yü nı ni nu nü
+        sı si su sü
+        sal sel
+        ı i u ü a e
+        """.split(),
+        key=len,
+        reverse=True,
+    )
+)
+_MIN_STEM = 3
+
+
+def stem(word: str, passes: int = 2) -> str:
+    """Sondan en fazla ``passes`` ek atar; kök ``_MIN_STEM`` harften kısalmaz."""
+    for _ in range(passes):
+        for suffix in _SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= _MIN_STEM:
+                word = word[: -len(suffix)]
+                break
+        else:
+            break
+    return word
+
+
+def analyze(text: str, min_len: int = 2) -> List[str]:
+    """Metni indeks terimlerine çevirir; ``min_len``'den kısa sözcükler atılır."""
+    terms = []
+    for token in _TOKEN_RE.findall(turkish_lower(text or "")):
+        if len(token) < min_len or token in STOPWORDS:
+            continue
+        if not token.isdigit():
+            token = stem(token)
+        terms.append(token.translate(_ASCII_FOLD))
+    return terms
+
+
+class LexicalIndex:
+    def __init__(
+        self,
+        docs: Dict[str, str],
+        version: Optional[str] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+        normalizer=None,
+    ):
+        start = time.perf_counter()
+        if normalizer is not None:
+            docs = dict(zip(docs, normalizer.normalize_many(docs.values())))
+        self.codes = list(docs.keys())
+        self.version = version
+        self.k1 = k1
+        size = len(self.codes)
+
+        counts = [Counter(analyze(text)) for text in docs.values()]
+        lengths = np.array([sum(c.values()) for c in counts], dtype=np.float32)
+        avg_len = float(lengths.mean()) if size and lengths.any() else 1.0
+        norm = k1 * (1 - b + b * lengths / avg_len)
+
+        postings: Dict[str, tuple] = {}
+        for doc, counter in enumerate(counts):
+            for term, tf in counter.items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(doc)
+                postings[term][1].append(tf)
+
+        # Terim → (belge indeksleri, BM25 ağırlıkları); sorguda yalnızca toplanır
+        self._postings: Dict[str, tuple] = {}
+        self._idf: Dict[str, float] = {}
+        for term, (doc_ids, tfs) in postings.items():
+            doc_ids = np.array(doc_ids, dtype=np.int32)
+            tfs = np.array(tfs, dtype=np.float32)
+            idf = self._idf_of(size, len(doc_ids))
+            weights = idf * tfs * (k1 + 1) / (tfs + norm[doc_ids])
+            self._postings[term] = (doc_ids, weights.astype(np.float32))
+            self._idf[term] = idf
+        self._unseen_idf = self._idf_of(size, 0)
+
+        self.report = {
+            "documents": size,
+            "terms": len(self._postings),
+            "avg_doc_terms": round(avg_len, 1),
+            "build_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    @staticmethod
+    def _idf_of(size, df):
+        return math.log(1 + (size - df + 0.5) / (df + 0.5))
+
+    @classmethod
+    def from_repo(cls, repo, **kwargs) -> "LexicalIndex":
+        return cls(dict(repo._cache), version=repo.version, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    # ——— Skorlama ——— #
+    def scores(self, queries: Iterable[str]) -> np.ndarray:
+        """Sorgu × katalog skor matrisi, [0, 1] aralığında.
+
+        Her satır, sorgu terimlerinin tamamını doygun sıklıkta içeren bir
+        belgenin alacağı üst sınıra bölünür; böylece skorlar sorgular
+        arasında karşılaştırılabilir olur (kosinüs ile aynı ölçek değildir).
+        """
+        queries = list(queries)
+        out = np.zeros((len(queries), len(self.codes)), dtype=np.float32)
+        for i, query in enumerate(queries):
+            bound = 0.0
+            for term in set(analyze(query)):
+                posting = self._postings.get(term)
+                if posting is None:
+                    bound += self._unseen_idf
+                    continue
+                doc_ids, weights = posting
+                out[i, doc_ids] += weights  # terim başına belge tekildir
+                bound += self._idf[term]
+            if bound:
+                out[i] /= bound * (self.k1 + 1)
+        return out
+
+    def top_k(self, queries: Iterable[str], k: int):
+        """Her sorgu için en yüksek ``k`` belge: (indeksler, herhangi bir eşleşme var mı)."""
+        scores = self.scores(queries)
+        k = min(k, len(self.codes))
+        idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        return idx, scores.max(axis=1, initial=0.0) > 0
@@ -0,0 +1,106 @@
+# app/live.py
+"""Elle ders girişi için WebSocket üzerinden canlı eşleştirme.
+
+İstemci yazılan içeriği her tuş vuruşu grubunda gönderir; sunucu alan başına
+``debounce`` saniye yeni metin gelmesini bekler, metin durulunca kodlar ve en
+yakın dahili dersleri geri iter. Yeni metin geldiğinde:
+
+* bekleyen (henüz kodlanmamış) hesaplama iptal edilir;
+* kodlaması sürmekte olan hesaplamanın sonucu atılır. İş parçacığındaki
+  kodlama yarıda kesilemez; iptal edilen görev yuvayı kodlama gerçekten
+  bitene kadar tutar, böylece bağlantı başına aynı anda en fazla bir kodlama
+  çalışır ve bekleyenler ancak ondan sonra başlar.
+
+Normalize metni son gönderilenle aynı olan güncellemeler (ör. boşluk ya da
+büyük/küçük harf düzeltmesi) kodlanmaz.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict
+
+__all__ = ["LiveMatchChannel", "new_stats"]
+
+logger = logging.getLogger(__name__)
+
+
+def new_stats() -> Dict[str, int]:
+    return {"received": 0, "superseded": 0, "encoded": 0, "unchanged": 0}
+
+
+class LiveMatchChannel:
+    def __init__(
+        self,
+        send: Callable[[dict], Awaitable[None]],
+        normalize: Callable[[str], str],
+        score: Callable[[str], Awaitable[dict]],
+        debounce: float = 0.3,
+        max_fields: int = 64,
+        stats: Dict[str, int] = None,
+    ):
+        self._send = send
+        self._normalize = normalize
+        self._score = score
+        self.debounce = debounce
+        self.max_fields = max_fields
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._last: Dict[str, str] = {}
+        self._seq: Dict[str, int] = {}
+        # Bağlantı başına tek kodlama; gönderimler birbirine karışmasın
+        self._encode_lock = asyncio.Lock()
+        self._send_lock = asyncio.Lock()
+        # Verilirse tüm bağlantıların ortak sayaçları
+        self.stats = stats if stats is not None else new_stats()
+
+    def submit(self, field: str, text: str) -> bool:
+        """Alanın yeni metnini sıraya alır; alan sınırı aşılırsa ``False``."""
+        if field not in self._seq and len(self._seq) >= self.max_fields:
+            return False
+        self.stats["received"] += 1
+        seq = self._seq[field] = self._seq.get(field, 0) + 1
+        task = self._pending.pop(field, None)
+        if task is not None and not task.done():
+            task.cancel()
+            self.stats["superseded"] += 1
+        self._pending[field] = asyncio.create_task(self._run(field, seq, text))
+        return True
+
+    async def _run(self, field, seq, text):
+        await asyncio.sleep(self.debounce)
+        text = self._normalize(text)
+        if self._last.get(field) == text:
+            self.stats["unchanged"] += 1
+            return
+        async with self._encode_lock:
+            job = asyncio.ensure_future(self._score(text))
+            try:
+                result = await asyncio.shield(job)
+            except asyncio.CancelledError:
+                # İptal yalnızca beklemeyi bırakır; kodlama bitene kadar yuva tutulur
+                await asyncio.wait({job})
+                if not job.cancelled() and job.exception() is not None:
+                    logger.warning("superseded live match failed: %s", job.exception())
+                raise
+            except Exception:
+                logger.exception("live match failed")
+                result = {"type": "error", "detail": "Eşleştirme başarısız"}
+        if self._seq.get(field) != seq:
+            return  # bu arada yeni metin geldi
+        self.stats["encoded"] += 1
+        if result.get("type") == "matches":
+            self._last[field] = text
+        async with self._send_lock:
+            await self._send({**result, "id": field, "seq": seq})
+
+    async def send(self, message: dict):
+        async with self._send_lock:
+            await self._send(message)
+
+    async def close(self):
+        tasks = [t for t in self._pending.values() if not t.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._pending.clear()
@@ -1,26 +1,86 @@
+import asyncio
+import contextlib
+import hashlib
+import json
 import logging
+import math
 import os
+import random
 import time
 
 import numpy as np
 from dotenv import load_dotenv
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi import (
+    Depends,
+    FastAPI,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import (
+    FileResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
 
+from .admission import BATCH, INTERACTIVE, AdmissionController, AdmissionRejected
+from .cache import SingleFlight, TTLCache, canonical_key
+from .decisions import DecisionStore
 from .email_service_new import EmailService
+from .explain import SentenceExplainer
+from .jobs import JobManager, JobNotFound
+from .lexical import LexicalIndex
+from .live import LiveMatchChannel
+from .live import new_stats as new_live_stats
+from .metrics import REGISTRY
+from .metrics import render as render_metrics
+from .model_swap import ModelSwapper, SwapError
 from .models import (
     AutoMatchRequest,
     AutoMatchResponse,
     AutoMatchResult,
+    BulkSimilarityRequest,
+    BulkSimilarityResponse,
+    BulkSimilarityResult,
+    CohortJobRequest,
+    CourseSearchResponse,
+    DecisionImportRequest,
     EmailRequest,
     EmailResponse,
-    MatchCandidate,
+    JobStatus,
+    MatchResponse,
+    MatchSessionDelta,
+    MatchSessionResponse,
+    ModelSwapRequest,
+    ParsedCourse,
     PdfGenerationRequest,
     PdfGenerationResponse,
 )
+from .partners import PartnerStore
+from .profiling import RequestProfiler, list_profiles, run_in_threadpool
 from .repository import CourseRepository
-from .services import PdfGenerationService, SimilarityService
+from .score_store import ScoreStore
+from .search import CatalogSearch
+from .serialization import (
+    auto_match_payload,
+    compress_body,
+    dumps_json,
+    negotiate_format,
+    render_auto_match,
+)
+from .services import PdfGenerationService, SimilarityService, score_fingerprint
+from .sessions import MatchSession, new_session_id
+from .textnorm import TextNormalizer
+from .tracing import TraceFileExporter, TracingMiddleware, stage
+from .transcript_parser import TranscriptParserPool, normalize_code
 
 # .env dosyasını yükle
 load_dotenv()
@@ -29,6 +89,55 @@ load_dotenv()
 DEFAULT_THRESHOLD = float(os.getenv("DEFAULT_THRESHOLD", 0.80))
 MODEL_NAME = os.getenv("MODEL_NAME", "all-MiniLM-L6-v2")
 MONGO_URI = os.getenv("MONGO_URI")  # Yoksa JSON kullanılır
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", 0)) or None  # 0 ⇒ CPU sayısına göre
+PDF_CACHE_SIZE = int(os.getenv("PDF_CACHE_SIZE", 256))
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", 8))
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))  # bayt
+MATCH_CACHE_SIZE = int(os.getenv("MATCH_CACHE_SIZE", 512))
+MATCH_CACHE_TTL = float(os.getenv("MATCH_CACHE_TTL", 900))  # saniye
+JOBS_DIR = os.getenv("JOBS_DIR", "jobs")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 1))
+JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", 256))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0.0))  # 0.0–1.0
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 5))
+TRACE_FILE = os.getenv("TRACE_FILE", "traces/spans.jsonl")  # Boş ⇒ dışa aktarma yok
+TRACE_FILE_MAX_MB = int(os.getenv("TRACE_FILE_MAX_MB", 50))
+INDEX_PCA_DIM = int(os.getenv("INDEX_PCA_DIM", 0))  # 0 ⇒ PCA yok
+INDEX_DTYPE = os.getenv("INDEX_DTYPE", "float32")  # float32 | float16 | int8
+INDEX_RESCORE_K = int(os.getenv("INDEX_RESCORE_K", 50))
+INDEX_DIR = os.getenv("INDEX_DIR", "index") or None  # Boş ⇒ tam hassasiyet bellekte
+MODEL_BACKGROUND_LOAD = os.getenv("MODEL_BACKGROUND_LOAD", "true").lower() == "true"
+LEXICAL_FALLBACK = os.getenv("LEXICAL_FALLBACK", "true").lower() == "true"
+LEXICAL_SHORTLIST = int(os.getenv("LEXICAL_SHORTLIST", 0))  # 0 ⇒ tüm katalog skorlanır
+DECISIONS_DB = os.getenv("DECISIONS_DB", "decisions/decisions.db")  # Boş ⇒ kapalı
+SCORE_STORE_DB = os.getenv("SCORE_STORE_DB", "scores/scores.db")  # Boş ⇒ kapalı
+SCORE_STORE_FLUSH_SIZE = int(os.getenv("SCORE_STORE_FLUSH_SIZE", 256))
+SCORE_STORE_FLUSH_INTERVAL = float(
+    os.getenv("SCORE_STORE_FLUSH_INTERVAL", 2.0)
+)  # saniye
+SCORE_STORE_MAX_ROWS = int(os.getenv("SCORE_STORE_MAX_ROWS", 0))  # 0 ⇒ sınırsız
+SCORE_STORE_PURGE_GRACE = float(os.getenv("SCORE_STORE_PURGE_GRACE", 600))  # saniye
+MATCH_SESSION_TTL = float(
+    os.getenv("MATCH_SESSION_TTL", 1800)
+)  # saniye, erişimde yenilenir
+MATCH_SESSION_MAX = int(os.getenv("MATCH_SESSION_MAX", 1000))
+MATCH_SESSION_MAX_ITEMS = int(os.getenv("MATCH_SESSION_MAX_ITEMS", 200))
+LIVE_MATCH_DEBOUNCE_MS = float(os.getenv("LIVE_MATCH_DEBOUNCE_MS", 300))
+LIVE_MATCH_TOP_K = int(os.getenv("LIVE_MATCH_TOP_K", 5))
+LIVE_MATCH_MIN_CHARS = int(os.getenv("LIVE_MATCH_MIN_CHARS", 20))
+EXPLAIN_PAIRS = int(os.getenv("EXPLAIN_PAIRS", 3))  # aday başına cümle çifti
+EXPLAIN_MAX_SENTENCES = int(
+    os.getenv("EXPLAIN_MAX_SENTENCES", 30)
+)  # harici ders başına
+EXPLAIN_MAX_CANDIDATES = int(os.getenv("EXPLAIN_MAX_CANDIDATES", 3))  # ders başına
+EXPLAIN_BUDGET_MS = float(os.getenv("EXPLAIN_BUDGET_MS", 250))
+EXPLAIN_WARMUP = os.getenv("EXPLAIN_WARMUP", "false").lower() == "true"
+SEARCH_SEMANTIC_MIN_CHARS = int(os.getenv("SEARCH_SEMANTIC_MIN_CHARS", 4))
+PARTNERS_DIR = os.getenv("PARTNERS_DIR", "partners")  # Boş ⇒ ortak matrisleri kapalı
+SWAP_CHUNK_SIZE = int(os.getenv("SWAP_CHUNK_SIZE", 64))
+SWAP_DUTY_CYCLE = float(os.getenv("SWAP_DUTY_CYCLE", 0.25))  # arka plan CPU payı
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")  # Yoksa /admin uçları kapalıdır
 
 # File size limits (25MB = 25 * 1024 * 1024 bytes)
 MAX_FILE_SIZE = 25 * 1024 * 1024  # 25MB
@@ -66,72 +175,1325 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["Server-Timing", "X-Request-ID", "X-Explain-Ms"],
 )
+trace_exporter = None  # açılışta kurulur (içe aktarma dizin oluşturmasın)
+# CORS'tan sonra eklenir ⇒ en dıştaki katman; tüm süre ölçülür
+app.add_middleware(TracingMiddleware, get_exporter=lambda: trace_exporter)
 logger = logging.getLogger("auto_api")
 
 repo = CourseRepository(mongo_uri=MONGO_URI)
 sim_svc = None
+lexical = None  # BM25 indeksi; model yüklenmeden hazırdır
+course_search = None  # kod/ad önek indeksi (katalogla birlikte kurulur)
+# Katalog, önbellek anahtarları ve tüm kodlama yolları için ortak normalizasyon
+text_normalizer = TextNormalizer.from_env()
+decision_store = None  # komisyon kararları (açılışta açılır)
+partner_store = None  # ortak üniversite matrisleri (açılışta yüklenir)
+score_store = None  # kalıcı skor deposu (açılışta açılır)
+lexical_served = {"model_loading": 0, "overloaded": 0}
 email_svc = EmailService()
+pdf_pool = TranscriptParserPool(max_workers=PDF_WORKERS, cache_size=PDF_CACHE_SIZE)
+match_cache = TTLCache(max_size=MATCH_CACHE_SIZE, ttl=MATCH_CACHE_TTL)
+match_flight = SingleFlight()
+# Sihirbaz oturumları: öğrencinin gömmeleri ve skor satırları
+match_sessions = TTLCache(max_size=MATCH_SESSION_MAX, ttl=MATCH_SESSION_TTL)
+explainer = SentenceExplainer(
+    text_normalizer,
+    repo,
+    pairs=EXPLAIN_PAIRS,
+    max_sentences=EXPLAIN_MAX_SENTENCES,
+    max_candidates=EXPLAIN_MAX_CANDIDATES,
+    budget=EXPLAIN_BUDGET_MS / 1000,
+    # Katalog cümle indeksi model değişimiyle aynı kısılmış hızda kodlanır
+    chunk_size=SWAP_CHUNK_SIZE,
+    duty_cycle=SWAP_DUTY_CYCLE,
+)
+live_connections = 0
+live_stats = new_live_stats()  # tüm WebSocket bağlantılarının sayaçları
+job_mgr = JobManager(
+    lambda: sim_svc,
+    jobs_dir=JOBS_DIR,
+    max_workers=JOB_WORKERS,
+    batch_size=JOB_BATCH_SIZE,
+    slot=lambda: _job_slot(),
+    decisions=lambda texts, state: _decisions_for(texts, state),
+)
+# Geçişten sonra eski modelin önbellek girdileri boşuna yer tutmasın
+model_swap = ModelSwapper(
+    lambda: sim_svc,
+    chunk_size=SWAP_CHUNK_SIZE,
+    duty_cycle=SWAP_DUTY_CYCLE,
+    on_switch=lambda: app.state.loop.call_soon_threadsafe(match_cache.clear),
+)
+
+
+# ——— Kabul kontrolü: uç nokta başına (eşzamanlılık, kuyruk, azami bekleme s) ——— #
+admission = {
+    name: AdmissionController.from_env(name, *limits)
+    for name, limits in {
+        "auto-match": (4, 32, 5.0),
+        "similarity-bulk": (4, 32, 5.0),
+        "match": (2, 16, 10.0),
+        "generate-pdf": (4, 32, 10.0),
+        "send-email": (8, 64, 15.0),
+        "jobs": (2, 16, 5.0),
+    }.items()
+}
+
+
+def admit(name, fallback=False, priority=None):
+    """Uç noktayı ilgili kabul kontrolcüsüne bağlayan bağımlılık.
+
+    ``fallback=True`` ise reddedilen istek hata yerine ``False`` ile devam eder
+    (uç nokta ucuz bir yedek yanıt üretir); kabul edilenler ``True`` alır.
+    ``priority`` verilirse ``X-Request-Priority`` başlığı yok sayılır.
+    """
+    controller = admission[name]
+    fixed = priority
+
+    async def dependency(x_request_priority: str = Header(INTERACTIVE)):
+        priority = fixed or (BATCH if x_request_priority == BATCH else INTERACTIVE)
+        try:
+            await controller.acquire(priority)
+        except AdmissionRejected as e:
+            logger.warning("%s shed (%d): %s", name, e.status_code, e.detail)
+            if fallback:
+                yield False
+                return
+            raise HTTPException(
+                status_code=e.status_code,
+                detail=e.detail,
+                headers={"Retry-After": str(math.ceil(e.retry_after))},
+            )
+        start = time.perf_counter()
+        try:
+            yield True
+        finally:
+            controller.release(time.perf_counter() - start)
+
+    return dependency
+
+
+@contextlib.contextmanager
+def _job_slot():
+    """Kohort işinin her kodlama parçası için toplu öncelikli auto-match yuvası.
+
+    İşler kendi iş parçacıklarında çalışır; yuva olay döngüsündeki
+    kontrolcüden alınır. Reddedilen parça ``Retry-After`` kadar bekleyip
+    yeniden dener, iş başarısız sayılmaz.
+    """
+    controller, loop = admission["auto-match"], app.state.loop
+    while True:
+        try:
+            asyncio.run_coroutine_threadsafe(controller.acquire(BATCH), loop).result()
+            break
+        except AdmissionRejected as e:
+            time.sleep(e.retry_after)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        loop.call_soon_threadsafe(controller.release, time.perf_counter() - start)
+
+
+def require_model():
+    """Model arka planda yüklenirken anlamsal skor gerektiren uçlar 503 döner."""
+    if sim_svc is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Model yükleniyor, lütfen tekrar deneyin",
+            headers={"Retry-After": "5"},
+        )
+
+
+def profile_request(label):
+    """``X-Profile: <ADMIN_TOKEN>`` veya örnekleme oranıyla isteği profiller."""
+
+    async def dependency(x_profile: str = Header(None)):
+        requested = bool(ADMIN_TOKEN) and x_profile == ADMIN_TOKEN
+        if not requested and random.random() >= PROFILE_SAMPLE_RATE:
+            yield
+            return
+        profiler = RequestProfiler(
+            label, PROFILE_DIR, interval=PROFILE_INTERVAL_MS / 1000
+        ).start()
+        if profiler is None:
+            # Aynı anda tek profil: süren profil bitene kadar istekler profillenmez
+            logger.info("%s not profiled: another profile is running", label)
+            yield
+            return
+        try:
+            yield
+        finally:
+            path = profiler.stop()
+            logger.info("%s profiled: %s", label, path.name)
+
+    return dependency
+
+
+# ——— Okuma anında toplanan metrikler (sıcak yola maliyeti yok) ——— #
+REGISTRY.register_callback(
+    "catalog_courses", "Dahili katalogdaki ders sayısı", lambda: len(repo._cache)
+)
+REGISTRY.register_callback(
+    "cache_hits_total",
+    "Önbellek isabetleri",
+    lambda: {"auto_match": match_cache.hits, "pdf_parse": pdf_pool.hits},
+    kind="counter",
+    labelname="cache",
+)
+REGISTRY.register_callback(
+    "cache_misses_total",
+    "Önbellek ıskaları",
+    lambda: {"auto_match": match_cache.misses, "pdf_parse": pdf_pool.misses},
+    kind="counter",
+    labelname="cache",
+)
+REGISTRY.register_callback(
+    "lexical_fallback_total",
+    "Sözcüksel (BM25) yedekle yanıtlanan /auto-match istekleri",
+    lambda: lexical_served,
+    kind="counter",
+    labelname="reason",
+)
+REGISTRY.register_callback(
+    "normalization_tokens_saved_total",
+    "Normalizasyonla atılan sözcük belirteçleri",
+    lambda: {p: s["tokens_saved"] for p, s in text_normalizer.stats().items()},
+    kind="counter",
+    labelname="path",
+)
+REGISTRY.register_callback(
+    "normalization_duplicates_folded_total",
+    "Yalnızca normalizasyondan sonra tekrara dönüşen metinler",
+    lambda: {
+        p: s["unique_in"] - s["unique_out"] for p, s in text_normalizer.stats().items()
+    },
+    kind="counter",
+    labelname="path",
+)
+REGISTRY.register_callback(
+    "decision_hits_total",
+    "Karar deposunda bulunan harici dersler",
+    lambda: decision_store.hits,
+    kind="counter",
+    labelname="match",
+)
+REGISTRY.register_callback(
+    "partner_hits_total",
+    "Ortak üniversite matrisinden yanıtlanan harici dersler",
+    lambda: partner_store.hits,
+    kind="counter",
+    labelname="university",
+)
+REGISTRY.register_callback(
+    "score_store_lookups_total",
+    "Kalıcı skor deposu sorguları (tekil içerik başına)",
+    lambda: {
+        "hit": score_store.stats_counters["hits"],
+        "miss": score_store.stats_counters["misses"],
+    },
+    kind="counter",
+    labelname="result",
+)
+REGISTRY.register_callback(
+    "match_sessions", "Bellekteki eşleştirme oturumları", lambda: len(match_sessions)
+)
+REGISTRY.register_callback(
+    "live_match_connections",
+    "Açık canlı eşleştirme WebSocket bağlantıları",
+    lambda: live_connections,
+)
+REGISTRY.register_callback(
+    "live_match_updates_total",
+    "Canlı eşleştirme metin güncellemeleri (kodlanan/iptal edilen/değişmeyen)",
+    lambda: live_stats,
+    kind="counter",
+    labelname="result",
+)
+REGISTRY.register_callback(
+    "singleflight_shared_total",
+    "Devam eden bir hesaplamaya katılan istekler",
+    lambda: match_flight.shared,
+    kind="counter",
+)
+REGISTRY.register_callback(
+    "admission_queue_depth",
+    "Kabul kuyruğunda bekleyen istekler",
+    lambda: {n: c.queued for n, c in admission.items()},
+    labelname="endpoint",
+)
+REGISTRY.register_callback(
+    "admission_active",
+    "Çalışmakta olan istekler",
+    lambda: {n: c.active for n, c in admission.items()},
+    labelname="endpoint",
+)
+REGISTRY.register_callback(
+    "admission_shed_total",
+    "Reddedilen istekler (429 + 503)",
+    lambda: {
+        n: c.stats["rejected_queue_full"] + c.stats["rejected_wait"]
+        for n, c in admission.items()
+    },
+    kind="counter",
+    labelname="endpoint",
+)
+
+
+def require_admin(x_admin_token: str = Header(None)):
+    if not ADMIN_TOKEN or x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Yetkisiz erişim")
 
 
 @app.on_event("startup")
 async def bootstrap():
+    app.state.loop = asyncio.get_running_loop()
+    global trace_exporter
+    if TRACE_FILE:
+        trace_exporter = TraceFileExporter(
+            TRACE_FILE, "exemption-api", max_bytes=TRACE_FILE_MAX_MB * 1024 * 1024
+        )
     await repo.load()
     logger.info("Internal course cache loaded: %d ders", len(repo._cache))
+    global lexical, course_search, decision_store, partner_store, score_store
+    lexical = LexicalIndex.from_repo(repo, normalizer=text_normalizer)
+    logger.info("Lexical index built: %s", lexical.report)
+    course_search = CatalogSearch.from_repo(repo)
+    # Önceki süreçten kalan işler; yarım kalanlar başarısız işaretlenir
+    job_mgr.restore()
+    if DECISIONS_DB:
+        decision_store = DecisionStore(DECISIONS_DB, normalizer=text_normalizer)
+        logger.info("Decision store opened: %s", decision_store.stats())
+    if SCORE_STORE_DB:
+        score_store = ScoreStore(
+            SCORE_STORE_DB,
+            flush_size=SCORE_STORE_FLUSH_SIZE,
+            flush_interval=SCORE_STORE_FLUSH_INTERVAL,
+            max_rows=SCORE_STORE_MAX_ROWS,
+            purge_grace=SCORE_STORE_PURGE_GRACE,
+        )
+        logger.info("Score store opened: %s", score_store.stats())
+    if PARTNERS_DIR:
+        partner_store = PartnerStore(PARTNERS_DIR)
+        logger.info("Partner matrices loaded: %d", len(partner_store.list()))
+    if MODEL_BACKGROUND_LOAD:
+        # Model yüklenene kadar /auto-match sözcüksel indeksle yanıtlanır
+        app.state.model_task = asyncio.create_task(_load_model())
+    else:
+        await _load_model()
+
+
+async def _load_model():
     global sim_svc
-    sim_svc = SimilarityService(MODEL_NAME, DEFAULT_THRESHOLD, repo)
+    start = time.perf_counter()
+    try:
+        sim_svc = await run_in_threadpool(
+            SimilarityService,
+            MODEL_NAME,
+            DEFAULT_THRESHOLD,
+            repo,
+            pca_dim=INDEX_PCA_DIM,
+            index_dtype=INDEX_DTYPE,
+            rescore_k=INDEX_RESCORE_K,
+            index_dir=INDEX_DIR,
+            lexical=lexical,
+            shortlist_k=LEXICAL_SHORTLIST,
+            normalizer=text_normalizer,
+            score_store=score_store,
+        )
+    except Exception:
+        logger.exception("Model %s could not be loaded", MODEL_NAME)
+        if not MODEL_BACKGROUND_LOAD:
+            raise
+        return
+    logger.info("Model %s ready in %.1f s", MODEL_NAME, time.perf_counter() - start)
+    if EXPLAIN_WARMUP:
+        # Katalog cümle indeksi arka planda kurulur
+        explainer.index_for(sim_svc.state)
+
+
+@app.on_event("shutdown")
+async def teardown():
+    global trace_exporter
+    pdf_pool.shutdown()
+    job_mgr.shutdown()
+    if trace_exporter is not None:
+        trace_exporter.shutdown()
+        trace_exporter = None
+    if decision_store is not None:
+        decision_store.close()
+    if score_store is not None:
+        # Kuyrukta bekleyen skorlar yazılır
+        score_store.close()
+
+
+def _build_results(ext_codes, similarity_matrix, int_codes, decisions=None, served=()):
+    """Benzerlik matrisinden her harici ders için sıralı aday listesi üretir.
+
+    ``int_codes`` matrisi üreten durumun kodlarıdır (``state.codes``). Komisyon
+    kararları ``/auto-match`` ile aynı yoldan (``auto_match_payload``) uygulanır.
+    """
+    with stage("candidate_selection"):
+        payload = auto_match_payload(
+            ext_codes,
+            int_codes,
+            similarity_matrix,
+            sim_svc.threshold,
+            decisions,
+            served,
+        )
+        return [AutoMatchResult(**result) for result in payload["results"]]
+
+
+def _match_params(state=None):
+    """Önbellek/ETag parametreleri; ``state`` skorlamada kullanılacak durumdur."""
+    if sim_svc is None:
+        # Model yüklenirken yalnızca karar/ortak matrisi satırları yanıtlanabilir
+        # Parmak izi, yüklenecek servisin ``fingerprint()`` değeriyle aynıdır
+        shortlist = LEXICAL_SHORTLIST
+        if lexical is None or lexical.version != repo.version:
+            shortlist = 0
+        if shortlist >= len(repo._cache):
+            shortlist = 0
+        return {
+            "threshold": DEFAULT_THRESHOLD,
+            "catalog": repo.version,
+            "model": MODEL_NAME,
+            "fingerprint": score_fingerprint(
+                MODEL_NAME,
+                dict(
+                    pca_dim=INDEX_PCA_DIM, dtype=INDEX_DTYPE, rescore_k=INDEX_RESCORE_K
+                ),
+                shortlist,
+            ),
+        }
+    state = state or sim_svc.state
+    return {
+        "threshold": sim_svc.threshold,
+        "catalog": state.catalog_version,
+        "model": state.model_name,
+        "fingerprint": sim_svc.fingerprint(state),
+    }
+
+
+async def _cached_similarity(pairs, state):
+    """(kod, normalize metin) çiftleri için benzerlik matrisini istek sırasıyla döndürür.
+
+    Kanonik (sıralı, tekil) istek anahtarı üzerinden sonuç önbelleğe alınır;
+    aynı anahtar için eşzamanlı istekler tek bir hesaplamayı paylaşır. Anahtar
+    ve skorlar aynı ``state``'ten gelir: istek sırasında model geçişi olsa
+    bile yeni modelin skorları eski anahtara yazılmaz.
+    """
+    key = canonical_key(pairs, **_match_params(state))
+    cached = match_cache.get(key)
+    if cached is None:
+
+        async def compute():
+            canon = sorted(set(pairs))
+            matrix = await run_in_threadpool(
+                sim_svc.auto_match,
+                [text for _, text in canon],
+                state=state,
+                normalized=True,
+            )
+            entry = ({pair: i for i, pair in enumerate(canon)}, matrix)
+            match_cache.set(key, entry)
+            return entry
+
+        cached = await match_flight.do(key, compute)
+
+    positions, matrix = cached
+    return matrix[[positions[pair] for pair in pairs]]
+
+
+def _decisions_for(texts, state):
+    """Kayıtlı kararlar; yanıtın sütunlarında olmayan derslerin kararları atlanır."""
+    if decision_store is None or not texts:
+        return {}
+    codes = set(state.codes if state is not None else repo._cache)
+    return decision_store.lookup(texts, codes)
+
+
+async def _lookup_decisions(texts, state):
+    with stage("decision_lookup"):
+        return await run_in_threadpool(_decisions_for, texts, state)
+
+
+def _served(decisions):
+    """Onaylı kararı olan satırlar: model çalışmadan kararla yanıtlanır."""
+    return {i for i, recs in decisions.items() if any(r["approved"] for r in recs)}
+
+
+def _mark_decided(matrix, codes, decisions, served):
+    """Karardan yanıtlanan satırlarda onaylı dersler 1, diğerleri 0 olur."""
+    if not served:
+        return matrix
+    column = {code: j for j, code in enumerate(codes)}
+    for i in served:
+        matrix[i] = 0.0
+        for r in decisions[i]:
+            j = column.get(r["int_code"])
+            if j is not None and r["approved"]:
+                matrix[i, j] = 1.0
+    return matrix
+
+
+def _fill_partner_rows(matrix, codes, partner_rows):
+    """Ortak matrisinden gelen satırlara saklı top-k skorları yazar.
+
+    Diğer sütunlar 0 kalır; ``{satır: kaynak}`` döner.
+    """
+    if not partner_rows:
+        return {}
+    column = {code: j for j, code in enumerate(codes)}
+    precomputed = {}
+    for i, (partner, row) in partner_rows.items():
+        matrix[i] = 0.0
+        int_codes, scores = partner.candidates(row)
+        for code, score in zip(int_codes, scores.tolist()):
+            j = column.get(code)
+            if j is not None:
+                matrix[i, j] = score
+        precomputed[i] = partner.provenance
+    return precomputed
+
+
+def _lexical_auto_match(
+    ext_codes, ext_contents, fmt, reason, decisions, served, partner_rows
+):
+    """Transformer kullanılamıyorken BM25 skorlarıyla aynı şekilde yanıt verir."""
+    lexical_served[reason] += 1
+    index = lexical
+    with stage("lexical_search"):
+        matrix = index.scores(ext_contents)
+    _mark_decided(matrix, index.codes, decisions, served)
+    precomputed = _fill_partner_rows(matrix, index.codes, partner_rows)
+    try:
+        body = render_auto_match(
+            ext_codes,
+            index.codes,
+            matrix,
+            DEFAULT_THRESHOLD,
+            fmt,
+            mode="lexical",
+            decisions=decisions,
+            served=served,
+            precomputed=precomputed,
+        )
+    except ImportError:
+        raise HTTPException(status_code=406, detail=f"{fmt} desteklenmiyor")
+    logger.info("auto-match size=%d served lexically (%s)", len(ext_codes), reason)
+    # Geçici yanıt: istemci ve ara katmanlar önbelleğe almamalı
+    return body, {"X-Match-Mode": "lexical", "Cache-Control": "no-store"}
+
+
+async def _explain(state, items, matrix, threshold, skip):
+    """Muaf adaylar için cümle çiftleri: (açıklamalar, süre raporu)."""
+    threshold_pct = round(threshold * 100, 2)
+    percent = np.round(np.asarray(matrix, dtype=np.float64) * 100, 2)
+    candidates, texts = {}, {}
+    for i in range(len(items)):
+        if i in skip:
+            continue
+        cols = np.flatnonzero(percent[i] >= threshold_pct)
+        if len(cols):
+            cols = cols[np.argsort(-percent[i, cols], kind="stable")]
+            candidates[i] = [state.codes[j] for j in cols.tolist()]
+            texts[i] = items[i].ext_content
+    return await run_in_threadpool(explainer.explain, state, texts, candidates)
 
 
 # ——— ENDPOINT ——— #
-@app.post("/auto-match", response_model=AutoMatchResponse)
-async def auto_match(req: AutoMatchRequest):
+@app.post(
+    "/auto-match",
+    response_model=AutoMatchResponse,
+    dependencies=[Depends(profile_request("auto-match"))],
+)
+async def auto_match(
+    req: AutoMatchRequest,
+    request: Request,
+    admitted: bool = Depends(admit("auto-match", fallback=LEXICAL_FALLBACK)),
+):
     start = time.perf_counter()
 
     # 1) Harici dersler için konular hazırlanır
-    ext_codes, ext_contents = [], []
-    for item in req.items:
-        ext_codes.append(item.ext_code)
-        ext_contents.append(item.ext_content)
-
-    # 2) Harici derslerin tüm dahili derslerle otomatik eşleştirilmesi
-    similarity_matrix = sim_svc.auto_match(ext_contents)
-
-    # 3) Yanıt objeleri oluşturulur
-    results = []
-    threshold_pct = round(sim_svc.threshold * 100, 2)
-
-    for i, ext_code in enumerate(ext_codes):
-        # Bu harici ders için tüm dahili derslerle benzerlik
-        course_sims = similarity_matrix[i]
-
-        # En yüksek benzerlikli olanlarını bul
-        candidates = []
-        for j, sim in enumerate(course_sims):
-            int_code = sim_svc._int_codes[j]
-            percent = round(float(sim) * 100, 2)
-            exempt = percent >= threshold_pct
-
-            # Sonuç objesini oluştur
-            candidates.append(
-                MatchCandidate(int_code=int_code, percent=percent, exempt=exempt)
+    # Normalizasyon önbellek anahtarından önce: neredeyse aynı metinler aynı anahtara düşer
+    ext_codes = [item.ext_code for item in req.items]
+    ext_contents = text_normalizer.normalize_many(
+        (item.ext_content for item in req.items), "auto_match"
+    )
+    pairs = list(zip(ext_codes, ext_contents))
+
+    fmt = negotiate_format(request.headers.get("accept"))
+
+    # Anahtar, skorlar ve sütun etiketleri aynı durumdan okunur (geçişe dayanıklı)
+    state = sim_svc.state if sim_svc is not None else None
+    params = _match_params(state)
+
+    # 2) Komisyonun onayladığı içerikler kayıtlı kararla yanıtlanır (model çalışmaz)
+    decisions = await _lookup_decisions(ext_contents, state)
+    served = _served(decisions)
+
+    # 3) Anlaşmalı üniversitenin bilinen dersleri önceden hesaplanmış matristen
+    partner_rows = {}
+    if partner_store is not None and req.university:
+        partner_rows = partner_store.lookup(
+            req.university, ext_codes, params["fingerprint"], params["catalog"], served
+        )
+    pending = [
+        i for i in range(len(pairs)) if i not in served and i not in partner_rows
+    ]
+
+    if pending and (state is None or not admitted):
+        if lexical is None or not LEXICAL_FALLBACK:
+            require_model()
+        body, headers = _lexical_auto_match(
+            ext_codes,
+            ext_contents,
+            fmt,
+            "model_loading" if state is None else "overloaded",
+            decisions,
+            served,
+            partner_rows,
+        )
+        body, encoding = compress_body(
+            body, request.headers.get("accept-encoding"), COMPRESS_MIN_SIZE
+        )
+        headers["Vary"] = "Accept, Accept-Encoding"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type=fmt, headers=headers)
+
+    # 4) Girdiler, kararlar ve matrisler aynıysa yanıt da aynıdır: ETag hesaplama yapmadan belirlenir
+    decided = sorted(
+        (i, r["decision_id"], r["approved"], r["decided_at"])
+        for i, recs in decisions.items()
+        for r in recs
+    )
+    partnered = sorted(
+        (i, p.path.name, p.meta["created_at"]) for i, (p, _) in partner_rows.items()
+    )
+    # Açıklamalar cümle indeksi hazır olunca değişir
+    explained = req.explain and state is not None and explainer.ready(state)
+    etag = (
+        '"%s"'
+        % hashlib.sha256(
+            json.dumps(
+                [
+                    fmt,
+                    params,
+                    pairs,
+                    decided,
+                    partnered,
+                    req.explain,
+                    explained,
+                ],
+                ensure_ascii=False,
+            ).encode("utf-8")
+        ).hexdigest()[:32]
+    )
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # 5) Yalnızca kararı ve ortak matrisi olmayan dersler tüm dahili derslerle eşleştirilir
+    int_codes = state.codes if state is not None else lexical.codes
+    threshold = params["threshold"]
+    precomputed = {}
+    if len(pending) == len(pairs):
+        similarity_matrix = await _cached_similarity(pairs, state)
+    else:
+        similarity_matrix = np.zeros((len(pairs), len(int_codes)), dtype=np.float32)
+        if pending:
+            similarity_matrix[pending] = await _cached_similarity(
+                [pairs[i] for i in pending], state
             )
+        _mark_decided(similarity_matrix, int_codes, decisions, served)
+        precomputed = _fill_partner_rows(similarity_matrix, int_codes, partner_rows)
 
-        # Benzerliklere göre sırala (yüksekten düşüğe)
-        candidates.sort(key=lambda x: x.percent, reverse=True)
+    # 6) İstenirse muaf adaylar cümle çiftleriyle açıklanır (süre bütçeli)
+    explanations, explain_report = {}, None
+    if req.explain and state is not None:
+        explanations, explain_report = await _explain(
+            state, req.items, similarity_matrix, threshold, served
+        )
 
-        # Bu harici ders için nihai sonuç
-        result = AutoMatchResult(ext_code=ext_code, candidates=candidates)
-        results.append(result)
+    # 7) Yanıt, aday nesneleri oluşturulmadan doğrudan matristen serileştirilir
+    try:
+        body = render_auto_match(
+            ext_codes,
+            int_codes,
+            similarity_matrix,
+            threshold,
+            fmt,
+            decisions=decisions,
+            served=served,
+            precomputed=precomputed,
+            explanations=explanations,
+            explain=explain_report,
+        )
+    except ImportError:
+        raise HTTPException(status_code=406, detail=f"{fmt} desteklenmiyor")
+    body, encoding = compress_body(
+        body, request.headers.get("accept-encoding"), COMPRESS_MIN_SIZE
+    )
 
     logger.info(
-        "auto-match size=%d finished in %.1f ms",
+        "auto-match size=%d decided=%d partner=%d finished in %.1f ms",
+        len(ext_codes),
+        len(served),
+        len(partner_rows),
+        (time.perf_counter() - start) * 1000,
+    )
+    headers = {"Vary": "Accept, Accept-Encoding", "ETag": etag}
+    if explain_report is not None:
+        headers["X-Explain-Ms"] = str(explain_report["elapsed_ms"])
+        if explain_report["truncated"]:
+            # Bütçeye takılan yanıt zamanlamaya bağlıdır, yeniden doğrulanamaz
+            del headers["ETag"]
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=fmt, headers=headers)
+
+
+@app.post(
+    "/auto-match/stream",
+    dependencies=[Depends(require_model), Depends(admit("auto-match"))],
+)
+async def auto_match_stream(
+    req: AutoMatchRequest, request: Request, chunk_size: int = STREAM_CHUNK_SIZE
+):
+    """Sonuçları hazır oldukça NDJSON (varsayılan) veya SSE olarak akıtır.
+
+    ``Accept: text/event-stream`` gönderilirse Server-Sent Events kullanılır.
+    İstemci bağlantıyı kestiğinde kalan parçalar kodlanmaz.
+    """
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    chunk_size = max(1, chunk_size)
+    ext_codes = [item.ext_code for item in req.items]
+    ext_contents = text_normalizer.normalize_many(
+        (item.ext_content for item in req.items), "auto_match"
+    )
+
+    async def generate():
+        start = time.perf_counter()
+        sent = 0
+        state = sim_svc.state
+        # Onaylı kararı olan dersler hemen (kodlanmadan) gönderilir
+        decisions = await _lookup_decisions(ext_contents, state)
+        served = _served(decisions)
+        pending = [i for i in range(len(ext_codes)) if i not in served]
+        batches = []
+        if served:
+            batches.append(
+                (
+                    [ext_codes[i] for i in sorted(served)],
+                    np.zeros((len(served), len(state.codes)), dtype=np.float32),
+                    {n: decisions[i] for n, i in enumerate(sorted(served))},
+                )
+            )
+        chunks = sim_svc.iter_auto_match(
+            [ext_contents[i] for i in pending], chunk_size, state=state, normalized=True
+        )
+        while True:
+            if await request.is_disconnected():
+                logger.info(
+                    "auto-match stream cancelled after %d/%d", sent, len(ext_codes)
+                )
+                return
+
+            if not batches:
+                # Her parça ayrı kodlanır; olay döngüsü bloklanmaz
+                chunk = await run_in_threadpool(next, chunks, None)
+                if chunk is None:
+                    break
+                offset, similarity_matrix = chunk
+                rows = pending[offset : offset + len(similarity_matrix)]
+                batches.append(
+                    (
+                        [ext_codes[i] for i in rows],
+                        similarity_matrix,
+                        {n: decisions[i] for n, i in enumerate(rows) if i in decisions},
+                    )
+                )
+            codes, similarity_matrix, decided = batches.pop()
+            results = _build_results(
+                codes,
+                similarity_matrix,
+                state.codes,
+                decided,
+                _served(decided),
+            )
+            for result in results:
+                payload = result.model_dump_json()
+                yield f"event: result\ndata: {payload}\n\n" if sse else payload + "\n"
+            sent += len(results)
+
+        elapsed = (time.perf_counter() - start) * 1000
+        if sse:
+            yield f'event: end\ndata: {{"count": {sent}, "elapsed_ms": {elapsed:.1f}}}\n\n'
+        logger.info("auto-match stream size=%d finished in %.1f ms", sent, elapsed)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ——— Eşleştirme oturumları (artımlı) ——— #
+def _get_session(session_id):
+    session = match_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(
+            status_code=404, detail="Oturum bulunamadı ya da süresi doldu"
+        )
+    return session
+
+
+async def _apply_session_delta(session, delta, full=False, status_code=200):
+    """Değişikliği uygular; değişen (``full`` ⇒ tüm) sonuçları döndürür."""
+    upserts = {item.ext_code: item.ext_content for item in delta.upsert}
+    codes = list(upserts)
+    texts = text_normalizer.normalize_many(upserts.values(), "session")
+    found = await _lookup_decisions(texts, sim_svc.state)
+    decisions = {codes[i]: recs for i, recs in found.items()}
+
+    async with session.lock:
+        size = len((set(session.items) - set(delta.remove)) | set(codes))
+        if size > MATCH_SESSION_MAX_ITEMS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Oturumda en fazla {MATCH_SESSION_MAX_ITEMS} ders olabilir",
+            )
+        state, changed, removed = await run_in_threadpool(
+            session.apply, sim_svc, list(zip(codes, texts)), delta.remove, decisions
+        )
+        out = list(session.items) if full else changed
+        matrix, decided, served = session.matrix(out, len(state.codes))
+        payload = auto_match_payload(
+            out, state.codes, matrix, sim_svc.threshold, decided, served
+        )
+        revision = session.revision
+
+    # Her erişim oturumun süresini yeniler
+    match_sessions.set(session.id, session)
+    logger.info(
+        "match session %s rev=%d changed=%d removed=%d",
+        session.id[:8],
+        revision,
+        len(changed),
+        len(removed),
+    )
+    payload.update(
+        session_id=session.id,
+        revision=revision,
+        expires_in=int(MATCH_SESSION_TTL),
+        removed=removed,
+    )
+    return Response(
+        content=dumps_json(payload),
+        status_code=status_code,
+        media_type="application/json",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+@app.post(
+    "/match-sessions",
+    status_code=201,
+    response_model=MatchSessionResponse,
+    dependencies=[Depends(require_model), Depends(admit("auto-match"))],
+)
+async def create_match_session(delta: MatchSessionDelta):
+    """Oturum açar; ilk dersler ``upsert`` ile gönderilebilir"""
+    # Oturum ancak ilk değişiklik başarıyla uygulanınca saklanır (413'te yetim kalmaz)
+    session = MatchSession(new_session_id())
+    return await _apply_session_delta(session, delta, status_code=201)
+
+
+@app.patch(
+    "/match-sessions/{session_id}",
+    response_model=MatchSessionResponse,
+    dependencies=[Depends(require_model), Depends(admit("auto-match"))],
+)
+async def update_match_session(session_id: str, delta: MatchSessionDelta):
+    """Ekleme/güncelleme/silme uygular; yalnızca değişen dersleri kodlar ve döndürür"""
+    return await _apply_session_delta(_get_session(session_id), delta)
+
+
+@app.get(
+    "/match-sessions/{session_id}",
+    response_model=MatchSessionResponse,
+    dependencies=[Depends(require_model), Depends(admit("auto-match"))],
+)
+async def get_match_session(session_id: str):
+    """Oturumdaki tüm sonuçlar (model/katalog değiştiyse önce yenilenir)"""
+    return await _apply_session_delta(
+        _get_session(session_id), MatchSessionDelta(), full=True
+    )
+
+
+@app.delete("/match-sessions/{session_id}", status_code=204)
+async def delete_match_session(session_id: str):
+    match_sessions.pop(session_id)
+    return Response(status_code=204)
+
+
+# ——— Canlı eşleştirme (WebSocket) ——— #
+async def _live_score(text, top_k):
+    svc = sim_svc
+    if svc is None:
+        return {"type": "loading", "retry_after": 5}
+    if len(text) < LIVE_MATCH_MIN_CHARS:
+        return {"type": "matches", "candidates": []}
+    state = svc.state
+    # Komisyon kararları /auto-match ile aynı yoldan uygulanır
+    decisions = await _lookup_decisions([text], state)
+    served = _served(decisions)
+    if served:
+        sims = np.zeros((1, len(state.codes)), dtype=np.float32)
+    else:
+        # Canlı kodlamalar da /auto-match ile aynı kabul kontrolünden geçer
+        controller = admission["auto-match"]
+        try:
+            await controller.acquire(INTERACTIVE)
+        except AdmissionRejected as e:
+            return {"type": "overloaded", "retry_after": math.ceil(e.retry_after)}
+        start = time.perf_counter()
+        try:
+            # Yazım sırasındaki ara metinler kalıcı skor deposuna yazılmaz
+            _, sims = await run_in_threadpool(svc.embed_and_score, [text], state)
+        finally:
+            controller.release(time.perf_counter() - start)
+    (result,) = auto_match_payload(
+        [None], state.codes, sims, svc.threshold, decisions, served
+    )["results"]
+    message = {"type": "matches", "candidates": result["candidates"][:top_k]}
+    if "source" in result:
+        message["source"] = result["source"]
+    return message
+
+
+@app.websocket("/ws/live-match")
+async def live_match(ws: WebSocket, top_k: int = LIVE_MATCH_TOP_K):
+    """Yazılan içerik için en yakın dahili dersleri iter.
+
+    İstemci ``{"id": "<alan>", "content": "..."}`` gönderir; sunucu metin
+    ``LIVE_MATCH_DEBOUNCE_MS`` boyunca değişmeyince
+    ``{"type": "matches", "id", "seq", "candidates": [...]}`` döner.
+    """
+    global live_connections
+    await ws.accept()
+    top_k = max(1, min(top_k, 50))
+    channel = LiveMatchChannel(
+        ws.send_json,
+        text_normalizer.normalize,
+        lambda text: _live_score(text, top_k),
+        debounce=LIVE_MATCH_DEBOUNCE_MS / 1000,
+        stats=live_stats,
+    )
+    live_connections += 1
+    try:
+        while True:
+            raw = await ws.receive_text()
+            try:
+                message = json.loads(raw)
+                field = str(message.get("id", ""))
+                content = message.get("content") or ""
+                if not isinstance(content, str):
+                    raise ValueError
+            except (ValueError, AttributeError):
+                await channel.send(
+                    {"type": "error", "detail": "Geçersiz mesaj: {id, content}"}
+                )
+                continue
+            if not channel.submit(field, content):
+                await channel.send(
+                    {"type": "error", "id": field, "detail": "Alan sınırı aşıldı"}
+                )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        live_connections -= 1
+        await channel.close()
+
+
+# ——— Katalog araması ——— #
+@app.get("/courses/search", response_model=CourseSearchResponse)
+async def search_courses(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+    mode: str = Query("auto", pattern="^(auto|prefix|semantic)$"),
+):
+    """Kod/ad önekiyle otomatik tamamlama; önek eşleşmesi yoksa anlamsal arama.
+
+    ``mode=prefix`` yalnızca indekse bakar (model gerekmez), ``mode=semantic``
+    her zaman sorguyu kodlar.
+    """
+    start = time.perf_counter()
+    index = course_search
+    results, used = [], "none"
+    if mode != "semantic":
+        results = index.prefix(q, limit)
+        used = "prefix" if results else "none"
+    if not results and mode != "prefix":
+        if mode == "semantic":
+            require_model()
+        long_enough = len(q.strip()) >= SEARCH_SEMANTIC_MIN_CHARS
+        if sim_svc is not None and (mode == "semantic" or long_enough):
+            # Sorgu kodlaması /auto-match ile aynı kabul kontrolünden geçer
+            controller = admission["auto-match"]
+            try:
+                await controller.acquire(INTERACTIVE)
+            except AdmissionRejected as e:
+                logger.warning("course search shed (%d): %s", e.status_code, e.detail)
+                if mode == "semantic":
+                    raise HTTPException(
+                        status_code=e.status_code,
+                        detail=e.detail,
+                        headers={"Retry-After": str(math.ceil(e.retry_after))},
+                    )
+                # Otomatik tamamlama boş önek sonucuyla devam eder
+                used = "overloaded"
+            else:
+                t = time.perf_counter()
+                try:
+                    results = await run_in_threadpool(index.semantic, sim_svc, q, limit)
+                finally:
+                    controller.release(time.perf_counter() - t)
+                used = "semantic"
+    return {
+        "query": q,
+        "mode": used,
+        "results": results,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
+
+
+@app.post(
+    "/similarity/bulk",
+    response_model=BulkSimilarityResponse,
+    dependencies=[Depends(require_model), Depends(admit("similarity-bulk"))],
+)
+async def similarity_bulk(req: BulkSimilarityRequest):
+    start = time.perf_counter()
+
+    try:
+        scores = await run_in_threadpool(
+            sim_svc.bulk_similarity_by_code,
+            [(item.ext_content, item.int_code) for item in req.items],
+        )
+    except KeyError as e:
+        raise HTTPException(
+            status_code=404, detail=f"Bilinmeyen dahili ders kodu: {e.args[0]}"
+        )
+
+    results = [
+        BulkSimilarityResult(
+            ext_code=item.ext_code,
+            int_code=item.int_code,
+            similarity=round(sim, 4),
+            percent=percent,
+            exempt=exempt,
+        )
+        for item, (sim, percent, exempt) in zip(req.items, scores)
+    ]
+
+    logger.info(
+        "similarity-bulk size=%d finished in %.1f ms",
         len(results),
         (time.perf_counter() - start) * 1000,
     )
-    return AutoMatchResponse(results=results)
+    return BulkSimilarityResponse(results=results)
+
+
+@app.post(
+    "/match",
+    response_model=MatchResponse,
+    dependencies=[Depends(require_model), Depends(admit("match"))],
+)
+async def match(
+    transcript: UploadFile = File(...),
+    old_contents: UploadFile = File(...),
+    transcript_name: str = Form(None),
+    old_contents_name: str = Form(None),
+):
+    """Transkript ve ders içerikleri PDF'lerini ayrıştırıp tek seferde eşleştirir"""
+    start = time.perf_counter()
+    timings = {}
+
+    validate_file_size(transcript)
+    validate_file_size(old_contents)
+    transcript_bytes = await transcript.read()
+    contents_bytes = await old_contents.read()
+    timings["read_ms"] = (time.perf_counter() - start) * 1000
+
+    # 1) İki PDF süreç havuzunda paralel ayrıştırılır (sonuçlar özet ile önbellekte)
+    t = time.perf_counter()
+    try:
+        (courses, transcript_cached), (contents, contents_cached) = (
+            await asyncio.gather(
+                pdf_pool.parse("transcript", transcript_bytes),
+                pdf_pool.parse("contents", contents_bytes),
+            )
+        )
+    except Exception as e:
+        logger.error("PDF parsing failed: %s", str(e))
+        raise HTTPException(status_code=422, detail=f"PDF ayrıştırılamadı: {str(e)}")
+    timings["parse_ms"] = (time.perf_counter() - t) * 1000
+
+    if not courses:
+        raise HTTPException(
+            status_code=422, detail="Transkriptte ders satırı bulunamadı"
+        )
+
+    # 2) İçeriği olmayan dersler için ders adı kullanılır
+    parsed = [
+        ParsedCourse(
+            **course,
+            content=contents.get(normalize_code(course["code"])) or course["name"],
+        )
+        for course in courses
+    ]
+
+    # 3) Çıkarılan dersler doğrudan eşleştirme yoluna verilir
+    t = time.perf_counter()
+    state = sim_svc.state
+    texts = text_normalizer.normalize_many((c.content for c in parsed), "auto_match")
+    decisions = await _lookup_decisions(texts, state)
+    served = _served(decisions)
+    pending = [i for i in range(len(parsed)) if i not in served]
+    similarity_matrix = np.zeros((len(parsed), len(state.codes)), dtype=np.float32)
+    if pending:
+        similarity_matrix[pending] = await run_in_threadpool(
+            sim_svc.auto_match,
+            [texts[i] for i in pending],
+            state=state,
+            normalized=True,
+        )
+    results = _build_results(
+        [c.code for c in parsed], similarity_matrix, state.codes, decisions, served
+    )
+    timings["match_ms"] = (time.perf_counter() - t) * 1000
+    timings["total_ms"] = (time.perf_counter() - start) * 1000
+
+    logger.info(
+        "match transcript=%s courses=%d contents=%d finished in %.1f ms",
+        transcript_name or transcript.filename,
+        len(parsed),
+        len(contents),
+        timings["total_ms"],
+    )
+    return MatchResponse(
+        courses=parsed,
+        results=results,
+        timings={k: round(v, 2) for k, v in timings.items()},
+        cache={"transcript": transcript_cached, "contents": contents_cached},
+    )
+
+
+@app.post(
+    "/jobs",
+    response_model=JobStatus,
+    status_code=202,
+    dependencies=[Depends(require_model), Depends(admit("jobs", priority=BATCH))],
+)
+async def submit_job(req: CohortJobRequest):
+    """Kohort eşleştirmesini arka planda başlatır"""
+    status = job_mgr.submit(
+        [
+            (s.student_id, [(i.ext_code, i.ext_content) for i in s.items])
+            for s in req.students
+        ]
+    )
+    logger.info("job %s submitted: %d students", status["job_id"], status["students"])
+    return status
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    try:
+        return job_mgr.status(job_id)
+    except JobNotFound:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    try:
+        path = job_mgr.result_path(job_id)
+    except JobNotFound:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    if path is None:
+        raise HTTPException(status_code=409, detail="İş henüz tamamlanmadı")
+    return FileResponse(
+        path, media_type="application/json", filename=f"job_{job_id}.json"
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metin biçiminde aşama süreleri, önbellek ve kuyruk metrikleri"""
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.post("/admin/catalog/reload", dependencies=[Depends(require_admin)])
+async def reload_catalog():
+    """Kataloğu yeniden yükler; eski katalog sürümüne ait sonuçlar geçersizleşir"""
+    # Süren model değişimi eski katalogla kodluyordur
+    model_swap.cancel()
+    await repo.load()
+    global lexical, course_search
+    lexical = LexicalIndex.from_repo(repo, normalizer=text_normalizer)
+    course_search = CatalogSearch.from_repo(repo)
+    if sim_svc is not None:
+        sim_svc.lexical = lexical
+        await run_in_threadpool(sim_svc.rebuild)
+    match_cache.clear()
+    logger.info("Catalog reloaded: %d ders, version=%s", len(repo._cache), repo.version)
+    return {
+        "catalog_version": repo.version,
+        "courses": len(repo._cache),
+        "index": sim_svc.index_report if sim_svc is not None else None,
+        "lexical": lexical.report,
+        "search": course_search.report,
+    }
+
+
+# ——— Model değişimi ——— #
+def _swap_call(fn, *args):
+    try:
+        return fn(*args)
+    except SwapError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.get("/admin/model", dependencies=[Depends(require_admin)])
+async def model_status():
+    """Etkin model, önceki model ve süren değişimin ilerlemesi"""
+    return model_swap.status()
+
+
+@app.post("/admin/model/swap", status_code=202, dependencies=[Depends(require_admin)])
+async def swap_model(req: ModelSwapRequest):
+    """Yeni modeli arka planda yükler ve kataloğu kısılmış hızda yeniden kodlar.
+
+    Hazırlık bitene kadar istekler mevcut modelle karşılanır.
+    """
+    return _swap_call(model_swap.start, req.model_name, req.auto_activate)
+
+
+@app.post("/admin/model/activate", dependencies=[Depends(require_admin)])
+async def activate_model():
+    return _swap_call(model_swap.activate)
+
+
+@app.post("/admin/model/rollback", dependencies=[Depends(require_admin)])
+async def rollback_model():
+    """Önceki modele döner (önceki katalog gömmeleri bellekte tutulur)"""
+    return _swap_call(model_swap.rollback)
+
+
+@app.post("/admin/model/cancel", dependencies=[Depends(require_admin)])
+async def cancel_model_swap():
+    return model_swap.cancel()
+
+
+# ——— Komisyon kararları ——— #
+def _require_decisions():
+    if decision_store is None:
+        raise HTTPException(status_code=404, detail="Karar deposu kapalı")
+    return decision_store
+
+
+@app.post("/admin/decisions", dependencies=[Depends(require_admin)])
+async def import_decisions(req: DecisionImportRequest):
+    """Onay/red kararlarını ekler; aynı içerik ve ders için en geç tarihli karar geçerli"""
+    store = _require_decisions()
+    # Katalogda olmayan koda verilen karar hiçbir sütuna düşmez; kayıt reddedilir
+    unknown = sorted({d.int_code for d in req.decisions} - set(repo._cache))
+    if unknown:
+        raise HTTPException(
+            status_code=422, detail=f"Katalogda olmayan ders kodları: {unknown}"
+        )
+    n = await run_in_threadpool(
+        store.record_many, [d.model_dump() for d in req.decisions]
+    )
+    return {"recorded": n, **store.stats()}
+
+
+@app.get("/admin/decisions/stats", dependencies=[Depends(require_admin)])
+async def decision_stats():
+    return _require_decisions().stats()
+
 
+# ——— Ortak üniversite matrisleri ——— #
+def _require_partners():
+    if partner_store is None:
+        raise HTTPException(status_code=404, detail="Ortak matrisleri kapalı")
+    return partner_store
 
-@app.post("/generate-pdf")
+
+@app.get("/admin/partners", dependencies=[Depends(require_admin)])
+async def list_partners():
+    """Yüklü matrisler; ``fresh: false`` ⇒ skor ayarları/katalog değişmiş, yeniden üretilmeli"""
+    params = _match_params()
+    return _require_partners().list(params["fingerprint"], params["catalog"])
+
+
+@app.post("/admin/partners/reload", dependencies=[Depends(require_admin)])
+async def reload_partners():
+    """``python -m app.partners build`` ile üretilen dosyaları yeniden okur"""
+    store = _require_partners()
+    await run_in_threadpool(store.reload)
+    params = _match_params()
+    return store.list(params["fingerprint"], params["catalog"])
+
+
+@app.get("/admin/score-store", dependencies=[Depends(require_admin)])
+async def score_store_stats():
+    """Kalıcı skor deposu: satır sayısı, kuyruk, isabet/ıska ve temizlenen kayıtlar"""
+    if score_store is None:
+        raise HTTPException(status_code=404, detail="Skor deposu kapalı")
+    return await run_in_threadpool(score_store.stats)
+
+
+@app.get("/admin/normalization", dependencies=[Depends(require_admin)])
+async def normalization_stats():
+    """Yol başına normalizasyon kazançları: atılan belirteçler ve tekrar oranı"""
+    return text_normalizer.stats()
+
+
+@app.get("/admin/admission", dependencies=[Depends(require_admin)])
+async def admission_stats():
+    """Uç nokta başına aktif iş, kuyruk derinliği ve reddedilen istek sayıları"""
+    return {name: c.snapshot() for name, c in admission.items()}
+
+
+@app.get("/admin/profiles", dependencies=[Depends(require_admin)])
+async def get_profiles():
+    """Kaydedilmiş profilleri (flame graph + bellek özeti) listeler"""
+    return list_profiles(PROFILE_DIR)
+
+
+@app.get("/admin/profiles/{name}", dependencies=[Depends(require_admin)])
+async def download_profile(name: str):
+    if name not in {p["name"] for p in list_profiles(PROFILE_DIR)}:
+        raise HTTPException(status_code=404, detail="Profil bulunamadı")
+    return FileResponse(os.path.join(PROFILE_DIR, name), media_type="text/plain")
+
+
+@app.post(
+    "/generate-pdf",
+    dependencies=[
+        Depends(admit("generate-pdf")),
+        Depends(profile_request("generate-pdf")),
+    ],
+)
 async def generate_pdf(req: PdfGenerationRequest):
     """Generate Word document for course exemption application (maintains PDF endpoint for compatibility)"""
     start = time.perf_counter()
@@ -173,7 +1535,8 @@ async def generate_pdf(req: PdfGenerationRequest):
             )
 
         # Generate Word document (using the PdfGenerationService for backward compatibility)
-        word_bytes = PdfGenerationService.generate_exemption_pdf(
+        word_bytes = await run_in_threadpool(
+            PdfGenerationService.generate_exemption_pdf,
             personal_info=personal_info_dict,
             muafiyet_courses=selected_courses_list,
             timestamp=req.timestamp,
@@ -207,7 +1570,11 @@ async def generate_pdf(req: PdfGenerationRequest):
         )
 
 
-@app.post("/send-email", response_model=EmailResponse)
+@app.post(
+    "/send-email",
+    response_model=EmailResponse,
+    dependencies=[Depends(admit("send-email")), Depends(profile_request("send-email"))],
+)
 async def send_email(
     to_email: str = Form(...),
     cc_email: str = Form(None),
@@ -290,7 +1657,7 @@ async def send_email(
 
 
 # Legacy endpoint for backward compatibility
-@app.post("/sendMail")
+@app.post("/sendMail", dependencies=[Depends(admit("send-email"))])
 async def send_mail_legacy(
     to: str = Form(...),
     subject: str = Form(...),
@@ -0,0 +1,165 @@
+# app/metrics.py
+"""Prometheus metin biçiminde metrikler (bağımlılıksız, düşük maliyetli).
+
+Sıcak yolda yalnızca ``perf_counter`` ve bir kova araması yapılır. Önbellek
+isabetleri, katalog boyutu, kuyruk derinliği gibi değerler ise kayıt anında
+değil, ``/metrics`` okunurken geri çağırma (callback) ile toplanır.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+__all__ = [
+    "Histogram",
+    "REGISTRY",
+    "STAGE_SECONDS",
+    "BATCH_SIZE",
+    "render",
+]
+
+NAMESPACE = "exemption"
+
+
+def _fmt_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+def _fmt_value(v):
+    return repr(float(v)) if v != float("inf") else "+Inf"
+
+
+class Histogram:
+    DEFAULT_BUCKETS = (
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+    )
+
+    def __init__(self, name, doc, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = f"{NAMESPACE}_{name}"
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # etiketler → (kova sayaçları, toplam, adet)
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def observe(self, value, *labelvalues):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [
+                    [0] * (len(self.buckets) + 1),
+                    0.0,
+                    0,
+                ]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def sum(self, *labelvalues) -> float:
+        """Serinin gözlem toplamı (saniye); gözlem yoksa 0."""
+        with self._lock:
+            series = self._series.get(labelvalues)
+            return series[1] if series is not None else 0.0
+
+    @contextmanager
+    def time(self, *labelvalues):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(k, (list(s[0]), s[1], s[2])) for k, s in self._series.items()]
+        for values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                labels = _fmt_labels(
+                    self.labelnames, values, [("le", _fmt_value(bound))]
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _fmt_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class _Registry:
+    def __init__(self):
+        self._metrics = []
+        # ad → (açıklama, tür, geri çağırma, etiket); değer okuma anında hesaplanır
+        self._callbacks: Dict[str, Tuple[str, str, Callable, str]] = {}
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def register_callback(self, name, doc, fn, kind="gauge", labelname=None):
+        """``fn()`` sayı ya da ``{etiket değeri: sayı}`` döndürmelidir."""
+        self._callbacks[f"{NAMESPACE}_{name}"] = (doc, kind, fn, labelname)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        for name, (doc, kind, fn, labelname) in self._callbacks.items():
+            try:
+                value = fn()
+            except Exception:
+                continue  # ör. servis henüz başlatılmadı
+            lines.append(f"# HELP {name} {doc}")
+            lines.append(f"# TYPE {name} {kind}")
+            if isinstance(value, dict):
+                for label, v in value.items():
+                    lines.append(f"{name}{_fmt_labels((labelname,), (label,))} {v}")
+            else:
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = _Registry()
+
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds",
+    "Aşama süreleri (encode, similarity_gemm, candidate_selection, ...)",
+    labelnames=("stage",),
+)
+BATCH_SIZE = Histogram(
+    "encode_batch_size",
+    "Tek kodlama çağrısındaki metin sayısı",
+    labelnames=("path",),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024),
+)
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,248 @@
+# app/model_swap.py
+"""Kesintisiz model değişimi.
+
+Yeni kodlayıcı mevcut olanın yanında yüklenir ve katalog arka planda,
+kısılmış hızda yeniden kodlanır: her parçadan sonra, parçanın süresinin
+``(1 - duty_cycle) / duty_cycle`` katı kadar beklenir (``duty_cycle=0.25``
+⇒ CPU'nun en fazla ~%25'i). Hazır olunca ``SimilarityService`` durumu tek
+atamayla değiştirilir; önceki durum geri alma için saklanır.
+
+Bekleme süresince tüm istekler eski durumla, geçişten sonra yenisiyle
+çalışır; model ve katalog gömmeleri aynı ``EncoderState``'te taşındığından
+iki modelin gömmeleri hiçbir sonuçta karışmaz.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from .metrics import STAGE_SECONDS
+
+__all__ = ["EncodeCancelled", "ModelSwapper", "SwapError", "encode_throttled"]
+
+logger = logging.getLogger(__name__)
+
+IDLE, LOADING, EMBEDDING, READY = "idle", "loading", "embedding", "ready"
+ACTIVE, ROLLED_BACK, FAILED, CANCELLED = "active", "rolled_back", "failed", "cancelled"
+_BUSY = (LOADING, EMBEDDING)
+
+
+class SwapError(Exception):
+    pass
+
+
+class EncodeCancelled(Exception):
+    pass
+
+
+def encode_throttled(
+    model,
+    texts,
+    chunk_size=64,
+    duty_cycle=0.25,
+    cancel=None,
+    on_progress=None,
+    stage_name="swap_encode",
+):
+    """Metinleri parça parça, CPU payı ``duty_cycle`` ile sınırlı kodlar.
+
+    Her parçadan sonra parçanın süresinin ``(1 - duty_cycle) / duty_cycle``
+    katı beklenir. ``cancel`` (``threading.Event``) kurulursa ``EncodeCancelled``
+    fırlatılır; ``on_progress`` tamamlanan oranla çağrılır.
+    """
+    cancel = cancel or threading.Event()
+    duty_cycle = min(max(duty_cycle, 0.01), 1.0)
+    parts = []
+    for offset in range(0, len(texts), chunk_size):
+        if cancel.is_set():
+            raise EncodeCancelled
+        t0 = time.perf_counter()
+        with STAGE_SECONDS.time(stage_name):
+            parts.append(
+                model.encode(texts[offset : offset + chunk_size], convert_to_numpy=True)
+            )
+        elapsed = time.perf_counter() - t0
+        if on_progress is not None:
+            on_progress(min(offset + chunk_size, len(texts)) / len(texts))
+        # Canlı istekler için CPU bırakılır
+        cancel.wait(elapsed * (1 - duty_cycle) / duty_cycle)
+    return np.vstack(parts)
+
+
+def _load_encoder(model_name):
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name)
+
+
+class ModelSwapper:
+    def __init__(
+        self,
+        get_service: Callable[[], Any],
+        chunk_size: int = 64,
+        duty_cycle: float = 0.25,
+        on_switch: Optional[Callable[[], None]] = None,
+        load_encoder: Callable[[str], Any] = _load_encoder,
+    ):
+        self._get_service = get_service
+        self.chunk_size = chunk_size
+        self.duty_cycle = min(max(duty_cycle, 0.01), 1.0)
+        self.on_switch = on_switch
+        self._load_encoder = load_encoder
+        self._lock = threading.RLock()
+        self._cancel = threading.Event()
+        self._staged = None  # hazır, henüz etkin olmayan EncoderState
+        self._previous = None  # geri alma için
+        self._status: Dict[str, Any] = {"state": IDLE, "target": None}
+
+    # ——— Durum ——— #
+    def _update(self, **changes):
+        with self._lock:
+            self._status.update(changes)
+
+    def status(self) -> Dict[str, Any]:
+        svc = self._get_service()
+        with self._lock:
+            return {
+                **self._status,
+                "active_model": svc.model_name if svc else None,
+                "previous_model": (
+                    self._previous.model_name if self._previous is not None else None
+                ),
+            }
+
+    # ——— Genel API ——— #
+    def start(self, model_name: str, auto_activate: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            if self._status["state"] in _BUSY:
+                raise SwapError(
+                    f"Model değişimi zaten sürüyor: {self._status['target']}"
+                )
+            svc = self._get_service()
+            if svc is None:
+                raise SwapError("Mevcut model henüz yüklenmedi")
+            if model_name == svc.model_name:
+                raise SwapError(f"{model_name} zaten etkin model")
+            self._cancel = threading.Event()
+            self._staged = None
+            self._status = {
+                "state": LOADING,
+                "target": model_name,
+                "auto_activate": auto_activate,
+                "progress": 0.0,
+                "started_at": datetime.now().isoformat(),
+                "error": None,
+            }
+        threading.Thread(
+            target=self._run,
+            args=(model_name, auto_activate, self._cancel),
+            name="model-swap",
+            daemon=True,
+        ).start()
+        return self.status()
+
+    def activate(self) -> Dict[str, Any]:
+        with self._lock:
+            staged = self._staged
+            if staged is None:
+                raise SwapError("Etkinleştirilecek hazır bir model yok")
+            svc = self._get_service()
+            if staged.catalog_version != svc.catalog_version:
+                self._staged = None
+                self._update(
+                    state=FAILED, error="Katalog değişti; değişimi yeniden başlatın"
+                )
+                raise SwapError("Katalog hazırlık sırasında değişti")
+            self._previous = svc.swap_state(staged)
+            self._staged = None
+            self._update(state=ACTIVE, activated_at=datetime.now().isoformat())
+        logger.info(
+            "Model switched: %s → %s", self._previous.model_name, staged.model_name
+        )
+        self._notify()
+        return self.status()
+
+    def rollback(self) -> Dict[str, Any]:
+        with self._lock:
+            previous = self._previous
+            if previous is None:
+                raise SwapError("Geri alınacak önceki bir model yok")
+            svc = self._get_service()
+            if previous.catalog_version != svc.catalog_version:
+                raise SwapError("Önceki model eski bir katalogla kodlanmış")
+            # Art arda çağrı iki model arasında gidip gelir
+            self._previous = svc.swap_state(previous)
+            self._update(state=ROLLED_BACK, rolled_back_at=datetime.now().isoformat())
+        logger.info(
+            "Model rolled back: %s → %s",
+            self._previous.model_name,
+            previous.model_name,
+        )
+        self._notify()
+        return self.status()
+
+    def cancel(self) -> Dict[str, Any]:
+        with self._lock:
+            self._cancel.set()
+            if self._status["state"] == READY:
+                self._staged = None
+                self._update(state=CANCELLED)
+        return self.status()
+
+    def _notify(self):
+        if self.on_switch is not None:
+            try:
+                self.on_switch()
+            except Exception as e:
+                logger.warning("on_switch failed: %s", e)
+
+    # ——— Arka plan ——— #
+    def _run(self, model_name, auto_activate, cancel):
+        try:
+            start = time.perf_counter()
+            model = self._load_encoder(model_name)
+            self._update(
+                state=EMBEDDING, load_seconds=round(time.perf_counter() - start, 2)
+            )
+            if cancel.is_set():
+                raise EncodeCancelled
+
+            def encode(texts):
+                return encode_throttled(
+                    model,
+                    texts,
+                    self.chunk_size,
+                    self.duty_cycle,
+                    cancel,
+                    lambda done: self._update(progress=round(done, 4)),
+                )
+
+            staged = self._get_service().build_state(model, model_name, encode=encode)
+            with self._lock:
+                if cancel.is_set():
+                    raise EncodeCancelled
+                self._staged = staged
+                self._update(
+                    state=READY,
+                    progress=1.0,
+                    ready_at=datetime.now().isoformat(),
+                    embed_seconds=round(time.perf_counter() - start, 2),
+                    index=staged.index_report,
+                )
+            logger.info("Model %s ready for switch", model_name)
+            if auto_activate:
+                self.activate()
+        except EncodeCancelled:
+            self._update(state=CANCELLED)
+            logger.info("Model swap to %s cancelled", model_name)
+        except SwapError:
+            pass  # durum activate() içinde yazıldı
+        except Exception as e:
+            logger.error("Model swap to %s failed: %s", model_name, e)
+            self._update(state=FAILED, error=str(e))
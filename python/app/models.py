@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -14,25 +14,201 @@ class ExtCourse(BaseModel):
 
 
 # ───────── Yanıt Tarafı (eşleşme sonucu) ───────── #
+class DecisionProvenance(BaseModel):
+    """Adayın dayandığı komisyon kararı"""
+
+    int_code: str
+    approved: bool
+    decision_id: int
+    match: str  # exact | near
+    distance: int  # SimHash Hamming uzaklığı (exact ⇒ 0)
+    ext_code: Optional[str] = None
+    university: Optional[str] = None
+    decided_by: Optional[str] = None
+    decided_at: str
+    source: Optional[str] = None
+
+
+class PartnerProvenance(BaseModel):
+    """Önceden hesaplanmış ortak üniversite matrisi"""
+
+    university: str
+    file: str
+    top_k: int
+    model: str
+    catalog_version: Optional[str] = None
+    created_at: str
+
+
+class SentencePair(BaseModel):
+    """Harici ve dahili içerikten en iyi hizalanan cümle çifti"""
+
+    ext_sentence: str
+    int_sentence: str
+    percent: float
+
+
+class ExplainReport(BaseModel):
+    status: str  # ready | warming (katalog cümle indeksi kuruluyor)
+    explained: int  # açıklanan (ders, aday) çifti
+    truncated: bool  # süre bütçesi aşıldı, kalan dersler açıklanmadı
+    elapsed_ms: float
+
+
 class MatchCandidate(BaseModel):
     int_code: str
     percent: float
     exempt: bool
+    decision: Optional[DecisionProvenance] = None
+    explanation: Optional[List[SentencePair]] = None  # yalnızca explain=true
 
 
 class AutoMatchResult(BaseModel):
     ext_code: str
     candidates: List[MatchCandidate]  # boş liste ⇒ muaf ders yok
+    # "decision" ⇒ kayıtlı karar, "partner" ⇒ ortak matrisinden (model çalışmadı)
+    source: Optional[str] = None
+    partner: Optional[PartnerProvenance] = None
 
 
 class AutoMatchRequest(BaseModel):
     items: List[ExtCourse]
+    # Anlaşmalı üniversite ⇒ bilinen ders kodları önceden hesaplanmış matristen
+    university: Optional[str] = Field(None, example="Orta Doğu Teknik Üniversitesi")
+    # Muaf adaylar için cümle düzeyinde açıklama (süresi sınırlı)
+    explain: bool = Field(False, example=False)
 
 
 class AutoMatchResponse(BaseModel):
     """Auto match birden fazla ders için sonuçları içeren yanıt"""
 
     results: List[AutoMatchResult]
+    # "lexical" ⇒ model yüklenirken/aşırı yükte BM25 yanıtı; hiçbir aday muaf değil
+    mode: Optional[str] = None
+    explain: Optional[ExplainReport] = None
+
+
+# ───────── Eşleştirme Oturumları (/match-sessions) ───────── #
+class MatchSessionDelta(BaseModel):
+    # Aynı ext_code ile gönderilen ders güncellenir
+    upsert: List[ExtCourse] = Field(default_factory=list)
+    remove: List[str] = Field(default_factory=list, example=["CSE102"])
+
+
+class MatchSessionResponse(BaseModel):
+    session_id: str
+    revision: int  # her değişiklikte artar
+    expires_in: int  # saniye; her erişimde yenilenir
+    results: List[AutoMatchResult]  # yalnızca değişen dersler (GET ⇒ tümü)
+    removed: List[str] = Field(default_factory=list)
+
+
+# ───────── Kohort İşleri (/jobs) ───────── #
+class CohortStudent(BaseModel):
+    student_id: str = Field(..., example="2021123087")
+    items: List[ExtCourse]
+
+
+class CohortJobRequest(BaseModel):
+    students: List[CohortStudent]
+
+
+# ───────── Komisyon Kararları (/admin/decisions) ───────── #
+class DecisionRecord(BaseModel):
+    ext_content: str = Field(..., example="Programlamaya giriş, değişkenler…")
+    int_code: str = Field(..., example="BIL1003")
+    approved: bool = Field(..., example=True)
+    ext_code: Optional[str] = Field(None, example="CSE101")
+    university: Optional[str] = Field(None, example="Ankara Üniversitesi")
+    decided_by: Optional[str] = Field(None, example="Bölüm Muafiyet Komisyonu")
+    decided_at: Optional[str] = Field(None, example="2024-09-12")
+    source: Optional[str] = Field(None, example="committee")
+    note: Optional[str] = None
+
+
+class DecisionImportRequest(BaseModel):
+    decisions: List[DecisionRecord]
+
+
+class ModelSwapRequest(BaseModel):
+    model_name: str = Field(..., example="paraphrase-multilingual-MiniLM-L12-v2")
+    auto_activate: bool = Field(True, example=True)  # False ⇒ /activate beklenir
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    state: str  # queued | running | done | failed
+    progress: float
+    students: int
+    courses: int
+    unique_texts: Optional[int] = None
+    created_at: str
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+
+# ───────── Toplu Benzerlik (/similarity/bulk) ───────── #
+class BulkSimilarityItem(BaseModel):
+    ext_code: str = Field(..., example="CSE101")
+    ext_content: str = Field(..., example="Programming basics…")
+    int_code: str = Field(..., example="BIL1201")
+
+
+class BulkSimilarityRequest(BaseModel):
+    items: List[BulkSimilarityItem]
+
+
+class BulkSimilarityResult(BaseModel):
+    ext_code: str
+    int_code: str
+    similarity: float
+    percent: float
+    exempt: bool
+
+
+class BulkSimilarityResponse(BaseModel):
+    results: List[BulkSimilarityResult]
+
+
+# ───────── Katalog Araması (/courses/search) ───────── #
+class CourseSearchResult(BaseModel):
+    code: str
+    name: Optional[str] = None
+    credits: Optional[str] = None
+    match: str  # code | name | word (önek) ya da semantic
+    score: Optional[float] = None  # yalnızca semantic: benzerlik yüzdesi
+
+
+class CourseSearchResponse(BaseModel):
+    query: str
+    mode: str  # prefix | semantic | none | overloaded (anlamsal arama reddedildi)
+    results: List[CourseSearchResult]
+    elapsed_ms: float
+
+
+# ───────── Sunucu Tarafı Transkript Ayrıştırma (/match) ───────── #
+class ParsedCourse(BaseModel):
+    code: str
+    name: str
+    status: Optional[str] = None
+    language: Optional[str] = None
+    theory: Optional[float] = None
+    practice: Optional[float] = None
+    nationalCredit: Optional[float] = None
+    ects: Optional[float] = None
+    points: Optional[float] = None
+    grade: Optional[str] = None
+    comments: List[str] = []
+    content: str = ""
+
+
+class MatchResponse(BaseModel):
+    """/match: transkriptten çıkarılan dersler ve otomatik eşleşme sonuçları"""
+
+    courses: List[ParsedCourse]
+    results: List[AutoMatchResult]
+    timings: Dict[str, float]  # aşama → ms
+    cache: Dict[str, bool]  # dosya → önbellekten mi
 
 
 # ───────── PDF Generation Models ───────── #
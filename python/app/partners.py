@@ -0,0 +1,283 @@
+# app/partners.py
+"""Anlaşmalı üniversiteler için önceden hesaplanmış eşdeğerlik matrisleri.
+
+Çevrimdışı adım, bir ortak üniversitenin kataloğunu dahili katalogla
+``SimilarityService.auto_match`` ile (aynı normalizasyon ve skorlama)
+karşılaştırır. Her ortak ders için en yüksek ``top_k`` aday tek bir ``.npz``
+dosyasına yazılır::
+
+    python -m app.partners build odtu_katalog.json \\
+        --university "Orta Doğu Teknik Üniversitesi" --top-k 20
+
+Dosya içeriği: sıralı ortak ders kodları (ikili arama), ``(n × k)`` dahili
+ders indeksleri (``int32``) ve skorlar (``float32``), dahili kod listesi ve
+model/katalog sürümünü taşıyan meta veri. İstek anında ortak üniversiteyi ve
+bilinen bir ders kodunu içeren gönderimler kodlama yapılmadan bu dosyadan
+yanıtlanır. Skor parmak izi (model, sıkıştırılmış indeks ayarları, sözcüksel
+kısa liste) ya da katalog sürümü değişmişse dosya eskimiş sayılır ve yeniden
+üretilene kadar kullanılmaz. Bu yüzden üretim sunucuyla aynı ``INDEX_*`` ve
+``LEXICAL_SHORTLIST`` ayarlarıyla yapılır.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .textnorm import turkish_lower
+from .transcript_parser import normalize_code
+
+__all__ = ["PartnerMatrix", "PartnerStore", "build_partner_matrix", "slugify"]
+
+logger = logging.getLogger(__name__)
+
+_ASCII_FOLD = str.maketrans("çğıöşü", "cgiosu")
+
+
+def slugify(university: str) -> str:
+    """Üniversite adından dosya adı/anahtar: ``"ODTÜ" → "odtu"``."""
+    text = turkish_lower(university.strip()).translate(_ASCII_FOLD)
+    return re.sub(r"[^a-z0-9]+", "-", text).strip("-")
+
+
+class PartnerMatrix:
+    def __init__(self, path):
+        self.path = Path(path)
+        with np.load(self.path, allow_pickle=False) as data:
+            self.meta = json.loads(str(data["meta"]))
+            self.codes = data["codes"]
+            self.int_codes = data["int_codes"].tolist()
+            self.top_idx = data["top_idx"]
+            self.top_score = data["top_score"]
+        self.university = self.meta["university"]
+        self.slug = slugify(self.university)
+        # Yanıtta adayların hangi dosyadan geldiği belirtilir
+        self.provenance = {
+            "university": self.university,
+            "file": self.path.name,
+            "top_k": self.meta["top_k"],
+            "model": self.meta["model"],
+            "fingerprint": self.meta.get("fingerprint"),
+            "catalog_version": self.meta["catalog_version"],
+            "created_at": self.meta["created_at"],
+        }
+
+    def fresh(self, fingerprint, catalog_version) -> bool:
+        # Parmak izi olmayan eski dosyalar eskimiş sayılır
+        return (
+            self.meta.get("fingerprint") == fingerprint
+            and self.meta["catalog_version"] == catalog_version
+        )
+
+    def row(self, code) -> Optional[int]:
+        code = normalize_code(code)
+        i = int(np.searchsorted(self.codes, code))
+        if i < len(self.codes) and self.codes[i] == code:
+            return i
+        return None
+
+    def candidates(self, row):
+        """(dahili kodlar, skorlar) en yüksekten düşüğe."""
+        codes = [self.int_codes[j] for j in self.top_idx[row].tolist()]
+        return codes, self.top_score[row]
+
+    def info(self):
+        return {
+            "university": self.university,
+            "file": self.path.name,
+            "courses": len(self.codes),
+            **{k: v for k, v in self.meta.items() if k != "university"},
+        }
+
+
+class PartnerStore:
+    """Dizindeki tüm ortak matrisleri yükler; üniversite adına göre arar."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._matrices: Dict[str, PartnerMatrix] = {}
+        self.hits: Dict[str, int] = {}
+        self.reload()
+
+    def reload(self):
+        matrices = {}
+        for path in sorted(self.directory.glob("*.npz")):
+            try:
+                m = PartnerMatrix(path)
+            except Exception as e:  # bozuk dosya diğerlerini engellemesin
+                logger.warning("Partner matrix %s skipped: %s", path.name, e)
+                continue
+            matrices[m.slug] = m
+        self._matrices = matrices
+        return self.list()
+
+    def get(self, university) -> Optional[PartnerMatrix]:
+        if not university:
+            return None
+        return self._matrices.get(slugify(university))
+
+    def lookup(self, university, ext_codes, fingerprint, catalog_version, skip=()):
+        """``{satır: (matris, matris satırı)}``; eski ya da bilinmeyenler atlanır."""
+        m = self.get(university)
+        if m is None:
+            return {}
+        if not m.fresh(fingerprint, catalog_version):
+            logger.warning(
+                "Partner matrix %s is stale (scoring/catalog changed)", m.path.name
+            )
+            return {}
+        found = {}
+        for i, code in enumerate(ext_codes):
+            if i in skip:
+                continue
+            row = m.row(code)
+            if row is not None:
+                found[i] = (m, row)
+        if found:
+            self.hits[m.slug] = self.hits.get(m.slug, 0) + len(found)
+        return found
+
+    def list(self, fingerprint=None, catalog_version=None) -> List[dict]:
+        out = []
+        for m in self._matrices.values():
+            info = m.info()
+            if fingerprint is not None:
+                info["fresh"] = m.fresh(fingerprint, catalog_version)
+            out.append(info)
+        return out
+
+
+# ——— Çevrimdışı üretim ——— #
+def build_partner_matrix(svc, university, courses, top_k=20, batch_size=256):
+    """Ortak katalog (``[{"code", "content"}]``) için matris dosyası içeriği.
+
+    Skorlar ``svc.auto_match`` ile hesaplanır; canlı yol ile birebir aynıdır.
+    """
+    courses = {
+        normalize_code(c["code"]): c.get("content") or c.get("name") or ""
+        for c in courses
+    }
+    codes = np.array(sorted(courses), dtype=str)
+    texts = [courses[c] for c in codes.tolist()]
+    state = svc.state
+    k = min(top_k, len(state.codes))
+    top_idx = np.empty((len(codes), k), dtype=np.int32)
+    top_score = np.empty((len(codes), k), dtype=np.float32)
+    for offset in range(0, len(texts), batch_size):
+        sims = np.asarray(
+            svc.auto_match(texts[offset : offset + batch_size], state=state)
+        )
+        part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(sims, part, axis=1)
+        # Eşit skorlarda katalog sırası (canlı sıralama ile aynı)
+        order = np.lexsort((part, -np.round(scores * 100, 2)), axis=1)
+        rows = slice(offset, offset + len(sims))
+        top_idx[rows] = np.take_along_axis(part, order, axis=1)
+        top_score[rows] = np.take_along_axis(scores, order, axis=1)
+    meta = {
+        "university": university,
+        "model": state.model_name,
+        "fingerprint": svc.fingerprint(state),
+        "catalog_version": state.catalog_version,
+        "top_k": k,
+        "created_at": datetime.now().isoformat(),
+    }
+    return {
+        "meta": np.array(json.dumps(meta, ensure_ascii=False)),
+        "codes": codes,
+        "int_codes": np.array(state.codes, dtype=str),
+        "top_idx": top_idx,
+        "top_score": top_score,
+    }
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        prog="python -m app.partners", description="Ortak üniversite matrisleri"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Ortak kataloğu dahili katalogla eşleştir")
+    build.add_argument("catalog", help='Ortak katalog JSON: [{"code", "content"}]')
+    build.add_argument("--university", required=True)
+    build.add_argument("--top-k", type=int, default=20)
+    build.add_argument("--batch-size", type=int, default=256)
+    build.add_argument("--internal", default="internal_courses.json")
+    build.add_argument("--mongo-uri", default=os.getenv("MONGO_URI"))
+    build.add_argument("--model", default=os.getenv("MODEL_NAME", "all-MiniLM-L6-v2"))
+    # Skorlar canlı yolla aynı olsun diye sunucunun indeks ayarları kullanılır
+    build.add_argument(
+        "--pca-dim", type=int, default=int(os.getenv("INDEX_PCA_DIM", 0))
+    )
+    build.add_argument("--index-dtype", default=os.getenv("INDEX_DTYPE", "float32"))
+    build.add_argument(
+        "--rescore-k", type=int, default=int(os.getenv("INDEX_RESCORE_K", 50))
+    )
+    build.add_argument(
+        "--shortlist", type=int, default=int(os.getenv("LEXICAL_SHORTLIST", 0))
+    )
+    listing = sub.add_parser("list", help="Üretilmiş matrisleri listele")
+    for p in (build, listing):
+        p.add_argument("--dir", default=os.getenv("PARTNERS_DIR", "partners"))
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for info in PartnerStore(args.dir).list():
+            print(json.dumps(info, ensure_ascii=False))
+        return
+
+    from .lexical import LexicalIndex
+    from .repository import CourseRepository
+    from .services import SimilarityService
+    from .textnorm import TextNormalizer
+
+    repo = CourseRepository(src=args.internal, mongo_uri=args.mongo_uri)
+    asyncio.run(repo.load())
+    start = time.perf_counter()
+    normalizer = TextNormalizer.from_env()
+    svc = SimilarityService(
+        args.model,
+        float(os.getenv("DEFAULT_THRESHOLD", 0.80)),
+        repo,
+        pca_dim=args.pca_dim,
+        index_dtype=args.index_dtype,
+        rescore_k=args.rescore_k,
+        lexical=(
+            LexicalIndex.from_repo(repo, normalizer=normalizer)
+            if args.shortlist
+            else None
+        ),
+        shortlist_k=args.shortlist,
+        normalizer=normalizer,
+    )
+    courses = json.loads(Path(args.catalog).read_text(encoding="utf-8"))
+    arrays = build_partner_matrix(
+        svc, args.university, courses, args.top_k, args.batch_size
+    )
+
+    out = Path(args.dir) / f"{slugify(args.university)}.npz"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + ".tmp.npz")
+    np.savez_compressed(tmp, **arrays)
+    os.replace(tmp, out)
+    print(
+        f"{len(arrays['codes'])} ders × top-{arrays['top_idx'].shape[1]} → {out} "
+        f"({out.stat().st_size / 1024:.1f} KiB, {time.perf_counter() - start:.1f} s)"
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
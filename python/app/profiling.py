@@ -0,0 +1,197 @@
+# app/profiling.py
+"""İsteğe bağlı, istek başına örnekleyici profil çıkarma.
+
+Bir istek profillendiğinde, isteği çalıştıran iş parçacığı ve isteğin
+``run_in_threadpool`` ile başlattığı işçi iş parçacıkları arka plandaki bir
+örnekleyici tarafından düzenli aralıklarla (``sys._current_frames``)
+yoklanır. Sonuç, flame graph araçlarının (flamegraph.pl, speedscope)
+doğrudan okuduğu "collapsed stack" biçiminde (``.folded``) ve
+``tracemalloc`` bellek anlık görüntüsü olarak (``.mem.txt``) kaydedilir.
+
+Aynı anda yalnızca bir profil alınır; başka bir profil sürerken gelen istek
+profillenmeden çalışır. Yine de iki çıktı süreç geneli bilgi içerir ve
+``.mem.txt`` başlığında böyle etiketlenir:
+
+* async uç noktalar olay döngüsü iş parçacığında çalıştığından, aynı anda
+  döngüde çalışan başka isteklerin örnekleri de ``.folded`` dosyasına karışabilir;
+* ``tracemalloc`` iş parçacığı ayırt etmez; ``.mem.txt`` profil süresince tüm
+  süreçteki ayırmaları gösterir (profilcinin ve içe aktarmaların kendi
+  ayırmaları süzülür).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool as _run_in_threadpool
+
+__all__ = ["RequestProfiler", "run_in_threadpool", "list_profiles"]
+
+_active: contextvars.ContextVar[Optional["RequestProfiler"]] = contextvars.ContextVar(
+    "active_profile", default=None
+)
+
+# Süreç başına tek profil: tracemalloc ve döngü iş parçacığı paylaşılır
+_capture_lock = threading.Lock()
+
+# Anlık görüntüden atılan ayırmalar (profilci, tracemalloc, içe aktarma)
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+class RequestProfiler:
+    """Kayıtlı iş parçacıklarını örnekleyen basit örnekleyici profilci."""
+
+    def __init__(self, label: str, out_dir: str, interval: float = 0.005):
+        self.label = label
+        self.out_dir = Path(out_dir)
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._threads: Dict[int, int] = {}  # thread id → kayıt sayısı
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(
+            target=self._run, name=f"profiler-{label}", daemon=True
+        )
+        self._token = None
+        self._owns_tracemalloc = False
+        self.started = 0.0
+
+    # ——— İş parçacığı kaydı ——— #
+    def attach(self, ident: Optional[int] = None):
+        ident = ident or threading.get_ident()
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+
+    def detach(self, ident: Optional[int] = None):
+        ident = ident or threading.get_ident()
+        with self._lock:
+            if self._threads.get(ident, 0) <= 1:
+                self._threads.pop(ident, None)
+            else:
+                self._threads[ident] -= 1
+
+    # ——— Örnekleme ——— #
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                idents = set(self._threads)
+            for ident, frame in sys._current_frames().items():
+                if ident == me or ident not in idents:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self) -> Optional["RequestProfiler"]:
+        """Profili başlatır; başka bir profil sürüyorsa ``None`` döner."""
+        if not _capture_lock.acquire(blocking=False):
+            return None
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._owns_tracemalloc = True
+        self.started = time.perf_counter()
+        self.attach()
+        self._token = _active.set(self)
+        self._sampler.start()
+        return self
+
+    def stop(self) -> Path:
+        self._stop.set()
+        self._sampler.join()
+        try:
+            _active.reset(self._token)
+        except ValueError:
+            _active.set(None)  # farklı bir bağlamda durduruldu
+        self.detach()
+        elapsed = time.perf_counter() - self.started
+
+        try:
+            snapshot = tracemalloc.take_snapshot()
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+        finally:
+            _capture_lock.release()
+        return self._save(snapshot, elapsed)
+
+    def _save(self, snapshot, elapsed) -> Path:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        stem = "%s_%s_%s" % (
+            datetime.now().strftime("%Y%m%d-%H%M%S"),
+            self.label,
+            uuid.uuid4().hex[:8],
+        )
+        folded = self.out_dir / f"{stem}.folded"
+        folded.write_text(
+            "".join(f"{stack} {n}\n" for stack, n in self.samples.most_common()),
+            encoding="utf-8",
+        )
+        top = snapshot.filter_traces(_SNAPSHOT_FILTERS).statistics("lineno")[:50]
+        lines = [
+            f"# {self.label}: {elapsed * 1000:.1f} ms, "
+            f"{sum(self.samples.values())} samples @ {self.interval * 1000:.1f} ms",
+            "# process-wide: allocations of all threads during the request "
+            "(tracemalloc is not per-request); the .folded samples include the "
+            "event loop thread, shared with concurrent requests",
+            f"# total traced: {sum(s.size for s in top) / 1024:.1f} KiB (top 50)",
+        ]
+        lines.extend(str(stat) for stat in top)
+        (self.out_dir / f"{stem}.mem.txt").write_text(
+            "\n".join(lines) + "\n", encoding="utf-8"
+        )
+        return folded
+
+
+async def run_in_threadpool(func, *args, **kwargs):
+    """``fastapi.concurrency.run_in_threadpool`` ile aynı; ancak etkin bir
+    profil varsa işçi iş parçacığını da örneklemeye dahil eder."""
+    profiler = _active.get()
+    if profiler is None:
+        return await _run_in_threadpool(func, *args, **kwargs)
+
+    @functools.wraps(func)
+    def traced(*a, **kw):
+        profiler.attach()
+        try:
+            return func(*a, **kw)
+        finally:
+            profiler.detach()
+
+    return await _run_in_threadpool(traced, *args, **kwargs)
+
+
+def list_profiles(out_dir: str) -> List[dict]:
+    path = Path(out_dir)
+    if not path.exists():
+        return []
+    return [
+        {
+            "name": p.name,
+            "size_bytes": p.stat().st_size,
+            "created_at": datetime.fromtimestamp(p.stat().st_mtime).isoformat(),
+        }
+        for p in sorted(path.iterdir(), key=os.path.getmtime, reverse=True)
+        if p.suffix in (".folded", ".txt")
+    ]
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import pathlib
 from typing import Dict, Optional
@@ -10,6 +11,13 @@ class CourseRepository:
         self, src: str | None = "internal_courses.json", mongo_uri: str | None = None
     ):
         self._cache: Dict[str, str] = {}
+        # Kod → {"name", "credits"}; arama ve görüntüleme için (skorlamaya girmez)
+        self._meta: Dict[str, dict] = {}
+        self.version: Optional[str] = (
+            None  # sıralı içerik özeti; her load() sonrası güncellenir
+        )
+        # (sürüm, içerikler) tek atamayla güncellenir; tutarlı anlık görüntü
+        self._versioned = (None, self._cache)
         if mongo_uri:
             self._mongo = motor.AsyncIOMotorClient(mongo_uri)["db"]["courses"]
         else:
@@ -18,13 +26,34 @@ class CourseRepository:
 
     async def load(self):
         if self._mongo:
-            async for d in self._mongo.find({}, {"_id": 0, "code": 1, "content": 1}):
-                self._cache[d["code"]] = d["content"]
+            projection = {"_id": 0, "code": 1, "content": 1, "name": 1, "credits": 1}
+            # Sürüm sıraya bağlı: doğal sıra yerine ekleme sırası (_id) sabittir
+            cursor = self._mongo.find({}, projection).sort("_id", 1)
+            docs = [d async for d in cursor]
         else:
-            self._cache = {
-                d["code"]: d.get("content", "")
-                for d in json.loads(self._path.read_text(encoding="utf-8"))
-            }
+            docs = json.loads(self._path.read_text(encoding="utf-8"))
+        # Yeni sözlükler atanır: silinen dersler kalmaz, okuyucular yarım katalog görmez
+        self._cache = {d["code"]: d.get("content", "") for d in docs}
+        self._meta = {d["code"]: _meta_of(d) for d in docs}
+        # Sıra özete dahildir: skor satırları, kalıcı indeks ve oturumlar
+        # sütunları katalog sırasına göre tutar; aynı içerik farklı sırayla
+        # yüklenirse sürüm de değişmelidir
+        self.version = hashlib.sha256(
+            json.dumps(list(self._cache.items()), ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:16]
+        self._versioned = (self.version, self._cache)
+
+    def contents(self, version: str) -> Optional[Dict[str, str]]:
+        """``version`` sürümüne ait içerikler; katalog o sürümde değilse ``None``."""
+        current, cache = self._versioned
+        return cache if current == version else None
 
     def get(self, code: str) -> Optional[str]:
         return self._cache.get(code)
+
+    def meta(self, code: str) -> dict:
+        return self._meta.get(code) or {"name": None, "credits": None}
+
+
+def _meta_of(doc) -> dict:
+    return {"name": doc.get("name"), "credits": doc.get("credits")}
@@ -0,0 +1,254 @@
+# app/score_store.py
+"""Yeniden başlatmalar arasında kalıcı benzerlik skoru deposu.
+
+Bellekteki ``match_cache`` her dağıtımda sıfırlanır; bu depo ise hesaplanan
+her skor satırını SQLite'ta (WAL) saklar. Anahtar:
+
+    (normalize içeriğin SHA-256 özeti, model parmak izi, katalog sürümü)
+
+Değer, katalog sırasındaki tüm dahili derslerin skorlarıdır (``float32``
+blob). Katalog sürümü içerikle birlikte dahili kod sırasının da özetidir;
+sıra değişirse sürüm de değişir ve eski satırlar okunmaz. Böylece satır başına
+tek kayıt, (içerik, dahili kod) başına ayrı kayıt tutmakla eşdeğerdir ve çok daha
+küçüktür.
+
+* Okuma istek yolunda, kodlamadan önce tek toplu sorguyla yapılır.
+* Yazma istek yolunun dışındadır: kayıtlar kuyruğa alınır ve arka plan iş
+  parçacığı bunları ``flush_size`` kayıt ya da ``flush_interval`` saniyede
+  bir toplu olarak yazar.
+* Model ya da katalog değişince eski kayıtlar hemen silinmez; yazıcı yalnızca
+  bir yazmanın ardından en fazla ``purge_batch`` eski kaydı siler (tembel
+  temizlik). Nesiller (parmak izi, katalog sürümü) ``generations`` tablosunda
+  ilk/son yazma zamanıyla tutulur; yalnızca son yazması güncel neslin ilk
+  yazmasından ``purge_grace`` saniye önce kalan nesiller eskidir. Böylece
+  farklı nesillerdeki işçiler ya da geri alınan bir model (daha yeni nesil
+  korunur) birbirinin geçerli kayıtlarını silmez.
+* ``max_rows`` aşılırsa en eski kayıtlar atılır. Satır sayısı artımlı
+  izlenir; tam sayım yalnızca tahmin sınırı aştığında yapılır.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+__all__ = ["ScoreStore", "content_key"]
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    content_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    catalog_version TEXT NOT NULL,
+    scores BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (content_hash, model, catalog_version)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scores_generation ON scores (model, catalog_version);
+CREATE INDEX IF NOT EXISTS scores_created ON scores (created_at);
+CREATE TABLE IF NOT EXISTS generations (
+    model TEXT NOT NULL,
+    catalog_version TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (model, catalog_version)
+) WITHOUT ROWID;
+"""
+
+_KEY = "content_hash, model, catalog_version"
+# SQLite'ın bağlı parametre sınırının altında kalınır
+_LOOKUP_CHUNK = 500
+
+
+def content_key(normalized: str) -> str:
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class ScoreStore:
+    def __init__(
+        self,
+        path,
+        flush_size: int = 256,
+        flush_interval: float = 2.0,
+        purge_batch: int = 1000,
+        max_rows: int = 0,
+        purge_grace: float = 600.0,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.purge_batch = purge_batch
+        self.max_rows = max_rows
+        # Güncel nesil başladıktan sonra bu kadar saniye yazılmayan nesil eskidir
+        self.purge_grace = purge_grace
+        self._lock = threading.Lock()
+        self._db = self._connect()
+        self._db.executescript(_SCHEMA)
+        with self._db:
+            # Nesil tablosundan önceki depolar için nesiller bir kez çıkarılır
+            self._db.execute(
+                "INSERT OR IGNORE INTO generations SELECT model, catalog_version, "
+                "MIN(created_at), MAX(created_at) FROM scores "
+                "GROUP BY model, catalog_version"
+            )
+        # Tahmini satır sayısı (değiştirilen satırlar da sayıldığından üst sınır)
+        (self._rows,) = self._db.execute("SELECT COUNT(*) FROM scores").fetchone()
+        self.stats_counters = {"hits": 0, "misses": 0, "written": 0, "purged": 0}
+        # Temizlikte korunacak güncel nesil (model, katalog sürümü)
+        self._current: Optional[Tuple[str, str]] = None
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer = threading.Thread(
+            target=self._run, name="score-store-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _connect(self):
+        db = sqlite3.connect(str(self.path), check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    # ——— Okuma ——— #
+    def get_many(
+        self, keys: List[str], model: str, catalog_version: str, width: int
+    ) -> Dict[str, np.ndarray]:
+        """Bulunan anahtarlar için skor satırları; boyu ``width`` olmayanlar atlanır."""
+        self._current = (model, catalog_version)
+        found: Dict[str, np.ndarray] = {}
+        uniq = list(dict.fromkeys(keys))
+        with self._lock:
+            for offset in range(0, len(uniq), _LOOKUP_CHUNK):
+                chunk = uniq[offset : offset + _LOOKUP_CHUNK]
+                rows = self._db.execute(
+                    "SELECT content_hash, scores FROM scores WHERE model = ? AND "
+                    "catalog_version = ? AND content_hash IN "
+                    f"({','.join('?' * len(chunk))})",
+                    (model, catalog_version, *chunk),
+                ).fetchall()
+                for key, blob in rows:
+                    row = np.frombuffer(blob, dtype=np.float32)
+                    if len(row) == width:
+                        found[key] = row
+            self.stats_counters["hits"] += len(found)
+            self.stats_counters["misses"] += len(uniq) - len(found)
+        return found
+
+    # ——— Yazma (arka planda) ——— #
+    def put_many(self, keys: List[str], model: str, catalog_version: str, matrix):
+        """Satırları yazma kuyruğuna ekler; çağıranı bekletmez."""
+        self._current = (model, catalog_version)
+        matrix = np.asarray(matrix, dtype=np.float32)
+        now = time.time()
+        for key, row in zip(keys, matrix):
+            self._queue.put((key, model, catalog_version, row.tobytes(), now))
+
+    def _run(self):
+        db = self._connect()
+        while True:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.flush_size:
+                try:
+                    item = self._queue.get(
+                        timeout=max(deadline - time.monotonic(), 0.001)
+                    )
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                if batch:
+                    self._write(db, batch)
+                    self._purge(db)
+            except Exception as e:  # depo yazılamaması istekleri etkilememeli
+                logger.warning("score store flush failed: %s", e)
+            if stop:
+                db.close()
+                return
+
+    def _write(self, db, batch):
+        now = time.time()
+        generations = {(model, version) for _, model, version, _, _ in batch}
+        with db:
+            db.executemany("INSERT OR REPLACE INTO scores VALUES (?,?,?,?,?)", batch)
+            db.executemany(
+                "INSERT INTO generations VALUES (?,?,?,?) ON CONFLICT "
+                "(model, catalog_version) DO UPDATE SET last_seen = excluded.last_seen",
+                [(*gen, now, now) for gen in generations],
+            )
+        self._rows += len(batch)
+        self.stats_counters["written"] += len(batch)
+
+    def _purge(self, db):
+        purged = 0
+        current = self._current
+        with db:
+            if current is not None and self.purge_batch:
+                purged += self._purge_stale(db, current)
+            self._rows -= purged
+            if self.max_rows and self._rows > self.max_rows:
+                # Tahmin sınırı aştı: tam sayımla doğrulanır
+                (self._rows,) = db.execute("SELECT COUNT(*) FROM scores").fetchone()
+                if self._rows > self.max_rows:
+                    evicted = db.execute(
+                        f"DELETE FROM scores WHERE ({_KEY}) IN (SELECT {_KEY} "
+                        "FROM scores ORDER BY created_at LIMIT ?)",
+                        (self._rows - self.max_rows,),
+                    ).rowcount
+                    self._rows -= evicted
+                    purged += evicted
+        self.stats_counters["purged"] += purged
+
+    def _purge_stale(self, db, current):
+        """Güncel nesil başlamadan önce yazması biten nesillerden toplu silme."""
+        row = db.execute(
+            "SELECT first_seen FROM generations "
+            "WHERE model = ? AND catalog_version = ?",
+            current,
+        ).fetchone()
+        if row is None:
+            return 0
+        # Nesil satırları silinmez: ilk yazma zamanı sıfırlanırsa nesiller birbirini
+        # eski sanabilir. Yalnızca kaydı kalmış eski nesiller taranır.
+        stale = db.execute(
+            "SELECT model, catalog_version FROM generations AS g WHERE last_seen < ? "
+            "AND EXISTS (SELECT 1 FROM scores AS s WHERE s.model = g.model "
+            "AND s.catalog_version = g.catalog_version)",
+            (row[0] - self.purge_grace,),
+        ).fetchall()
+        purged = 0
+        for generation in stale:
+            budget = self.purge_batch - purged
+            if budget <= 0:
+                break
+            n = db.execute(
+                f"DELETE FROM scores WHERE ({_KEY}) IN (SELECT {_KEY} FROM scores "
+                "WHERE model = ? AND catalog_version = ? LIMIT ?)",
+                (*generation, budget),
+            ).rowcount
+            purged += n
+        return purged
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (rows,) = self._db.execute("SELECT COUNT(*) FROM scores").fetchone()
+        return {"rows": rows, "queued": self._queue.qsize(), **self.stats_counters}
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join(timeout=5)
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,128 @@
+# app/search.py
+"""Dahili katalogda kod/ad ile arama ve otomatik tamamlama.
+
+Önek indeksi katalog yüklenirken bir kez kurulur: her ders için
+Türkçe küçültülmüş ve ASCII katlanmış anahtarlar (``BIL 2005`` → ``bil2005``,
+``Veri Yapıları`` → ``veri yapilari`` ve her sözcükten başlayan son ekler
+``yapilari``) sıralı bir diziye yazılır. Sorgu aynı biçimde katlanır ve
+``bisect`` ile aralığı bulunur; katalog boyutundan bağımsız olarak
+milisaniyenin altında yanıt verir.
+
+Önek eşleşmesi olmayan serbest metin sorguları mevcut katalog gömmeleriyle
+anlamsal olarak aranır (sorgu başına tek kodlama).
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from bisect import bisect_left
+from typing import Dict, List
+
+import numpy as np
+
+from .textnorm import turkish_lower
+
+__all__ = ["CatalogSearch", "fold"]
+
+_ASCII_FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+_NON_WORD_RE = re.compile(r"[^\w]+")
+
+# Eşleşme türü → sıralama önceliği
+_CODE, _NAME, _WORD = 0, 1, 2
+_KINDS = ("code", "name", "word")
+
+
+def fold(text: str) -> str:
+    """Türkçe küçültme + ASCII katlama; noktalama tek boşluğa iner."""
+    text = turkish_lower(text or "").translate(_ASCII_FOLD)
+    return _NON_WORD_RE.sub(" ", text).strip()
+
+
+class CatalogSearch:
+    def __init__(self, courses: Dict[str, dict], max_scan: int = 500):
+        """``courses``: kod → {"name", "credits"} (katalog sırasıyla)."""
+        start = time.perf_counter()
+        self.codes = list(courses)
+        self.courses = courses
+        self._doc_of = {code: doc for doc, code in enumerate(self.codes)}
+        self.max_scan = max_scan
+        entries = []
+        for doc, code in enumerate(self.codes):
+            entries.append((fold(code).replace(" ", ""), _CODE, doc))
+            name = fold(courses[code].get("name") or "")
+            if name:
+                entries.append((name, _NAME, doc))
+                words = name.split(" ")
+                for w in range(1, len(words)):
+                    entries.append((" ".join(words[w:]), _WORD, doc))
+        entries.sort()
+        self._keys = [key for key, _, _ in entries]
+        self._kinds = [kind for _, kind, _ in entries]
+        self._docs = [doc for _, _, doc in entries]
+        self.report = {
+            "courses": len(self.codes),
+            "keys": len(entries),
+            "build_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    @classmethod
+    def from_repo(cls, repo, **kwargs) -> "CatalogSearch":
+        return cls({code: repo.meta(code) for code in repo._cache}, **kwargs)
+
+    def _result(self, doc, match, score=None):
+        code = self.codes[doc]
+        meta = self.courses[code]
+        return {
+            "code": code,
+            "name": meta.get("name"),
+            "credits": meta.get("credits"),
+            "match": match,
+            "score": score,
+        }
+
+    # ——— Önek ——— #
+    def prefix(self, query: str, limit: int = 10) -> List[dict]:
+        """Kod ya da ad öneki; kod eşleşmeleri önce, sonra kısa adlar."""
+        q = fold(query)
+        if not q:
+            return []
+        keys = (q, q.replace(" ", "")) if " " in q else (q,)
+        best: Dict[int, int] = {}
+        for key in keys:
+            i = bisect_left(self._keys, key)
+            end = min(i + self.max_scan, len(self._keys))
+            while i < end and self._keys[i].startswith(key):
+                doc, kind = self._docs[i], self._kinds[i]
+                if kind < best.get(doc, len(_KINDS)):
+                    best[doc] = kind
+                i += 1
+
+        def rank(item):
+            # Kod eşleşmeleri kod sırasıyla, ad eşleşmeleri kısa ad önce
+            doc, kind = item
+            code = self.codes[doc]
+            length = len(self.courses[code].get("name") or "") if kind else 0
+            return kind, length, code
+
+        ranked = sorted(best.items(), key=rank)
+        return [self._result(doc, _KINDS[kind]) for doc, kind in ranked[:limit]]
+
+    # ——— Anlamsal ——— #
+    def semantic(self, svc, query: str, limit: int = 10) -> List[dict]:
+        """Sorguyu bir kez kodlar ve katalog gömmeleriyle skorlar."""
+        state = svc.state
+        text = svc.normalizer.normalize(query)
+        _, sims = svc.embed_and_score([text], state)
+        sims = np.asarray(sims)[0]
+        k = min(limit, len(sims))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top], kind="stable")]
+        out = []
+        for j in top.tolist():
+            doc = self._doc_of.get(state.codes[j])
+            if doc is not None:
+                out.append(
+                    self._result(doc, "semantic", round(float(sims[j]) * 100, 2))
+                )
+        return out
@@ -0,0 +1,294 @@
+# app/serialization.py
+"""Eşleşme sonuçları için hızlı serileştirme yolu.
+
+Aday başına Pydantic nesnesi üretmek yerine benzerlik matrisinden doğrudan
+bayt üretir. Desteklenen biçimler (``Accept`` başlığı ile seçilir):
+
+* ``application/json`` – ``AutoMatchResponse`` ile birebir aynı şekil (orjson)
+* ``application/vnd.automatch.columnar+json`` – kodlar bir kez, yüzde dizileri
+* ``application/msgpack`` / ``application/vnd.automatch.columnar+msgpack``
+
+Belirli bir boyutun üzerindeki gövdeler gzip veya brotli ile sıkıştırılır.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+
+import numpy as np
+
+from .tracing import stage
+
+__all__ = [
+    "JSON",
+    "COLUMNAR_JSON",
+    "MSGPACK",
+    "COLUMNAR_MSGPACK",
+    "rank_matrix",
+    "negotiate_format",
+    "auto_match_payload",
+    "dumps_json",
+    "render_auto_match",
+    "compress_body",
+]
+
+JSON = "application/json"
+COLUMNAR_JSON = "application/vnd.automatch.columnar+json"
+MSGPACK = "application/msgpack"
+COLUMNAR_MSGPACK = "application/vnd.automatch.columnar+msgpack"
+
+_ACCEPT_MAP = {
+    COLUMNAR_JSON: COLUMNAR_JSON,
+    COLUMNAR_MSGPACK: COLUMNAR_MSGPACK,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+}
+
+
+def negotiate_format(accept):
+    """``Accept`` başlığından yanıt biçimini seçer; bilinmeyenler JSON'a düşer."""
+    for part in (accept or "").split(","):
+        media = part.split(";")[0].strip().lower()
+        if media in _ACCEPT_MAP:
+            return _ACCEPT_MAP[media]
+    return JSON
+
+
+def rank_matrix(similarity_matrix, threshold):
+    """Yüzdeleri, satır bazında azalan sıralamayı ve muafiyet maskesini döndürür.
+
+    Sıralama kararlıdır; eşit skorlarda katalog sırası korunur (eski
+    ``candidates.sort`` davranışı ile aynı).
+    """
+    percent = np.round(np.asarray(similarity_matrix, dtype=np.float64) * 100, 2)
+    order = np.argsort(-percent, axis=1, kind="stable")
+    threshold_pct = round(threshold * 100, 2)
+    return percent, order, percent >= threshold_pct
+
+
+def _decision_candidates(records):
+    """Kayıtlı kararlardan aday listesi; onaylılar önce."""
+    return [
+        {
+            "int_code": r["int_code"],
+            "percent": 100.0 if r["approved"] else 0.0,
+            "exempt": r["approved"],
+            "decision": r,
+        }
+        for r in sorted(records, key=lambda r: not r["approved"])
+    ]
+
+
+def _rows_payload(
+    ext_codes,
+    int_codes,
+    percent,
+    order,
+    exempt,
+    decisions=None,
+    served=(),
+    precomputed=None,
+    explanations=None,
+):
+    int_codes = np.asarray(int_codes, dtype=object)
+    decisions = decisions or {}
+    precomputed = precomputed or {}
+    explanations = explanations or {}
+    results = []
+    for i, ext_code in enumerate(ext_codes):
+        if i in served:
+            results.append(
+                {
+                    "ext_code": ext_code,
+                    "candidates": _decision_candidates(decisions[i]),
+                    "source": "decision",
+                }
+            )
+            continue
+        idx = order[i]
+        partner = precomputed.get(i)
+        if partner is not None:
+            # Matriste yalnızca ilk top_k ders saklıdır
+            idx = idx[: partner["top_k"]]
+        candidates = [
+            {"int_code": c, "percent": p, "exempt": e}
+            for c, p, e in zip(
+                int_codes[idx].tolist(),
+                percent[i, idx].tolist(),
+                exempt[i, idx].tolist(),
+            )
+        ]
+        if explanations:
+            for c in candidates:
+                pairs = explanations.get((i, c["int_code"]))
+                if pairs is not None:
+                    c["explanation"] = pairs
+        if i in decisions:
+            # Reddedilmiş çiftler model skoruna rağmen muaf değildir
+            rejected = {r["int_code"]: r for r in decisions[i]}
+            for c in candidates:
+                r = rejected.get(c["int_code"])
+                if r is not None:
+                    c["exempt"] = False
+                    c["decision"] = r
+        result = {"ext_code": ext_code, "candidates": candidates}
+        if partner is not None:
+            result["source"] = "partner"
+            result["partner"] = partner
+        results.append(result)
+    return {"results": results}
+
+
+def _final_exempt(exempt, int_codes, decisions, served):
+    """Kararlar uygulanmış muafiyet maskesi (``_rows_payload`` ile aynı kural)."""
+    if not decisions:
+        return exempt
+    exempt = exempt.copy()
+    column = {code: j for j, code in enumerate(int_codes)}
+    for i, recs in decisions.items():
+        if i in served:
+            exempt[i] = False
+        for r in recs:
+            j = column.get(r["int_code"])
+            if j is not None:
+                # Kararlı satırda onaylılar muaf; reddedilen çift hiçbir zaman
+                exempt[i, j] = i in served and r["approved"]
+    return exempt
+
+
+def _columnar_payload(ext_codes, int_codes, percent, order, threshold, exempt):
+    # Yüzdeler int_codes sırasındadır; "order" en yüksekten düşüğe indekslerdir.
+    # "exempt" satır başına muaf sütun indeksleridir: eşikten türetilemeyen
+    # kararlar ve sözcüksel mod dahil kesin sonuçtur
+    return {
+        "int_codes": list(int_codes),
+        "threshold": round(threshold * 100, 2),
+        "ext_codes": list(ext_codes),
+        "percent": percent.tolist(),
+        "order": order.tolist(),
+        "exempt": [np.flatnonzero(row).tolist() for row in exempt],
+    }
+
+
+def auto_match_payload(
+    ext_codes, int_codes, similarity_matrix, threshold, decisions=None, served=()
+):
+    """``AutoMatchResponse`` şeklindeki düz sözlüğü üretir."""
+    percent, order, exempt = rank_matrix(similarity_matrix, threshold)
+    return _rows_payload(
+        ext_codes, int_codes, percent, order, exempt, decisions, served
+    )
+
+
+def dumps_json(payload):
+    try:
+        import orjson
+
+        return orjson.dumps(payload)
+    except ImportError:
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+
+
+def _dumps_msgpack(payload):
+    import msgpack
+
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def render_auto_match(
+    ext_codes,
+    int_codes,
+    similarity_matrix,
+    threshold,
+    fmt=JSON,
+    mode=None,
+    decisions=None,
+    served=(),
+    precomputed=None,
+    explanations=None,
+    explain=None,
+):
+    """Benzerlik matrisini istenen biçimde bayta çevirir.
+
+    ``mode`` verilirse (ör. ``"lexical"``) yükte belirtilir ve önceden
+    hesaplanmamış satırlarda hiçbir aday muaf işaretlenmez; skorlar anlamsal
+    eşikle karşılaştırılamaz.
+
+    ``decisions`` (``{satır: [karar]}``) kayıtlı komisyon kararlarıdır;
+    ``served`` satırları yalnızca kararlardan yanıtlanır. Sütunlu biçimde
+    kararlar ayrı bir ``decisions`` alanında döner.
+
+    ``precomputed`` (``{satır: kaynak}``) ortak üniversite matrisinden gelen
+    satırlardır; aday listesi matrisin ``top_k`` değeriyle sınırlanır.
+
+    ``explanations`` (``{(satır, dahili kod): [cümle çifti]}``) adaylara
+    eklenir; ``explain`` süre raporu yükte döner.
+    """
+    precomputed = precomputed or {}
+    with stage("candidate_selection"):
+        percent, order, exempt = rank_matrix(similarity_matrix, threshold)
+        if mode is not None:
+            exempt[[i for i in range(len(exempt)) if i not in precomputed]] = False
+    with stage("response_serialization"):
+        if fmt in (COLUMNAR_JSON, COLUMNAR_MSGPACK):
+            payload = _columnar_payload(
+                ext_codes,
+                int_codes,
+                percent,
+                order,
+                threshold,
+                _final_exempt(exempt, int_codes, decisions or {}, served),
+            )
+            if decisions:
+                payload["decisions"] = {str(i): recs for i, recs in decisions.items()}
+                payload["served"] = sorted(served)
+            if precomputed:
+                payload["precomputed"] = {str(i): p for i, p in precomputed.items()}
+            if explanations:
+                grouped = {}
+                for (i, code), pairs in explanations.items():
+                    grouped.setdefault(str(i), {})[code] = pairs
+                payload["explanations"] = grouped
+        else:
+            payload = _rows_payload(
+                ext_codes,
+                int_codes,
+                percent,
+                order,
+                exempt,
+                decisions,
+                served,
+                precomputed,
+                explanations,
+            )
+        if mode is not None:
+            payload["mode"] = mode
+        if explain is not None:
+            payload["explain"] = explain
+
+        if fmt in (MSGPACK, COLUMNAR_MSGPACK):
+            return _dumps_msgpack(payload)
+        return dumps_json(payload)
+
+
+def compress_body(body, accept_encoding, min_size=1024):
+    """(gövde, content-encoding) döndürür; küçük gövdeler sıkıştırılmaz."""
+    if len(body) < min_size:
+        return body, None
+    accepted = {
+        part.split(";")[0].strip().lower()
+        for part in (accept_encoding or "").split(",")
+    }
+    if "br" in accepted:
+        try:
+            import brotli
+
+            return brotli.compress(body, quality=4), "br"
+        except ImportError:
+            pass
+    if "gzip" in accepted:
+        return gzip.compress(body, compresslevel=6), "gzip"
+    return body, None
@@ -1,7 +1,9 @@
 # app/services.py - Simple version without complex type annotations
 from __future__ import annotations
 
+import hashlib
 import io
+import json
 import logging
 import os
 import tempfile
@@ -14,69 +16,377 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.shared import Pt
 from sentence_transformers import SentenceTransformer
 
+from app.index import CompactIndex
+from app.metrics import BATCH_SIZE
 from app.repository import CourseRepository
+from app.score_store import content_key
+from app.textnorm import TextNormalizer
+from app.tracing import stage, traced
 
 __all__ = [
+    "EncoderState",
     "SimilarityService",
+    "score_fingerprint",
     "ExemptionWordBuilder",
     "WordGenerationService",
     "PdfGenerationService",
 ]
 
+logger = logging.getLogger(__name__)
+
 ###############################################################################
 # SimilarityService (unchanged)
 ###############################################################################
 
 
+class EncoderState:
+    """Bir model ve o modelle kodlanmış kataloğun değişmez anlık görüntüsü.
+
+    ``SimilarityService`` bu nesneyi tek bir atamayla değiştirir; her çağrı
+    başta okuduğu durumu sonuna kadar kullanır, böylece iki modelin gömmeleri
+    asla aynı sonuçta karışmaz.
+    """
+
+    __slots__ = (
+        "model",
+        "model_name",
+        "codes",
+        "index_of",
+        "embs",
+        "norms",
+        "unit",
+        "compact",
+        "catalog_version",
+    )
+
+    def __init__(
+        self, model, model_name, codes, embs, norms, unit, compact, catalog_version
+    ):
+        self.model = model
+        self.model_name = model_name
+        self.codes = codes
+        # Kod → satır indeksi bir kez hesaplanır
+        self.index_of = {code: i for i, code in enumerate(codes)}
+        self.embs = embs
+        self.norms = norms
+        self.unit = unit
+        self.compact = compact
+        self.catalog_version = catalog_version
+
+    @property
+    def index_report(self):
+        return self.compact.report if self.compact is not None else None
+
+
+def score_fingerprint(model_name, index_opts, shortlist=0) -> str:
+    """Model, indeks ayarları ve kısa liste boyundan skor parmak izi.
+
+    Model henüz yüklenmeden (ör. ortak matris tazeliği) aynı değer
+    ``SimilarityService`` kurulmadan hesaplanabilsin diye modül düzeyindedir.
+    """
+    opts = {k: index_opts[k] for k in ("pca_dim", "dtype", "rescore_k")}
+    key = json.dumps([model_name, opts, shortlist])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+def _from_state(attr):
+    return property(lambda self: getattr(self._state, attr))
+
+
 class SimilarityService:
     """Utility wrapper around a SentenceTransformer for course comparison."""
 
-    def __init__(self, model_name, threshold, repo):
-        self.model = SentenceTransformer(model_name)
+    # Etkin durumdan okunan, geriye dönük uyumlu öznitelikler
+    model = _from_state("model")
+    model_name = _from_state("model_name")
+    catalog_version = _from_state("catalog_version")
+    index_report = _from_state("index_report")
+    _int_codes = _from_state("codes")
+    _int_index = _from_state("index_of")
+    _int_embs = _from_state("embs")
+    _int_norms = _from_state("norms")
+    _int_unit = _from_state("unit")
+    _index = _from_state("compact")
+
+    def __init__(
+        self,
+        model_name,
+        threshold,
+        repo,
+        pca_dim=0,
+        index_dtype="float32",
+        rescore_k=50,
+        index_dir=None,
+        lexical=None,
+        shortlist_k=0,
+        normalizer=None,
+        score_store=None,
+    ):
         self.threshold = threshold
+        # Kalıcı skor deposu: yeniden başlatmadan sonra da kodlama atlanır
+        self.score_store = score_store
+        # Katalog ve tüm sorgu yolları aynı normalizasyondan geçer
+        self.normalizer = normalizer or TextNormalizer.from_env()
+        # Sözcüksel kısa liste: yalnızca en yakın ``shortlist_k`` ders skorlanır
+        self.lexical = lexical
+        self.shortlist_k = shortlist_k
         self._repo = repo
+        # Sıkıştırılmış indeks (yalnızca PCA veya float32 dışı tip istenirse)
+        self._index_opts = dict(pca_dim=pca_dim, dtype=index_dtype, rescore_k=rescore_k)
+        self._index_dir = index_dir
 
         if not self._repo._cache:
             raise ValueError(
                 "CourseRepository cache boş. 'await repo.load()' çalıştırılmadı."
             )
-        self._int_codes = []
-        self._int_embs = None
-        self._build_internal_cache()
+        self._state = self.build_state(SentenceTransformer(model_name), model_name)
+
+    @property
+    def state(self) -> EncoderState:
+        return self._state
+
+    def build_state(self, model, model_name, encode=None) -> EncoderState:
+        """Kataloğu ``model`` ile kodlar ve yeni bir durum döndürür (atamaz).
 
-    def _build_internal_cache(self):
-        self._int_codes = list(self._repo._cache.keys())
-        contents = list(self._repo._cache.values())
+        ``encode(texts)`` verilirse katalog onunla kodlanır (ör. kısılmış
+        arka plan kodlaması).
+        """
+        codes = list(self._repo._cache.keys())
+        contents = self.normalizer.normalize_many(self._repo._cache.values(), "catalog")
+        catalog_version = self._repo.version
         if not contents:
             raise ValueError("Dahili ders içeriği bulunamadı.")
-        self._int_embs = self.model.encode(contents, convert_to_numpy=True)
+        uniq, inverse = self._dedupe(contents)
+        if encode is None:
+            embs = self._encode(uniq, "catalog", model)
+        else:
+            embs = encode(uniq)
+        if len(uniq) < len(contents):
+            embs = embs[inverse]
+        norms = np.linalg.norm(embs, axis=1)
+        unit = embs / np.where(norms == 0, 1.0, norms)[:, None]
+        compact = None
+        if self._index_opts["pca_dim"] or self._index_opts["dtype"] != "float32":
+            compact = self._build_compact_index(unit, model_name, catalog_version)
+            # Ham float32 gömmeler bellekten atılır; tam hassasiyet compact.full'dadır
+            embs = unit = compact.full
+            norms = np.ones(len(codes), dtype=np.float32)
+        return EncoderState(
+            model, model_name, codes, embs, norms, unit, compact, catalog_version
+        )
+
+    def swap_state(self, state: EncoderState) -> EncoderState:
+        """Etkin durumu tek atamayla değiştirir; öncekini döndürür."""
+        previous, self._state = self._state, state
+        return previous
+
+    def _build_compact_index(self, unit, model_name, catalog_version):
+        store = None
+        if self._index_dir:
+            safe_model = "".join(c if c.isalnum() else "_" for c in model_name)
+            store = Path(self._index_dir) / f"{catalog_version}-{safe_model}.npy"
+        index = CompactIndex(unit, store_path=store, **self._index_opts)
+        if store is not None:
+            # Eski katalog sürümlerinin dosyaları silinir (açık eşlemeler etkilenmez)
+            for old in store.parent.glob(f"*-{safe_model}.npy"):
+                if old != store:
+                    old.unlink(missing_ok=True)
+        logger.info("Compact catalog index built: %s", index.report)
+        return index
+
+    def rebuild(self):
+        """Katalog yeniden yüklendikten sonra dahili gömmeleri yeniler."""
+        state = self._state
+        self._state = self.build_state(state.model, state.model_name)
+
+    def _encode(self, texts, path, model=None):
+        BATCH_SIZE.observe(len(texts), path)
+        with stage("encode"):
+            return (model or self._state.model).encode(texts, convert_to_numpy=True)
 
-    def auto_match(self, ext_texts):
-        if self._int_embs.size == 0:
+    @staticmethod
+    def _dedupe(texts):
+        """Sırayı koruyarak tekil metinler ve her metnin tekil listedeki indeksi."""
+        index = {}
+        inverse = np.fromiter(
+            (index.setdefault(t, len(index)) for t in texts),
+            dtype=np.intp,
+            count=len(texts),
+        )
+        return list(index), inverse
+
+    @staticmethod
+    def _normalize_rows(embs):
+        norms = np.linalg.norm(embs, axis=1, keepdims=True)
+        return embs / np.where(norms == 0, 1.0, norms)
+
+    @traced("SimilarityService.auto_match")
+    def auto_match(self, ext_texts, state=None, normalized=False):
+        """Harici metinler × katalog benzerlik matrisi.
+
+        ``normalized=True``: metinler çağıran tarafından ``self.normalizer``
+        ile zaten normalize edildi (ör. önbellek anahtarı için).
+        """
+        state = state or self._state
+        if state.embs.size == 0:
             raise RuntimeError("Internal cache oluşturulmadı.")
-        ext_embs = self.model.encode(list(ext_texts), convert_to_numpy=True)
-        sims = (ext_embs @ self._int_embs.T) / (
-            np.linalg.norm(ext_embs, axis=1, keepdims=True)
-            * np.linalg.norm(self._int_embs, axis=1)
+        if not normalized:
+            ext_texts = self.normalizer.normalize_many(ext_texts, "auto_match")
+        ext_texts = list(ext_texts)
+        # Normalizasyonla aynılaşan metinler bir kez kodlanır ve skorlanır
+        uniq, inverse = self._dedupe(ext_texts)
+        if self.score_store is None:
+            sims = self._score_catalog(uniq, state)
+        else:
+            sims = self._stored_scores(uniq, state)
+        return sims if len(uniq) == len(ext_texts) else sims[inverse]
+
+    def _shortlist_active(self, state):
+        lexical = self.lexical
+        return bool(
+            self.shortlist_k
+            and lexical is not None
+            and lexical.version == state.catalog_version
+            and self.shortlist_k < len(state.codes)
         )
+
+    def fingerprint(self, state=None) -> str:
+        """Skorları etkileyen model ve indeks ayarlarının kısa özeti."""
+        state = state or self._state
+        shortlist = self.shortlist_k if self._shortlist_active(state) else 0
+        return score_fingerprint(state.model_name, self._index_opts, shortlist)
+
+    def _stored_scores(self, ext_texts, state):
+        """Depoda olan satırlar okunur; yalnızca kalanlar kodlanıp depoya yazılır."""
+        store = self.score_store
+        model, version = self.fingerprint(state), state.catalog_version
+        keys = [content_key(t) for t in ext_texts]
+        with stage("score_store_lookup"):
+            found = store.get_many(keys, model, version, len(state.codes))
+        if len(found) == len(keys):
+            return np.stack([found[k] for k in keys])
+        missing = [i for i, k in enumerate(keys) if k not in found]
+        computed = self._score_catalog([ext_texts[i] for i in missing], state)
+        store.put_many([keys[i] for i in missing], model, version, computed)
+        if not found:
+            return computed
+        sims = np.empty((len(keys), len(state.codes)), dtype=np.float32)
+        sims[missing] = computed
+        for i, k in enumerate(keys):
+            if k in found:
+                sims[i] = found[k]
         return sims
 
-    @staticmethod
-    def _cos_sim(a, b):
-        denom = np.linalg.norm(a) * np.linalg.norm(b)
-        return 0.0 if denom == 0 else float(np.dot(a, b) / denom)
+    def _score_catalog(self, ext_texts, state):
+        return self.embed_and_score(ext_texts, state)[1]
+
+    def embed_and_score(self, ext_texts, state=None):
+        """Normalize edilmiş metinlerin gömmeleri ve katalog skorları: (gömmeler, skorlar).
+
+        Gömmeleri saklayan çağıranlar (ör. eşleştirme oturumları) katalog
+        değişince ``score_embeddings`` ile yeniden kodlamadan skorlayabilir.
+        """
+        state = state or self._state
+        ext_embs = self._encode(list(ext_texts), "auto_match", state.model)
+        return ext_embs, self.score_embeddings(ext_texts, ext_embs, state)
+
+    def score_embeddings(self, ext_texts, ext_embs, state=None):
+        """Hazır gömmeleri ``auto_match`` ile aynı yoldan skorlar."""
+        state = state or self._state
+        if self._shortlist_active(state):
+            return self._shortlisted(ext_texts, ext_embs, state, self.lexical)
+        if state.compact is not None:
+            ext_unit = self._normalize_rows(ext_embs)
+            with stage("similarity_gemm"):
+                approx = state.compact.approx(ext_unit)
+            with stage("rescore"):
+                return state.compact.rescore(ext_unit, approx)
+        with stage("similarity_gemm"):
+            sims = (ext_embs @ state.embs.T) / (
+                np.linalg.norm(ext_embs, axis=1, keepdims=True) * state.norms
+            )
+        return sims
 
-    def bulk_similarity(self, pairs):
-        flat = [t for pair in pairs for t in pair]
-        embeds = self.model.encode(flat, convert_to_numpy=True)
-        results = []
+    def _shortlisted(self, ext_texts, ext_embs, state, lexical):
+        """Yalnızca sözcüksel kısa listedeki dersleri skorlar; diğerleri 0 olur.
+
+        Hiçbir katalog terimiyle örtüşmeyen sorgular tüm katalogla skorlanır.
+        """
+        ext_unit = self._normalize_rows(ext_embs).astype(np.float32, copy=False)
+        with stage("lexical_search"):
+            idx, matched = lexical.top_k(ext_texts, self.shortlist_k)
+        sims = np.zeros((len(ext_texts), len(state.codes)), dtype=np.float32)
+        with stage("similarity_gemm"):
+            exact = np.einsum("qd,qkd->qk", ext_unit, state.unit[idx])
+            np.put_along_axis(sims, idx, exact, axis=1)
+            if not matched.all():
+                sims[~matched] = ext_unit[~matched] @ state.unit.T
+        return sims
+
+    def iter_auto_match(self, ext_texts, chunk_size=8, state=None, normalized=False):
+        """``auto_match`` ile aynı skorları parça parça üretir: (başlangıç, matris)."""
+        ext_texts = list(ext_texts)
+        state = state or self._state  # tüm parçalar aynı modelle
+        for offset in range(0, len(ext_texts), chunk_size):
+            yield offset, self.auto_match(
+                ext_texts[offset : offset + chunk_size],
+                state=state,
+                normalized=normalized,
+            )
+
+    def _score_rows(self, sims):
         thr_pct = self.threshold * 100
-        for i in range(0, len(embeds), 2):
-            sim = self._cos_sim(embeds[i], embeds[i + 1])
+        results = []
+        for sim in sims.tolist():
             pct = round(sim * 100, 2)
             results.append((sim, pct, pct >= thr_pct))
         return results
 
+    @traced("SimilarityService.bulk_similarity")
+    def bulk_similarity(self, pairs):
+        # Her benzersiz metin bir kez kodlanır, skorlar satır bazında tek seferde
+        flat = self.normalizer.normalize_many(
+            (t for pair in pairs for t in pair), "bulk"
+        )
+        if not flat:
+            return []
+        uniq, inverse = np.unique(np.array(flat, dtype=object), return_inverse=True)
+        embeds = self._normalize_rows(self._encode(uniq.tolist(), "bulk"))
+        inverse = inverse.reshape(-1, 2)
+        with stage("similarity_gemm"):
+            sims = np.einsum("ij,ij->i", embeds[inverse[:, 0]], embeds[inverse[:, 1]])
+        return self._score_rows(sims)
+
+    @traced("SimilarityService.bulk_similarity_by_code")
+    def bulk_similarity_by_code(self, pairs):
+        """(harici içerik, dahili kod) çiftlerini skorlar.
+
+        Dahili taraf ``_int_embs`` önbelleğinden koda göre alınır; harici
+        metinlerin yalnızca benzersiz olanları kodlanır.
+        """
+        if not pairs:
+            return []
+        state = self._state
+        unknown = sorted({code for _, code in pairs if code not in state.index_of})
+        if unknown:
+            raise KeyError(unknown)
+
+        ext_texts = self.normalizer.normalize_many((text for text, _ in pairs), "bulk")
+        uniq, inverse = np.unique(
+            np.array(ext_texts, dtype=object), return_inverse=True
+        )
+        ext_unit = self._normalize_rows(
+            self._encode(uniq.tolist(), "bulk", state.model)
+        )
+        int_rows = np.fromiter(
+            (state.index_of[code] for _, code in pairs),
+            dtype=np.intp,
+            count=len(pairs),
+        )
+        with stage("similarity_gemm"):
+            sims = np.einsum("ij,ij->i", ext_unit[inverse], state.unit[int_rows])
+        return self._score_rows(sims)
+
 
 ###############################################################################
 # ExemptionWordBuilder
@@ -87,6 +397,7 @@ class ExemptionWordBuilder:
     """Word belgesi oluşturmak için yardımcı sınıf"""
 
     @staticmethod
+    @traced("ExemptionWordBuilder.build")
     def build(
         personal_info,
         exemption_courses,
@@ -151,7 +462,13 @@ class ExemptionWordBuilder:
 
     @staticmethod
     def fill_template(template_path, data):
-        doc = Document(template_path)
+        with stage("template_load"):
+            doc = Document(template_path)
+        with stage("docx_render"):
+            return ExemptionWordBuilder._render(doc, data)
+
+    @staticmethod
+    def _render(doc, data):
         tables = doc.tables
 
         # Çizelge 1'i doldur (ana tablo - Tablo 0)
@@ -0,0 +1,144 @@
+# app/sessions.py
+"""Sihirbazın düzenleme döngüsü için oturumlu artımlı eşleştirme.
+
+Öğrenci dersleri tek tek ekleyip sildikçe tüm listeyi ``/auto-match``'e
+göndermek her seferinde N dersi yeniden kodlar. Oturum, öğrencinin harici
+ders gömmelerini ve skor satırlarını sunucuda tutar; her değişiklik yalnızca
+eklenen/içeriği değişen dersleri kodlar ve yalnızca değişen sonuçları döndürür.
+
+* Dersler ``ext_code`` ile anahtarlanır; aynı kodla gönderim güncellemedir.
+  Normalize içerik aynıysa ders yeniden kodlanmaz ve yanıtta yer almaz.
+* Katalog (içeriği ya da ders sırası) değişmişse saklı gömmeler yeniden kodlanmadan skorlanır; model
+  değişmişse tüm dersler yeniden kodlanır. Her iki durumda da tüm sonuçlar
+  değişmiş sayılır.
+* Oturumlar bellekte ``TTLCache`` ile tutulur; her erişim süreyi uzatır.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import secrets
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+__all__ = ["MatchSession", "new_session_id"]
+
+
+def new_session_id() -> str:
+    return secrets.token_urlsafe(16)
+
+
+class _Item:
+    __slots__ = ("text", "emb", "row", "decisions")
+
+    def __init__(self, text, decisions):
+        self.text = text
+        self.emb = None
+        self.row = None
+        self.decisions = decisions or []
+
+    @property
+    def served(self) -> bool:
+        # Onaylı karar ⇒ model çalışmaz (``/auto-match`` ile aynı kural)
+        return any(r["approved"] for r in self.decisions)
+
+
+class MatchSession:
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self.items: Dict[str, _Item] = {}  # ekleme sırası korunur
+        self.model_name: Optional[str] = None
+        self.catalog_version: Optional[str] = None
+        # Skor satırlarının sütun sırası; aynı içerik farklı sırayla yüklenirse
+        # satırlar yeniden skorlanır
+        self.codes: List[str] = []
+        self.revision = 0
+        # Aynı oturuma eşzamanlı değişiklikler sırayla uygulanır
+        self.lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def apply(
+        self,
+        svc,
+        upserts: Iterable[Tuple[str, str]],
+        removes: Iterable[str] = (),
+        decisions: Optional[Dict[str, List[dict]]] = None,
+    ):
+        """Değişikliği uygular: (durum, değişen kodlar, silinen kodlar).
+
+        ``upserts`` (kod, normalize metin) çiftleridir; ``decisions`` yalnızca
+        bu metinler için kayıtlı komisyon kararlarıdır.
+        """
+        decisions = decisions or {}
+        state = svc.state
+        removed = [code for code in dict.fromkeys(removes) if code in self.items]
+        for code in removed:
+            del self.items[code]
+
+        changed = []
+        for code, text in dict(upserts).items():
+            item = self.items.get(code)
+            recs = decisions.get(code, [])
+            if item is not None and item.text == text and item.decisions == recs:
+                continue
+            self.items[code] = _Item(text, recs)
+            changed.append(code)
+
+        if state.model_name != self.model_name:
+            # Yeni modelin gömme uzayı farklıdır: her şey yeniden kodlanır
+            encode = [c for c, it in self.items.items() if not it.served]
+            rescore = []
+            changed = list(self.items)
+        else:
+            encode = [c for c in changed if not self.items[c].served]
+            rescore = []
+            if (
+                state.catalog_version != self.catalog_version
+                or list(state.codes) != self.codes
+            ):
+                rescore = [
+                    c
+                    for c, it in self.items.items()
+                    if c not in changed and not it.served
+                ]
+                changed = list(self.items)
+
+        if encode:
+            embs, rows = svc.embed_and_score(
+                [self.items[c].text for c in encode], state
+            )
+            for code, emb, row in zip(encode, embs, np.asarray(rows)):
+                self.items[code].emb = emb
+                self.items[code].row = row
+        if rescore:
+            rows = svc.score_embeddings(
+                [self.items[c].text for c in rescore],
+                np.stack([self.items[c].emb for c in rescore]),
+                state,
+            )
+            for code, row in zip(rescore, np.asarray(rows)):
+                self.items[code].row = row
+
+        self.model_name = state.model_name
+        self.catalog_version = state.catalog_version
+        self.codes = list(state.codes)
+        if changed or removed:
+            self.revision += 1
+        return state, changed, removed
+
+    def matrix(self, codes: List[str], width: int):
+        """Kodların skor satırları ve kararları (kararlı satırlar 0)."""
+        matrix = np.zeros((len(codes), width), dtype=np.float32)
+        decisions, served = {}, set()
+        for i, code in enumerate(codes):
+            item = self.items[code]
+            if item.decisions:
+                decisions[i] = item.decisions
+            if item.served:
+                served.add(i)
+            elif item.row is not None:
+                matrix[i] = item.row
+        return matrix, decisions, served
@@ -0,0 +1,229 @@
+# app/textnorm.py
+"""Kodlamadan önce metin normalizasyonu.
+
+Transkript ve ders içeriği kitapçıklarından yapıştırılan metinler sayfa
+başlıkları, kredi tabloları, noktalı/noktasız I varyantları ve tekrarlanan
+kalıp satırlar taşır. Bunlar hem belirteç sayısını şişirir hem de neredeyse
+aynı metinlerin farklı özetlenmesine (önbellek ıskası) yol açar.
+
+Sıra:
+
+1. Unicode NFC, görünmez karakterlerin silinmesi, satır sonu tirelerinin
+   birleştirilmesi
+2. Türkçe küçültme (``İ → i``; metinde Türkçe harf varsa ``I → ı``)
+3. Noktalama: tırnak/tire/madde işaretleri tek biçime, tekrarlanan noktalama
+   teke indirilir
+4. Kalıp desenleri (küçültülmüş metin üzerinde, satır satır) ve aynı metinde
+   tekrarlanan kısa satırlar atılır
+5. Boşluklar tek boşluğa indirilir
+
+``normalize`` eş güçlüdür: adımlar metin değişmeyene kadar tekrarlanır, bu
+yüzden normalize edilmiş metni değiştirmez. Katalog ve
+tüm sorgu yolları aynı ``TextNormalizer`` ile işlenir.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+__all__ = ["TextNormalizer", "turkish_lower", "DEFAULT_BOILERPLATE"]
+
+_TURKISH_CHARS = frozenset("çğıöşüÇĞİÖŞÜ")
+_INVISIBLE_RE = re.compile("[\u00ad\u200b\u200c\u200d\u2060\ufeff]")
+_HYPHEN_BREAK_RE = re.compile(r"(\w)-[ \t]*\n[ \t]*(\w)")
+_PUNCT_MAP = str.maketrans(
+    {
+        "\u00a0": " ",  # bölünmez boşluk
+        "‘": "'",
+        "’": "'",
+        "‚": "'",
+        "“": '"',
+        "”": '"',
+        "„": '"',
+        "«": '"',
+        "»": '"',
+        "‐": "-",
+        "‑": "-",
+        "‒": "-",
+        "–": "-",
+        "—": "-",
+        "−": "-",
+        "…": ".",
+        "•": "\n",
+        "▪": "\n",
+        "◦": "\n",
+        "●": "\n",
+        "·": "\n",
+        "\uf0b7": "\n",  # Word'den gelen madde işareti (özel alan)
+    }
+)
+_REPEAT_PUNCT_RE = re.compile(r"([.,;:!?\-])(\s*\1)+")
+_SPACE_BEFORE_PUNCT_RE = re.compile(r"[ \t]+([.,;:!?])")
+_LINE_BULLET_RE = re.compile(r"^\s*(?:[-*>]|\d{1,2}[.)])\s+", re.M)
+_WS_RE = re.compile(r"\s+")
+_TOKEN_RE = re.compile(r"\w+")
+_MAX_PASSES = 8
+
+# Küçültülmüş metne satır bazında uygulanır
+DEFAULT_BOILERPLATE = (
+    # Sayfa başlıkları: "Sayfa 3 / 12", "page 3 of 12", tek başına "sayfa 3"
+    r"\b(?:sayfa|page)\s*\d+\s*(?:/|of|\\)\s*\d+\b",
+    r"^\s*(?:sayfa|page)\s*\d+\s*$",
+    # Kredi tablosu başlık ve değerleri: "T U K AKTS", "kredi: 3", "akts 5"
+    r"\bt\s*[-+]?\s*u\s*[-+]?\s*(?:k|l)\s*[-+]?\s*(?:akts|ects)\b",
+    r"\b(?:ulusal kredi|kredi|akts|ects|credits?)\s*[:=]?\s*\d+(?:[.,]\d+)?\b",
+    # "teori", "lab" gibi içerikte de geçen etiketler yalnızca satır başında
+    # ve ":"/"=" ile tablo etiketi olarak yazılmışsa ("Teori: 2 Uygulama: 2")
+    r"^\s*(?:(?:teori|teorik|uygulama|laboratuvar|theory|practice|lab)"
+    r"\s*[:=]\s*\d+(?:[.,]\d+)?[\s,;/|]*)+",
+    # Alan etiketleri: "Dersin İçeriği:", "Course Content -"
+    r"^\s*(?:dersin\s+(?:içeriği|amacı|adı|kodu)|ders\s+içeriği|"
+    r"course\s+(?:content|description|objectives?)|içerik|content)\s*[:\-]",
+    # Yukarıdakiler atıldıktan sonra yalnızca sayı kalan satırlar (tablo hücreleri)
+    r"^[\d\s.,/+\-]+$",
+)
+
+
+def turkish_lower(text: str) -> str:
+    """Türkçe kurallarıyla küçültür (``str.lower`` ``İ`` için nokta ekler)."""
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+
+def _casefold(text: str) -> str:
+    # "INTRODUCTION" → "ıntroductıon" olmasın: I → ı yalnızca Türkçe metinde
+    if any(c in _TURKISH_CHARS for c in text):
+        return turkish_lower(text)
+    return text.replace("İ", "i").lower()
+
+
+class TextNormalizer:
+    def __init__(
+        self,
+        boilerplate: Iterable[str] = DEFAULT_BOILERPLATE,
+        enabled: bool = True,
+        max_repeated_line: int = 80,
+    ):
+        self.enabled = enabled
+        self.patterns = [re.compile(p, re.M) for p in boilerplate]
+        self.max_repeated_line = max_repeated_line
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_env(cls) -> "TextNormalizer":
+        """``TEXT_NORMALIZATION`` ve ``TEXT_BOILERPLATE_FILE`` ile yapılandırır.
+
+        Dosyada satır başına bir düzenli ifade bulunur (``#`` yorum); desenler
+        varsayılanlara eklenir ve küçültülmüş metne uygulanır.
+        """
+        patterns = list(DEFAULT_BOILERPLATE)
+        path = os.getenv("TEXT_BOILERPLATE_FILE")
+        if path:
+            for line in Path(path).read_text(encoding="utf-8").splitlines():
+                if line.strip() and not line.lstrip().startswith("#"):
+                    patterns.append(line.strip())
+        return cls(
+            patterns,
+            enabled=os.getenv("TEXT_NORMALIZATION", "true").lower() == "true",
+        )
+
+    def fingerprint(self) -> str:
+        """Normalizasyon ayarlarının kısa özeti (çıktıyı etkileyen her şey)."""
+        key = json.dumps(
+            [self.enabled, [p.pattern for p in self.patterns], self.max_repeated_line]
+        )
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+    # ——— Normalizasyon ——— #
+    def normalize(self, text: str) -> str:
+        text = text or ""
+        if not self.enabled:
+            return _WS_RE.sub(" ", text).strip()
+        # Bir desenin silinmesi yeni bir kalıp açığa çıkarabilir ("Kredi: 3
+        # 1. Hafta" → "1. hafta"); metin değişmeyene kadar tekrarlanır. Her tur
+        # metni kısaltır ya da aynen bırakır, sınır yalnızca güvenlik içindir.
+        for _ in range(_MAX_PASSES):
+            out = self._normalize_once(text)
+            if out == text:
+                break
+            text = out
+        return out
+
+    def _normalize_once(self, text: str) -> str:
+        text = unicodedata.normalize("NFC", text)
+        text = _INVISIBLE_RE.sub("", text).replace("\r\n", "\n").replace("\r", "\n")
+        text = _HYPHEN_BREAK_RE.sub(r"\1\2", text)
+        text = _casefold(text).replace("i\u0307", "i")
+        text = text.translate(_PUNCT_MAP)
+        text = _LINE_BULLET_RE.sub("", text)
+        for pattern in self.patterns:
+            text = pattern.sub(" ", text)
+
+        # Her sayfada tekrarlanan kısa satırlar (başlık/altbilgi) bir kez kalır
+        seen, lines = set(), []
+        for line in text.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            if len(line) <= self.max_repeated_line:
+                if line in seen:
+                    continue
+                seen.add(line)
+            lines.append(line)
+        text = " ".join(lines)
+
+        text = _REPEAT_PUNCT_RE.sub(r"\1", text)
+        text = _SPACE_BEFORE_PUNCT_RE.sub(r"\1", text)
+        return _WS_RE.sub(" ", text).strip(" ,;:-.")
+
+    def normalize_many(
+        self, texts: Iterable[str], path: Optional[str] = None
+    ) -> List[str]:
+        """Metinleri normalize eder; ``path`` verilirse istatistiğe yazar."""
+        texts = list(texts)
+        out = [self.normalize(t) for t in texts]
+        if path is not None and texts:
+            self._record(path, texts, out)
+        return out
+
+    # ——— İstatistik ——— #
+    def _record(self, path, raw, normalized):
+        delta = {
+            "texts": len(raw),
+            "chars_in": sum(len(t or "") for t in raw),
+            "chars_out": sum(len(t) for t in normalized),
+            "tokens_in": sum(len(_TOKEN_RE.findall(t or "")) for t in raw),
+            "tokens_out": sum(len(_TOKEN_RE.findall(t)) for t in normalized),
+            "unique_in": len(set(raw)),
+            "unique_out": len(set(normalized)),
+        }
+        with self._lock:
+            stats = self._stats.setdefault(path, dict.fromkeys(delta, 0))
+            for key, value in delta.items():
+                stats[key] += value
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Yol başına sayaçlar ve türetilmiş oranlar.
+
+        ``duplicate_rate_gain``: aynı çağrı içinde yalnızca normalizasyon
+        sonrası tekrara dönüşen metinlerin oranı (kodlanmayan metinler).
+        """
+        with self._lock:
+            snapshot = {path: dict(s) for path, s in self._stats.items()}
+        for s in snapshot.values():
+            s["tokens_saved"] = s["tokens_in"] - s["tokens_out"]
+            s["tokens_saved_pct"] = round(
+                100 * s["tokens_saved"] / s["tokens_in"] if s["tokens_in"] else 0.0, 2
+            )
+            s["duplicate_rate_gain"] = round(
+                (s["unique_in"] - s["unique_out"]) / s["texts"] if s["texts"] else 0.0,
+                4,
+            )
+        return snapshot
@@ -0,0 +1,322 @@
+# app/tracing.py
+"""İstek başına iz (trace) kaydı: ``Server-Timing`` başlığı ve OTLP/JSON dosyası.
+
+``TracingMiddleware`` her HTTP isteği için bir ``Trace`` açar ve onu bir
+bağlam değişkeninde (contextvar) taşır. ``stage()`` ile ölçülen aşamalar hem
+Prometheus histogramına hem de izin içine bir span olarak yazılır; aşamalar
+``PHASES`` ile dört ana faza (encode, compute, render, send) toplanıp yanıtın
+``Server-Timing`` başlığında gönderilir. ``run_in_threadpool`` bağlamı
+kopyaladığından iş parçacığı havuzundaki aşamalar da aynı ize düşer.
+
+İstek bittiğinde iz, OpenTelemetry Collector'ın ``file`` alıcısının okuduğu
+OTLP/JSON biçiminde (satır başına bir ``resourceSpans`` nesnesi) yerel
+dosyaya arka planda yazılır. Tüm span'lar ``request.id`` özniteliği ve
+yanıttaki ``X-Request-ID`` başlığı ile ilişkilendirilir.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from starlette.datastructures import MutableHeaders
+
+from .metrics import STAGE_SECONDS
+
+__all__ = [
+    "PHASES",
+    "Trace",
+    "TraceFileExporter",
+    "TracingMiddleware",
+    "stage",
+    "span",
+    "traced",
+]
+
+logger = logging.getLogger(__name__)
+
+# Aşama → Server-Timing fazı
+PHASES = {
+    "encode": "encode",
+    "similarity_gemm": "compute",
+    "candidate_selection": "compute",
+    "rescore": "compute",
+    "lexical_search": "compute",
+    "decision_lookup": "compute",
+    "score_store_lookup": "compute",
+    "explain": "compute",
+    "template_load": "render",
+    "docx_render": "render",
+    "response_serialization": "render",
+    "mime_build": "render",
+    "smtp_send": "send",
+}
+_PHASE_ORDER = ("encode", "compute", "render", "send")
+
+SPAN_KIND_INTERNAL, SPAN_KIND_SERVER = 1, 2
+STATUS_ERROR = 2
+
+_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar(
+    "trace", default=None
+)
+_parent: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "trace_parent_span", default=None
+)
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "span_id",
+        "parent_id",
+        "kind",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+    )
+
+    def __init__(self, name, parent_id, kind=SPAN_KIND_INTERNAL, attributes=None):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.error = None
+
+
+class Trace:
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.trace_id = uuid.uuid4().hex
+        self.spans: List[Span] = []
+        self.phases: Dict[str, float] = {}  # faz → toplam saniye
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def add_phase(self, phase: str, seconds: float):
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def server_timing(self, total: float) -> str:
+        with self._lock:
+            phases = dict(self.phases)
+        order = [p for p in _PHASE_ORDER if p in phases]
+        order += sorted(set(phases) - set(_PHASE_ORDER))
+        parts = ["%s;dur=%.2f" % (p, phases[p] * 1000) for p in order]
+        parts.append("total;dur=%.2f" % (total * 1000))
+        return ", ".join(parts)
+
+    def to_otlp(self, service_name: str) -> dict:
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_attr("service.name", service_name)]},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [self._span_json(s) for s in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def _span_json(self, s: Span) -> dict:
+        attributes = {"request.id": self.request_id, **s.attributes}
+        out = {
+            "traceId": self.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": s.kind,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns or s.start_ns),
+            "attributes": [_attr(k, v) for k, v in attributes.items()],
+        }
+        if s.parent_id:
+            out["parentSpanId"] = s.parent_id
+        if s.error:
+            out["status"] = {"code": STATUS_ERROR, "message": s.error}
+        return out
+
+
+def _attr(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+# ——— Span üretimi ——— #
+@contextmanager
+def span(name, kind=SPAN_KIND_INTERNAL, **attributes):
+    """Etkin iz varsa bir span açar; yoksa hiçbir şey yapmaz (``None`` verir)."""
+    trace = _trace.get()
+    if trace is None:
+        yield None
+        return
+    s = Span(name, _parent.get(), kind, attributes)
+    token = _parent.set(s.span_id)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _parent.reset(token)
+        trace.add(s)
+
+
+@contextmanager
+def stage(name, **attributes):
+    """``STAGE_SECONDS`` histogramına, ize ve Server-Timing fazına yazar."""
+    start = time.perf_counter()
+    try:
+        with span(name, **attributes):
+            yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, name)
+        trace = _trace.get()
+        if trace is not None:
+            trace.add_phase(PHASES.get(name, name), elapsed)
+
+
+def traced(name):
+    """Fonksiyonu (senkron ya da async) ``name`` adlı bir span içinde çalıştırır."""
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# ——— Dışa aktarma ——— #
+class TraceFileExporter:
+    """İzleri arka plan iş parçacığında OTLP/JSON satırları olarak yazar.
+
+    Dosya ``max_bytes``'ı aşınca ``<ad>.1`` olarak döndürülür (tek yedek).
+    """
+
+    def __init__(self, path: str, service_name: str, max_bytes: int = 50 << 20):
+        self.path = Path(path)
+        self.service_name = service_name
+        self.max_bytes = max_bytes
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer = threading.Thread(
+            target=self._run, name="trace-exporter", daemon=True
+        )
+        self._writer.start()
+
+    def export(self, trace: Trace):
+        self._queue.put(trace)
+
+    def shutdown(self):
+        self._queue.put(None)
+        self._writer.join(timeout=5)
+
+    def _run(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            trace = self._queue.get()
+            if trace is None:
+                return
+            try:
+                line = json.dumps(trace.to_otlp(self.service_name), ensure_ascii=False)
+                if (
+                    self.path.exists()
+                    and self.path.stat().st_size + len(line) > self.max_bytes
+                ):
+                    os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            except Exception as e:  # iz yazılamaması isteği etkilememeli
+                logger.warning("trace export failed: %s", e)
+
+
+class TracingMiddleware:
+    """Saf ASGI ara katmanı; akış yanıtlarını tamponlamaz."""
+
+    def __init__(
+        self,
+        app,
+        get_exporter: Callable[[], Optional[TraceFileExporter]] = lambda: None,
+    ):
+        """``get_exporter`` her istekte okunur; dışa aktarıcı uygulama açılışında
+        kurulabilir (içe aktarma sırasında iş parçacığı/dizin oluşturulmaz)."""
+        self.app = app
+        self.get_exporter = get_exporter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(b"x-request-id", b"")
+        request_id = incoming.decode("latin-1")[:128] or uuid.uuid4().hex
+        trace = Trace(request_id)
+        token = _trace.set(trace)
+        start = time.perf_counter()
+        status_code = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing", trace.server_timing(time.perf_counter() - start)
+                )
+                headers.append("Timing-Allow-Origin", "*")
+                headers.append("X-Request-ID", request_id)
+            await send(message)
+
+        try:
+            with span(
+                f"{scope['method']} {scope['path']}",
+                kind=SPAN_KIND_SERVER,
+                **{"http.method": scope["method"], "http.target": scope["path"]},
+            ) as root:
+                await self.app(scope, receive, send_wrapper)
+                root.attributes["http.status_code"] = status_code
+        finally:
+            _trace.reset(token)
+            exporter = self.get_exporter()
+            if exporter is not None:
+                exporter.export(trace)
@@ -0,0 +1,197 @@
+# app/transcript_parser.py
+"""Sunucu tarafı transkript / ders içeriği PDF ayrıştırıcısı.
+
+``react-front/src/utils/pdfParser.js`` içindeki satır ayrıştırma mantığının
+Python karşılığıdır. Ayrıştırma CPU ağırlıklı olduğundan işler bir
+``ProcessPoolExecutor`` havuzunda çalıştırılır; sonuçlar dosya özetine (sha256)
+göre önbelleğe alınır.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+__all__ = [
+    "parse_transcript",
+    "parse_course_contents",
+    "TranscriptParserPool",
+]
+
+logger = logging.getLogger(__name__)
+
+# Ders kodu: herhangi bir harf veya rakam kombinasyonu, 5–9 karakter uzunluğunda
+COURSE_CODE_RE = re.compile(r"^[A-ZÇĞİÖŞÜ0-9]{5,9}$")
+STATUS_RE = re.compile(r"^[ZS]$")  # Z = Zorunlu, S = Seçmeli
+# Satır kesme: herhangi bir ders kodu görüldüğünde yeni satır aç
+ROW_SPLIT_RE = re.compile(r" (?=[A-ZÇĞİÖŞÜ0-9]{5,9}\s)")
+# İçerik kitapçıklarında başlık olarak geçen ders kodu (ör. "BIL 1201", "CSE101")
+CONTENT_CODE_RE = re.compile(
+    r"(?<![A-Za-zÇĞİÖŞÜçğıöşü0-9])([A-ZÇĞİÖŞÜ]{2,6} ?[0-9]{3,5})(?![0-9])"
+)
+
+
+# "3,5" → 3.5  "-"/"" → None
+def _to_number(token: Optional[str]) -> Optional[float]:
+    if not token or token == "-":
+        return None
+    try:
+        return float(token.replace(",", "."))
+    except ValueError:
+        return None
+
+
+def normalize_code(code: str) -> str:
+    return re.sub(r"\s+", "", code).upper()
+
+
+def _extract_pages(data: bytes) -> List[str]:
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(data))
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+def _parse_row(line: str) -> Optional[Dict[str, Any]]:
+    tokens = line.strip().split()
+    if not tokens:
+        return None
+
+    code = tokens.pop(0)
+    if not COURSE_CODE_RE.match(code):
+        return None  # Ders kodu değilse atla
+
+    # 1) Ders adı: Z veya S görünene kadar topla
+    name_parts = []
+    while tokens and not STATUS_RE.match(tokens[0]):
+        name_parts.append(tokens.pop(0))
+    if not tokens:
+        return None
+
+    def take():
+        return tokens.pop(0) if tokens else None
+
+    # 2) Sütunları sırayla çek
+    status = take()  # Z | S
+    language = take()  # Tr | En | …
+    theory = _to_number(take())
+    practice = _to_number(take())
+    national_credit = _to_number(take())
+    ects = _to_number(take())
+    points = _to_number(take())
+    grade = take()
+
+    return {
+        "code": code,
+        "name": " ".join(name_parts),
+        "status": status,
+        "language": language,
+        "theory": theory,
+        "practice": practice,
+        "nationalCredit": national_credit,
+        "ects": ects,
+        "points": points,
+        "grade": None if grade in (None, "--") else grade,
+        "comments": tokens,  # kalan yorumlar
+    }
+
+
+def parse_transcript_pages(pages: List[str]) -> List[Dict[str, Any]]:
+    courses = []
+    for raw in pages:
+        # Ön temizlik: parantezli açıklamaları kaldır, boşlukları sadeleştir
+        cleaned = re.sub(r"\([^)]*\)", " ", raw)
+        cleaned = re.sub(r"\s+", " ", cleaned)
+        cleaned = ROW_SPLIT_RE.sub("\n", cleaned)
+        for line in cleaned.split("\n"):
+            row = _parse_row(line)
+            if row:
+                courses.append(row)
+    return courses
+
+
+def parse_course_contents_pages(pages: List[str]) -> Dict[str, str]:
+    """Kitapçıktaki her ders kodunu, bir sonraki koda kadar olan metinle eşler."""
+    text = re.sub(r"\s+", " ", " ".join(pages))
+    matches = list(CONTENT_CODE_RE.finditer(text))
+    contents: Dict[str, str] = {}
+    for i, m in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[m.end() : end].strip(" :-–")
+        code = normalize_code(m.group(1))
+        # Aynı kod birden fazla geçiyorsa (içindekiler sayfası vb.) en uzun bloğu tut
+        if len(body) > len(contents.get(code, "")):
+            contents[code] = body
+    return contents
+
+
+def parse_transcript(data: bytes) -> List[Dict[str, Any]]:
+    return parse_transcript_pages(_extract_pages(data))
+
+
+def parse_course_contents(data: bytes) -> Dict[str, str]:
+    return parse_course_contents_pages(_extract_pages(data))
+
+
+_PARSERS = {
+    "transcript": parse_transcript,
+    "contents": parse_course_contents,
+}
+
+
+def _parse_worker(kind: str, data: bytes):
+    # Süreç havuzunda çalışır; modül düzeyinde olmalı (pickle)
+    return _PARSERS[kind](data)
+
+
+class TranscriptParserPool:
+    """PDF ayrıştırma işlerini süreç havuzunda çalıştırır ve sonuçları önbelleğe alır."""
+
+    def __init__(self, max_workers: Optional[int] = None, cache_size: int = 256):
+        self.max_workers = max_workers or max(1, min(4, os.cpu_count() or 1))
+        self.cache_size = cache_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[tuple, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    @staticmethod
+    def file_hash(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    async def parse(self, kind: str, data: bytes):
+        """``kind`` = "transcript" | "contents". (sonuç, önbellekten_mi) döndürür."""
+        if kind not in _PARSERS:
+            raise ValueError(f"Bilinmeyen ayrıştırma türü: {kind}")
+        key = (kind, self.file_hash(data))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key], True
+
+        self.misses += 1
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            self._get_executor(), _parse_worker, kind, data
+        )
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result, False
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,6 @@
+"""Tekrarlanabilir performans ölçümleri.
+
+* ``python -m benchmarks.synthetic`` – büyük sentetik katalog/transkript üretir
+* ``python -m benchmarks.run``       – ölçümleri çalıştırır, JSON yazar
+* ``python -m benchmarks.compare``   – iki JSON sonucunu karşılaştırır
+"""
@@ -0,0 +1,71 @@
+# benchmarks/compare.py
+"""İki ``benchmarks.run`` sonucunu karşılaştırır::
+
+    python -m benchmarks.compare bench/main.json bench/HEAD.json --threshold 10
+
+Ölçümler ad + parametrelerle eşleştirilir. Herhangi bir ölçümün p50
+gecikmesi ``--threshold`` yüzdesinden fazla kötüleşirse çıkış kodu 1 olur
+(CI'da gerileme kapısı olarak kullanılabilir).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def _key(result):
+    return result["name"], json.dumps(result["params"], sort_keys=True)
+
+
+def _load(path):
+    report = json.loads(Path(path).read_text(encoding="utf-8"))
+    return report["meta"], {_key(r): r for r in report["results"]}
+
+
+def compare(base, head, threshold):
+    """(satırlar, gerilemeler) döndürür; satır = (ad, parametre, önce, sonra, %)."""
+    rows, regressions = [], []
+    for key, new in head.items():
+        old = base.get(key)
+        if old is None:
+            continue
+        before, after = old["latency_ms"]["p50"], new["latency_ms"]["p50"]
+        delta = (after - before) / before * 100 if before else 0.0
+        rows.append((*key, before, after, delta))
+        if delta > threshold:
+            regressions.append(key)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="İzin verilen p50 artışı (%%)"
+    )
+    args = parser.parse_args(argv)
+
+    base_meta, base = _load(args.base)
+    head_meta, head = _load(args.head)
+    print(
+        f"base {str(base_meta.get('commit'))[:10]}  →  head {str(head_meta.get('commit'))[:10]}"
+    )
+    rows, regressions = compare(base, head, args.threshold)
+    for name, params, before, after, delta in rows:
+        flag = "  ← REGRESSION" if (name, params) in regressions else ""
+        print(
+            "%-34s %-40s %10.2f → %10.2f ms  %+7.1f%%%s"
+            % (name, params, before, after, delta, flag)
+        )
+    missing = sorted(set(base) - set(head))
+    for name, params in missing:
+        print(f"{name} {params}: head'de yok")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
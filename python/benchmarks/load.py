@@ -0,0 +1,514 @@
+# benchmarks/load.py
+"""FastAPI uygulamasına karşı yük testi.
+
+Varsayılan olarak ASGI uygulaması aynı süreçte (``httpx.ASGITransport``)
+sürülür; ``--url`` verilirse çalışan bir uvicorn sunucusuna bağlanılır::
+
+    python -m benchmarks.load --duration 60 --concurrency 32 --rate 40
+    python -m benchmarks.load --url http://127.0.0.1:8000 --server-pid 1234 --smtp-port 2525
+
+``/auto-match``, ``/generate-pdf`` ve ``/send-email`` trafiği ``--mix``
+ağırlıklarıyla karıştırılır. ``--rate`` > 0 ise istekler açık döngüde
+(Poisson varışlarıyla) gönderilir ve gecikme planlanan varış anından
+ölçülür; böylece istemci tarafı kuyruklanma da sonuca yansır. ``--rate 0``
+kapalı döngüdür: ``--concurrency`` işçi durmadan istek gönderir.
+
+E-postalar, ayrı bir iş parçacığında çalışan ve her iletiyi kabul edip atan
+yerel bir SMTP alıcısına gider. Süreç içi modda uygulama bu alıcıya
+yönlendirilir; ``--url`` modunda sunucuyu ``SMTP_HOST=127.0.0.1
+SMTP_PORT=<--smtp-port> SMTP_STARTTLS=false EMAIL_DEMO_MODE=false`` ile
+başlatın. Olay döngüsü gecikmesi yalnızca süreç içi modda uygulamanın kendi
+döngüsünü ölçer.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+from .run import _git, _percentile
+from .synthetic import make_catalog, make_transcript
+
+ENDPOINTS = ("auto-match", "generate-pdf", "send-email")
+
+
+# ——— Yerel SMTP alıcısı ——— #
+class SmtpSink:
+    """Her iletiyi kabul edip atan en küçük SMTP sunucusu (AUTH/DATA destekli)."""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self.port = port
+        self.messages = 0
+        self.bytes = 0
+        self._loop = None
+        self._server = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="smtp-sink", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        # Uygulamanın olay döngüsünü etkilemesin diye kendi döngüsünde çalışır
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port, limit=1 << 27)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _handle(self, reader, writer):
+        def reply(line):
+            writer.write(line.encode("ascii") + b"\r\n")
+
+        reply("220 sink ESMTP")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                verb, _, arg = line.decode("latin-1").strip().partition(" ")
+                verb = verb.upper()
+                if verb == "EHLO":
+                    reply("250-sink")
+                    reply("250-AUTH PLAIN LOGIN")
+                    reply("250 8BITMIME")
+                elif verb == "AUTH":
+                    mech, _, initial = arg.partition(" ")
+                    if mech.upper() == "LOGIN":
+                        for prompt in ("Username:", "Password:"):
+                            reply("334 " + base64.b64encode(prompt.encode()).decode())
+                            await reader.readline()
+                    elif not initial:
+                        reply("334 ")
+                        await reader.readline()
+                    reply("235 2.7.0 Authentication successful")
+                elif verb == "DATA":
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await writer.drain()
+                    data = await reader.readuntil(b"\r\n.\r\n")
+                    self.messages += 1
+                    self.bytes += len(data)
+                    reply("250 2.0.0 Ok: queued")
+                elif verb == "QUIT":
+                    reply("221 2.0.0 Bye")
+                    await writer.drain()
+                    break
+                elif verb in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                    reply("250 2.0.0 Ok")
+                else:
+                    reply("502 5.5.2 Command not recognized")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+# ——— İstek üreticileri ——— #
+class Workload:
+    def __init__(self, args):
+        self.rng = random.Random(args.seed)
+        catalog = make_catalog(max(args.transcript_pool, 32), args.seed)
+        self.transcript = make_transcript(2_000, catalog, args.seed)
+        self.max_courses = args.max_courses
+        self.attachment = random.Random(args.seed).randbytes(args.attachment_kb * 1024)
+        self.document = None  # ilk /generate-pdf yanıtıyla doldurulur
+        self.personal = {
+            "firstName": "Ayşe",
+            "lastName": "Yılmaz",
+            "studentNumber": "2024123456",
+            "university": "Sentetik Üniversitesi",
+            "faculty": "Mühendislik Fakültesi",
+            "department": "Bilgisayar Mühendisliği",
+            "email": "ogrenci@example.com",
+        }
+
+    def _courses(self):
+        return self.rng.sample(self.transcript, self.rng.randint(1, self.max_courses))
+
+    def auto_match(self):
+        items = [
+            {"ext_code": c["ext_code"], "ext_content": c["ext_content"]}
+            for c in self._courses()
+        ]
+        return {"method": "POST", "url": "/auto-match", "json": {"items": items}}
+
+    def generate_pdf(self):
+        courses = [
+            {
+                "ext_code": c["ext_code"],
+                "ext_name": c["ext_name"],
+                "ext_credit": c["ext_credit"],
+                "ext_content": c["ext_content"],
+                "int_code": c["int_code"],
+                "int_name": c["int_name"],
+                "int_credit": c["int_credit"],
+                "similarity_percent": 90.0,
+                "exempt": True,
+            }
+            for c in self._courses()
+        ]
+        return {
+            "method": "POST",
+            "url": "/generate-pdf",
+            "json": {"personalInfo": self.personal, "selectedCourses": courses},
+        }
+
+    def send_email(self):
+        files = {
+            "exemption_document": ("muafiyet.docx", self.document),
+            "transcript_file": ("transkript.pdf", self.attachment),
+        }
+        data = {
+            "to_email": "komisyon@example.com",
+            "subject": "Muafiyet Başvurusu",
+            "student_info": json.dumps(self.personal),
+        }
+        return {"method": "POST", "url": "/send-email", "data": data, "files": files}
+
+
+def _parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"bilinmeyen uç nokta: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# ——— Ölçüm ——— #
+def _rss_mb(pid=None):
+    try:
+        path = f"/proc/{pid or 'self'}/status"
+        for line in Path(path).read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if pid is None:  # /proc yoksa (macOS) en yüksek RSS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return None
+
+
+def _latency_summary(values_ms):
+    values = sorted(values_ms)
+    if not values:
+        return {}
+    return {
+        "mean": round(statistics.fmean(values), 2),
+        "p50": round(_percentile(values, 0.50), 2),
+        "p90": round(_percentile(values, 0.90), 2),
+        "p99": round(_percentile(values, 0.99), 2),
+        "max": round(values[-1], 2),
+    }
+
+
+class Recorder:
+    def __init__(self, warmup_until):
+        self.warmup_until = warmup_until
+        self.latency = defaultdict(list)  # uç nokta → ms
+        self.status = defaultdict(Counter)
+        self.completed = 0
+        self.inflight = 0
+        self.loop_lag = []  # ms
+        self._interval_lag = 0.0
+
+    def record(self, name, arrival, status):
+        now = time.perf_counter()
+        self.completed += 1
+        if arrival >= self.warmup_until:
+            self.latency[name].append((now - arrival) * 1000)
+            self.status[name][status] += 1
+
+    async def watch_loop(self, stop, period=0.05):
+        """Uyanma gecikmesini ölçer: döngü meşgulse ``sleep`` geç döner."""
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(period)
+            lag = max(0.0, (time.perf_counter() - start - period) * 1000)
+            if start >= self.warmup_until:
+                self.loop_lag.append(lag)
+            self._interval_lag = max(self._interval_lag, lag)
+
+    async def timeline(self, stop, started, interval, pid, sink):
+        points, last = [], 0
+        while not stop.is_set():
+            await asyncio.sleep(interval)
+            done, last = self.completed - last, self.completed
+            points.append(
+                {
+                    "t": round(time.perf_counter() - started, 2),
+                    "rps": round(done / interval, 1),
+                    "inflight": self.inflight,
+                    "loop_lag_max_ms": round(self._interval_lag, 2),
+                    "rss_mb": round(_rss_mb(pid) or 0.0, 1),
+                    "smtp_messages": sink.messages,
+                }
+            )
+            self._interval_lag = 0.0
+            print(
+                "t=%6.1fs  rps=%7.1f  inflight=%4d  lag=%7.2f ms  rss=%7.1f MB"
+                % (
+                    points[-1]["t"],
+                    points[-1]["rps"],
+                    self.inflight,
+                    points[-1]["loop_lag_max_ms"],
+                    points[-1]["rss_mb"],
+                ),
+                flush=True,
+            )
+        return points
+
+
+# ——— Yük üretimi ——— #
+async def _send(client, workload, recorder, name, arrival, slots):
+    async with slots:
+        recorder.inflight += 1
+        try:
+            request = getattr(workload, name.replace("-", "_"))()
+            response = await client.request(**request)
+            status = response.status_code
+            if name == "send-email" and status == 200:
+                # Gönderim hatası 200 + success=false olarak döner
+                if not response.json().get("success"):
+                    status = "smtp_failed"
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        finally:
+            recorder.inflight -= 1
+    recorder.record(name, arrival, status)
+
+
+async def drive(args, client, workload, recorder, deadline):
+    names, weights = zip(*args.mix.items())
+    rng = random.Random(args.seed + 1)
+    slots = asyncio.Semaphore(args.concurrency)
+    tasks = set()
+
+    if args.rate > 0:
+        arrival = time.perf_counter()
+        while True:
+            arrival += rng.expovariate(args.rate)
+            if arrival >= deadline:
+                break
+            await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+            name = rng.choices(names, weights)[0]
+            task = asyncio.create_task(
+                _send(client, workload, recorder, name, arrival, slots)
+            )
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.wait(tasks)
+        return
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            await _send(client, workload, recorder, name, time.perf_counter(), slots)
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+
+async def run(args):
+    sink = SmtpSink(port=args.smtp_port).start()
+    workload = Workload(args)
+    app = None
+    if args.url:
+        client = httpx.AsyncClient(
+            base_url=args.url,
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=args.concurrency),
+        )
+    else:
+        os.environ.update(
+            EMAIL_DEMO_MODE="false",
+            SMTP_HOST=sink.host,
+            SMTP_PORT=str(sink.port),
+            SMTP_STARTTLS="false",
+            SMTP_USERNAME="loadtest",
+            SMTP_PASSWORD="loadtest",
+            FROM_EMAIL="loadtest@example.com",
+        )
+        from app.main import app
+
+        await app.router.startup()
+        # Sözcüksel yedek yanıtlar ölçümü çarpıtmasın: model hazır olana kadar beklenir
+        if getattr(app.state, "model_task", None) is not None:
+            await app.state.model_task
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://loadtest",
+            timeout=args.timeout,
+        )
+
+    try:
+        # E-posta eki olarak gerçek bir dilekçe kullanılır
+        response = await client.request(**workload.generate_pdf())
+        response.raise_for_status()
+        workload.document = response.content
+
+        rss_start = _rss_mb(args.server_pid)
+        started = time.perf_counter()
+        recorder = Recorder(warmup_until=started + args.warmup)
+        stop = asyncio.Event()
+        monitors = [
+            asyncio.create_task(recorder.watch_loop(stop)),
+            asyncio.create_task(
+                recorder.timeline(
+                    stop, started, args.sample_interval, args.server_pid, sink
+                )
+            ),
+        ]
+        await drive(args, client, workload, recorder, started + args.duration)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        _, timeline = await asyncio.gather(*monitors)
+    finally:
+        await client.aclose()
+        if app is not None:
+            await app.router.shutdown()
+        sink.stop()
+
+    measured = max(elapsed - args.warmup, 1e-9)
+    endpoints = {}
+    for name in args.mix:
+        values = recorder.latency.get(name, [])
+        ok = recorder.status[name].get(200, 0)
+        endpoints[name] = {
+            "requests": len(values),
+            "ok": ok,
+            "status": {str(k): v for k, v in recorder.status[name].items()},
+            "throughput_rps": round(ok / measured, 2),
+            "latency_ms": _latency_summary(values),
+        }
+    all_values = [v for values in recorder.latency.values() for v in values]
+    rss = [p["rss_mb"] for p in timeline]
+    return {
+        "meta": {
+            "commit": _git("rev-parse", "HEAD"),
+            "created_at": datetime.now().isoformat(),
+            "mode": "uvicorn" if args.url else "in-process",
+            "args": {k: v for k, v in vars(args).items() if k != "out"},
+        },
+        "summary": {
+            "requests": len(all_values),
+            "throughput_rps": round(
+                sum(e["ok"] for e in endpoints.values()) / measured, 2
+            ),
+            "latency_ms": _latency_summary(all_values),
+            "loop_lag_ms": _latency_summary(recorder.loop_lag),
+            "rss_mb": {
+                "start": round(rss_start or 0.0, 1),
+                "max": max(rss, default=None),
+                "end": rss[-1] if rss else None,
+            },
+            "smtp": {"messages": sink.messages, "bytes": sink.bytes},
+        },
+        "endpoints": endpoints,
+        "timeline": timeline,
+    }
+
+
+def _print_report(report):
+    print()
+    print(
+        "%-14s %8s %8s %10s %9s %9s %9s %9s"
+        % ("endpoint", "requests", "ok", "rps", "p50 ms", "p90 ms", "p99 ms", "max ms")
+    )
+    for name, e in report["endpoints"].items():
+        lat = e["latency_ms"] or dict.fromkeys(("p50", "p90", "p99", "max"), 0)
+        print(
+            "%-14s %8d %8d %10.2f %9.1f %9.1f %9.1f %9.1f"
+            % (
+                name,
+                e["requests"],
+                e["ok"],
+                e["throughput_rps"],
+                lat["p50"],
+                lat["p90"],
+                lat["p99"],
+                lat["max"],
+            )
+        )
+        errors = {k: v for k, v in e["status"].items() if k != "200"}
+        if errors:
+            print(f"{'':14} hatalar: {errors}")
+    s = report["summary"]
+    print(f"loop lag ms: {s['loop_lag_ms']}")
+    print(f"rss MB: {s['rss_mb']}   smtp: {s['smtp']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load", description="Uygulama yük testi"
+    )
+    parser.add_argument("--url", help="Çalışan sunucu (yoksa süreç içi ASGI)")
+    parser.add_argument("--server-pid", type=int, help="--url modunda RSS için")
+    parser.add_argument(
+        "--mix",
+        type=_parse_mix,
+        default="auto-match=8,generate-pdf=1,send-email=1",
+        help="uç nokta=ağırlık listesi",
+    )
+    parser.add_argument("--duration", type=float, default=30.0, help="saniye")
+    parser.add_argument("--warmup", type=float, default=3.0, help="saniye")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--rate", type=float, default=0.0, help="istek/s (0 = kapalı döngü)"
+    )
+    parser.add_argument("--max-courses", type=int, default=10)
+    parser.add_argument("--attachment-kb", type=int, default=512)
+    parser.add_argument(
+        "--transcript-pool",
+        type=int,
+        default=200,
+        help="Sentetik transkript derslerinin seçildiği havuz boyu; uygulamanın "
+        "dahili kataloğunu değiştirmez (o internal_courses.json/MONGO_URI'den yüklenir)",
+    )
+    parser.add_argument("--smtp-port", type=int, default=0)
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="JSON rapor dosyası")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    _print_report(report)
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(
+            json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        print(f"→ {out}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
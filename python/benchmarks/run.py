@@ -0,0 +1,327 @@
+# benchmarks/run.py
+"""Eşleştirme, Word üretimi ve MIME oluşturma ölçümleri.
+
+``python`` dizininden çalıştırılır::
+
+    python -m benchmarks.run --catalog-size 10000 --out bench/HEAD.json
+    python -m benchmarks.run --only docx,mime --repeat 20 --out bench/docx.json
+
+Her ölçüm için gecikme dağılımı (ms), işlem hacmi ve ayrı bir çalıştırmada
+``tracemalloc`` ile ölçülen en yüksek bellek ayırımı JSON olarak yazılır.
+Sonuç dosyası commit özeti ve ortam bilgisini içerir; iki dosya
+``python -m benchmarks.compare`` ile karşılaştırılır.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from .synthetic import make_catalog, make_transcript
+
+ROOT = Path(__file__).resolve().parent.parent
+SUITES = ("matching", "docx", "mime")
+
+
+# ——— Ölçüm yardımcıları ——— #
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def measure(fn, repeat, warmup=1, items=1):
+    """``fn``'i ``warmup`` + ``repeat`` kez çalıştırır; özet istatistik döndürür.
+
+    ``fn(i)`` her tekrarda farklı girdi seçebilsin diye tekrar sırasını alır.
+    Bellek ölçümü zamanlamayı bozmasın diye ayrı bir çalıştırmada yapılır.
+    """
+    for i in range(warmup):
+        fn(i)
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(warmup + i)
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn(warmup + repeat)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    ms = sorted(s * 1000 for s in samples)
+    mean = statistics.fmean(ms)
+    return {
+        "repeat": repeat,
+        "latency_ms": {
+            "mean": round(mean, 3),
+            "stdev": round(statistics.stdev(ms), 3) if len(ms) > 1 else 0.0,
+            "min": round(ms[0], 3),
+            "p50": round(_percentile(ms, 0.50), 3),
+            "p95": round(_percentile(ms, 0.95), 3),
+            "max": round(ms[-1], 3),
+        },
+        "throughput_per_s": round(items / (mean / 1000), 2) if mean else None,
+        "peak_alloc_kib": round(peak / 1024, 1),
+    }
+
+
+def _result(name, params, stats, unit):
+    print(
+        "%-34s %-28s p50 %9.2f ms  %10s %s/s  peak %8.0f KiB"
+        % (
+            name,
+            json.dumps(params),
+            stats["latency_ms"]["p50"],
+            stats["throughput_per_s"],
+            unit,
+            stats["peak_alloc_kib"],
+        ),
+        flush=True,
+    )
+    return {"name": name, "params": params, "unit": unit, **stats}
+
+
+# ——— Eşleştirme ——— #
+def bench_matching(args, catalog, transcript):
+    from app.repository import CourseRepository
+    from app.services import SimilarityService
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "catalog.json"
+        src.write_text(json.dumps(catalog, ensure_ascii=False), encoding="utf-8")
+        repo = CourseRepository(src=str(src))
+        asyncio.run(repo.load())
+
+        start = time.perf_counter()
+        svc = SimilarityService(args.model, args.threshold, repo)
+        build_s = time.perf_counter() - start
+    print(f"catalog embeddings: {len(catalog)} courses in {build_s:.2f} s", flush=True)
+    results.append(
+        {
+            "name": "catalog_build",
+            "params": {"catalog_size": len(catalog)},
+            "unit": "courses",
+            "repeat": 1,
+            "latency_ms": {"p50": round(build_s * 1000, 3)},
+            "throughput_per_s": round(len(catalog) / build_s, 2),
+        }
+    )
+
+    texts = [c["ext_content"] for c in transcript]
+    int_texts = [c["content"] for c in catalog]
+
+    def window(seq, size, i):
+        # Her tekrar farklı bir dilim alır (tekrarlanan girdiler ölçümü şişirmesin)
+        start = (i * size) % max(1, len(seq) - size + 1)
+        return seq[start : start + size]
+
+    for size in args.batch_sizes:
+        results.append(
+            _result(
+                "SimilarityService.auto_match",
+                {"batch_size": size, "catalog_size": len(catalog)},
+                measure(
+                    lambda i: svc.auto_match(window(texts, size, i)),
+                    args.repeat,
+                    items=size,
+                ),
+                "texts",
+            )
+        )
+    for size in args.batch_sizes:
+        pairs = list(zip(texts, random.Random(size).choices(int_texts, k=len(texts))))
+        results.append(
+            _result(
+                "SimilarityService.bulk_similarity",
+                {"batch_size": size},
+                measure(
+                    lambda i: svc.bulk_similarity(window(pairs, size, i)),
+                    args.repeat,
+                    items=size,
+                ),
+                "pairs",
+            )
+        )
+    return results
+
+
+# ——— Word belgesi ——— #
+PERSONAL_INFO = {
+    "first_name": "Ayşe",
+    "last_name": "Yılmaz",
+    "student_number": "2024123456",
+    "university": "Sentetik Üniversitesi",
+    "faculty": "Mühendislik Fakültesi",
+    "department": "Bilgisayar Mühendisliği",
+}
+
+
+def bench_docx(args, transcript):
+    from app.services import ExemptionWordBuilder
+
+    template = str(ROOT / "Muafiyet_dilekcesi.docx")
+    results = []
+    for n in args.course_counts:
+        courses = transcript[:n]
+        results.append(
+            _result(
+                "ExemptionWordBuilder.build",
+                {"courses": n},
+                measure(
+                    lambda i: ExemptionWordBuilder.build(
+                        PERSONAL_INFO, courses, template_path=template
+                    ),
+                    args.repeat,
+                ),
+                "docs",
+            )
+        )
+    return results
+
+
+# ——— MIME ——— #
+def bench_mime(args, transcript):
+    from app.email_service_new import EmailService
+    from app.services import ExemptionWordBuilder
+
+    svc = EmailService()
+    doc = ExemptionWordBuilder.build(
+        PERSONAL_INFO,
+        transcript[:10],
+        template_path=str(ROOT / "Muafiyet_dilekcesi.docx"),
+    )
+    student = {
+        "firstName": "Ayşe",
+        "lastName": "Yılmaz",
+        "studentNumber": "2024123456",
+    }
+    results = []
+    for mb in args.attachment_mb:
+        # PDF'ler sıkıştırılmış içerik taşır; rastgele baytlar base64 maliyetini doğru yansıtır
+        blob = random.Random(mb).randbytes(int(mb * 1024 * 1024))
+
+        def assemble(i):
+            msg = svc._build_message(
+                "ogrenci@example.com", student, doc, blob, blob, None, None
+            )
+            return msg.as_bytes()  # aiosmtplib gönderimden önce bunu yapar
+
+        results.append(
+            _result(
+                "EmailService._build_message",
+                {"attachment_mb": mb, "attachments": 2},
+                measure(assemble, args.repeat, items=2 * mb),
+                "MB",
+            )
+        )
+    return results
+
+
+# ——— Ana akış ——— #
+def _git(*cmd):
+    try:
+        return subprocess.run(
+            ["git", *cmd], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _meta(args):
+    import numpy as np
+
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--", "app")),
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "model": args.model,
+        "seed": args.seed,
+        "args": {k: v for k, v in vars(args).items() if k != "out"},
+    }
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def _float_list(value):
+    return [float(v) for v in value.split(",") if v]
+
+
+def main(argv=None):
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run", description="Performans ölçümleri"
+    )
+    parser.add_argument("--out", help="JSON sonuç dosyası (yoksa yalnızca ekrana)")
+    parser.add_argument(
+        "--only", default=",".join(SUITES), help="Virgülle: " + ",".join(SUITES)
+    )
+    parser.add_argument("--catalog-size", type=int, default=10_000)
+    parser.add_argument("--transcript-size", type=int, default=2_000)
+    parser.add_argument("--batch-sizes", type=_int_list, default=[1, 8, 32, 128])
+    parser.add_argument("--course-counts", type=_int_list, default=[1, 5, 10, 20, 40])
+    parser.add_argument("--attachment-mb", type=_float_list, default=[1, 5, 25])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model", default=os.getenv("MODEL_NAME", "all-MiniLM-L6-v2"))
+    parser.add_argument(
+        "--threshold", type=float, default=float(os.getenv("DEFAULT_THRESHOLD", 0.80))
+    )
+    args = parser.parse_args(argv)
+    suites = [s for s in args.only.split(",") if s]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"bilinmeyen ölçüm: {', '.join(sorted(unknown))}")
+
+    catalog = make_catalog(args.catalog_size, args.seed)
+    transcript = make_transcript(
+        max(args.transcript_size, *args.batch_sizes, *args.course_counts),
+        catalog,
+        args.seed,
+    )
+
+    results = []
+    if "matching" in suites:
+        results += bench_matching(args, catalog, transcript)
+    if "docx" in suites:
+        results += bench_docx(args, transcript)
+    if "mime" in suites:
+        results += bench_mime(args, transcript)
+
+    report = {"meta": _meta(args), "results": results}
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(
+            json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        print(f"→ {out}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
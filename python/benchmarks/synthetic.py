@@ -0,0 +1,119 @@
+# benchmarks/synthetic.py
+"""``internal_courses.json``'dan türetilen sentetik katalog ve transkriptler.
+
+Gerçek ders içerikleri virgül/nokta ile öbeklere ayrılır; sentetik dersler bu
+öbeklerin rastgele birleşimidir. Böylece metin uzunluğu ve sözcük dağarcığı
+gerçek kataloğa yakın kalır. Aynı ``seed`` her zaman aynı çıktıyı verir::
+
+    python -m benchmarks.synthetic catalog --courses 10000 --out catalog_10k.json
+    python -m benchmarks.synthetic transcript --courses 40 --out transcript.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+from pathlib import Path
+from typing import Dict, List
+
+SOURCE = Path(__file__).resolve().parent.parent / "internal_courses.json"
+
+_SPLIT_RE = re.compile(r"[.,;]\s*")
+
+
+def _load_source(path=SOURCE) -> List[Dict[str, str]]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def _phrases(courses) -> List[str]:
+    phrases = {
+        p.strip()
+        for c in courses
+        for p in _SPLIT_RE.split(c.get("content", ""))
+        if len(p.strip()) > 3
+    }
+    return sorted(phrases)
+
+
+def make_catalog(n: int, seed: int = 0, source=SOURCE) -> List[Dict[str, str]]:
+    """Gerçek dersleri koruyarak kataloğu ``n`` derse tamamlar."""
+    rng = random.Random(seed)
+    base = _load_source(source)
+    phrases = _phrases(base)
+    names = [c["name"] for c in base]
+    catalog = list(base[:n])
+    for i in range(len(catalog), n):
+        content = ", ".join(rng.sample(phrases, rng.randint(4, 10))) + "."
+        catalog.append(
+            {
+                "code": f"SYN{i:05d}",
+                "name": f"{rng.choice(names)} {i}",
+                "credits": rng.choice(["2-0-2", "3-0-3", "2-2-3", "3-2-4"]),
+                "content": content,
+            }
+        )
+    return catalog
+
+
+def make_transcript(
+    n: int, catalog: List[Dict[str, str]], seed: int = 0, noise: float = 0.3
+) -> List[Dict[str, str]]:
+    """Katalogdaki derslerin bozulmuş kopyalarından harici ders listesi üretir.
+
+    Her içerikte öbeklerin ``noise`` oranı atılır ya da başka bir dersten
+    gelen öbekle değiştirilir; sıralama da karıştırılır.
+    """
+    rng = random.Random(seed)
+    phrases = _phrases(catalog[:500])
+    courses = []
+    for i in range(n):
+        src = rng.choice(catalog)
+        parts = [p for p in _SPLIT_RE.split(src["content"]) if p.strip()]
+        parts = [
+            rng.choice(phrases) if rng.random() < noise else p
+            for p in parts
+            if rng.random() >= noise / 2
+        ] or parts[:1]
+        rng.shuffle(parts)
+        courses.append(
+            {
+                "ext_university": "Sentetik Üniversitesi",
+                "ext_code": f"EXT{i:04d}",
+                "ext_name": src["name"],
+                "ext_credit": src.get("credits", "3-0-3"),
+                "ext_content": ", ".join(parts) + ".",
+                "int_code": src["code"],
+                "int_name": src["name"],
+                "int_credit": src.get("credits", "3-0-3"),
+            }
+        )
+    return courses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.synthetic")
+    parser.add_argument("kind", choices=["catalog", "transcript"])
+    parser.add_argument("--courses", type=int, default=10_000)
+    parser.add_argument("--catalog-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+
+    catalog = make_catalog(
+        args.courses if args.kind == "catalog" else args.catalog_size, args.seed
+    )
+    data = (
+        catalog
+        if args.kind == "catalog"
+        else make_transcript(args.courses, catalog, args.seed)
+    )
+    Path(args.out).write_text(
+        json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8"
+    )
+    print(f"{len(data)} kayıt → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
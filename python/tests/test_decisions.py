@@ -0,0 +1,40 @@
+# tests/test_decisions.py
+"""Karar deposu: yalnızca sıra numarası farklı dersler eşleşmemeli."""
+
+from app.decisions import DecisionStore, hamming, simhash
+
+
+def test_single_character_terms_change_the_signature():
+    assert hamming(simhash("Programlama 1"), simhash("Programlama 2")) > 3
+    assert hamming(simhash("Fizik I"), simhash("Fizik II")) > 3
+
+
+def test_sequel_course_is_not_a_near_duplicate(tmp_path):
+    store = DecisionStore(tmp_path / "d.db")
+    try:
+        store.record_many(
+            [{"ext_content": "Programlama 1", "int_code": "BIL1003", "approved": True}]
+        )
+        texts = [
+            store.normalizer.normalize(t) for t in ("Programlama 1", "Programlama 2")
+        ]
+        found = store.lookup(texts)
+        assert [r["match"] for r in found[0]] == ["exact"]
+        assert 1 not in found
+    finally:
+        store.close()
+
+
+def test_older_ruling_does_not_overwrite_newer(tmp_path):
+    store = DecisionStore(tmp_path / "d.db")
+    base = {"ext_content": "Veri yapıları", "int_code": "BIL2005"}
+    try:
+        store.record_many([{**base, "approved": True, "decided_at": "2024-09-12"}])
+        store.record_many([{**base, "approved": False, "decided_at": "2021-02-01"}])
+        (rec,) = store.lookup([store.normalizer.normalize("Veri yapıları")])[0]
+        assert rec["approved"] and rec["decided_at"] == "2024-09-12"
+        store.record_many([{**base, "approved": False, "decided_at": "2025-01-15"}])
+        (rec,) = store.lookup([store.normalizer.normalize("Veri yapıları")])[0]
+        assert not rec["approved"]
+    finally:
+        store.close()
@@ -0,0 +1,47 @@
+# tests/test_repository.py
+"""CourseRepository: yeniden yükleme kataloğu baştan kurar."""
+
+import asyncio
+
+from app.repository import CourseRepository
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, key, direction):
+        return self
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for d in self._docs:
+            yield dict(d)
+
+
+class _Collection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection):
+        return _Cursor(self.docs)
+
+
+def test_mongo_reload_drops_removed_courses():
+    repo = CourseRepository()
+    repo._mongo = _Collection(
+        [
+            {"code": "BIL1003", "content": "Programlama", "name": "Programlama"},
+            {"code": "BIL2005", "content": "Veri yapıları", "name": "Veri Yapıları"},
+        ]
+    )
+    asyncio.run(repo.load())
+    before = repo._cache
+    repo._mongo.docs = repo._mongo.docs[1:]
+    asyncio.run(repo.load())
+    assert list(repo._cache) == ["BIL2005"]
+    assert repo.meta("BIL1003") == {"name": None, "credits": None}
+    # Eski sözlük yerinde değiştirilmez (süren okumalar tutarlı kalır)
+    assert list(before) == ["BIL1003", "BIL2005"]
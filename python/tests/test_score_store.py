@@ -0,0 +1,48 @@
+# tests/test_score_store.py
+"""Skor deposu: katalog sırası değişince eski satırlar sunulmamalı."""
+
+import asyncio
+import json
+
+import numpy as np
+
+from app.repository import CourseRepository
+from app.score_store import ScoreStore, content_key
+
+COURSES = [
+    {"code": "BIL2005", "content": "Veri yapıları ve algoritmalar"},
+    {"code": "BIL3001", "content": "İşletim sistemleri"},
+    {"code": "BIL4002", "content": "Yapay zekâ"},
+]
+
+
+def _load(tmp_path, name, courses):
+    path = tmp_path / name
+    path.write_text(json.dumps(courses, ensure_ascii=False), encoding="utf-8")
+    repo = CourseRepository(src=str(path))
+    asyncio.run(repo.load())
+    return repo
+
+
+def test_catalog_version_changes_with_order(tmp_path):
+    repo = _load(tmp_path, "a.json", COURSES)
+    same = _load(tmp_path, "b.json", COURSES)
+    reversed_ = _load(tmp_path, "c.json", COURSES[::-1])
+    assert repo.version == same.version
+    assert repo.version != reversed_.version
+    assert list(reversed_._cache) == [c["code"] for c in COURSES[::-1]]
+
+
+def test_reordered_catalog_misses_stored_rows(tmp_path):
+    repo = _load(tmp_path, "a.json", COURSES)
+    reordered = _load(tmp_path, "b.json", COURSES[::-1])
+    store = ScoreStore(tmp_path / "scores.db", flush_interval=0.01)
+    key = content_key("programlamaya giriş")
+    try:
+        store.put_many([key], "m", repo.version, np.array([[0.58, 0.1, 0.2]]))
+        store.close()
+        store = ScoreStore(tmp_path / "scores.db")
+        assert key in store.get_many([key], "m", repo.version, width=3)
+        assert store.get_many([key], "m", reordered.version, width=3) == {}
+    finally:
+        store.close()
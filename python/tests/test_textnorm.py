@@ -0,0 +1,54 @@
+# tests/test_textnorm.py
+"""TextNormalizer: eş güçlülük ve ders içeriğinin korunması."""
+
+import pytest
+
+from app.textnorm import TextNormalizer
+
+normalizer = TextNormalizer()
+
+SAMPLES = [
+    "Kredi: 3 1. Hafta: Giriş",
+    "Teori: 2 Uygulama: 2 Kredi: 3 AKTS: 5\n1. Hafta: Veri yapıları",
+    "Sayfa 3 / 12\nDersin İçeriği: Algoritmalar\nSayfa 4 / 12\n- Sıralama",
+    "T U K AKTS\n3 0 3 5\nINTRODUCTION TO PROGRAMMING",
+    "Graph theory 2 and lab 3 exercises",
+    "• Diferansiyel denklemler…  • Laplace dönüşümü!!",
+    "Content: 1) Sets 2) Relations\n\nContent: 1) Sets",
+    "akts 5 - - ders- \nnotları",
+]
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_normalize_is_idempotent(text):
+    once = normalizer.normalize(text)
+    assert normalizer.normalize(once) == once
+
+
+def test_bullet_revealed_by_boilerplate_is_stripped():
+    assert normalizer.normalize("Kredi: 3 1. Hafta: Giriş") == "hafta: giriş"
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Graph theory 2 and lab 3 exercises", "graph theory 2 and lab 3 exercises"),
+        ("Uygulama 4 hafta boyunca yapılır", "uygulama 4 hafta boyunca yapılır"),
+        ("Control theory: 2 examples", "control theory: 2 examples"),
+    ],
+)
+def test_content_mentioning_credit_words_is_kept(text, expected):
+    assert normalizer.normalize(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Teori: 2 Uygulama: 2 Kredi: 3 AKTS: 5\nAlgoritmalar",
+        "Theory = 3, Lab: 1\nAlgoritmalar",
+        "Algoritmalar akts 5",
+        "T U K AKTS\n3 0 3 5\nAlgoritmalar",
+    ],
+)
+def test_credit_table_is_stripped(text):
+    assert normalizer.normalize(text) == "algoritmalar"